@@ -1,9 +1,10 @@
-import requests
 import sentry_sdk
 from django.conf import settings
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
+from api.exceptions import LimiteDebitError
 from api.exceptions import SERVER_ERROR
 
 NOM_API = "analyse IA"
@@ -13,7 +14,7 @@ ANALYSE_IA_TIMEOUT = 3
 def lancement_analyse(document_id, document_url, callback_url):
     try:
         url = f"{settings.API_ANALYSE_IA_BASE_URL}/run-task"
-        response = requests.post(
+        response = transport.post(
             url,
             {
                 "document_id": document_id,
@@ -23,6 +24,9 @@ def lancement_analyse(document_id, document_url, callback_url):
             headers={"Authorization": f"Bearer {settings.API_ANALYSE_IA_TOKEN}"},
             timeout=ANALYSE_IA_TIMEOUT,
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         sentry_sdk.capture_exception(e)
         raise APIError(SERVER_ERROR)
@@ -1,8 +1,9 @@
-import requests
 import sentry_sdk
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
+from api.exceptions import LimiteDebitError
 
 NOM_API = "bilans-ges"
 BGES_TIMEOUT = 3
@@ -10,11 +11,14 @@ BGES_TIMEOUT = 3
 
 def last_reporting_year(siren):
     try:
-        response = requests.get(
+        response = transport.get(
             "https://bilans-ges.ademe.fr/api/inventories",
             params={"page": "1", "itemsPerPage": "11", "entity.siren": siren},
             timeout=BGES_TIMEOUT,
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
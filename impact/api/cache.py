@@ -0,0 +1,124 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import sentry_sdk
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from api.exceptions import APIError
+
+# Cache à deux niveaux devant les appels aux API :
+# - niveau local : cache mémoire du processus (alias "default"),
+# - niveau partagé : cache commun à tous les workers (alias "partage").
+# Une entrée reste servie pendant API_CACHE_PERIME_TTL secondes (par défaut) après son expiration (stale-while-revalidate) :
+# la valeur périmée est renvoyée immédiatement et rafraîchie en arrière-plan,
+# ce qui permet de répondre même quand les API sont lentes ou indisponibles.
+
+_executeur = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidation-api")
+
+DUREE_VERROU_REVALIDATION = 30
+
+
+@dataclass
+class Statistiques:
+    hits_local: int = 0
+    hits_partage: int = 0
+    hits_perimes: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self):
+        return self.hits_local + self.hits_partage + self.hits_perimes
+
+
+@dataclass
+class _Entree:
+    valeur: object
+    expire_le: float
+
+    @property
+    def est_perimee(self):
+        return self.expire_le <= time.time()
+
+
+class CacheAPI:
+    def __init__(
+        self, nom, nom_setting_ttl, nom_setting_perime_ttl="API_CACHE_PERIME_TTL"
+    ):
+        self.nom = nom
+        self.nom_setting_ttl = nom_setting_ttl
+        self.nom_setting_perime_ttl = nom_setting_perime_ttl
+        self.statistiques = Statistiques()
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.nom_setting_ttl)
+
+    @property
+    def perime_ttl(self):
+        return getattr(settings, self.nom_setting_perime_ttl)
+
+    def _cle(self, cle):
+        return f"api:{self.nom}:{cle}"
+
+    def get(self, cle, fonction, actualise=False):
+        """renvoie la valeur en cache, ou le résultat de `fonction` mis en cache
+
+        actualise : True pour ignorer l'entrée en cache, même périmée, et la remplacer par le résultat de `fonction`
+        """
+        cle = self._cle(cle)
+        entree = None if actualise else self._lit(cle)
+        if entree is None:
+            self.statistiques.misses += 1
+            return self._rafraichit(cle, fonction)
+        if entree.est_perimee:
+            self.statistiques.hits_perimes += 1
+            self._revalide_en_arriere_plan(cle, fonction)
+        return entree.valeur
+
+    def invalide(self, cle):
+        cle = self._cle(cle)
+        caches["default"].delete(cle)
+        caches["partage"].delete(cle)
+
+    def _lit(self, cle):
+        if (entree := caches["default"].get(cle)) is not None:
+            self.statistiques.hits_local += 1
+            return entree
+        if (entree := caches["partage"].get(cle)) is not None:
+            self.statistiques.hits_partage += 1
+            caches["default"].set(cle, entree, self._duree_de_conservation(entree))
+            return entree
+        return None
+
+    def _duree_de_conservation(self, entree):
+        return max(entree.expire_le - time.time(), 0) + self.perime_ttl
+
+    def _rafraichit(self, cle, fonction):
+        valeur = fonction()
+        entree = _Entree(valeur, time.time() + self.ttl)
+        duree = self._duree_de_conservation(entree)
+        caches["partage"].set(cle, entree, duree)
+        caches["default"].set(cle, entree, duree)
+        return valeur
+
+    def _revalide_en_arriere_plan(self, cle, fonction):
+        # un seul rafraîchissement à la fois par clé, tous workers confondus
+        if caches["partage"].add(
+            f"{cle}:revalidation", True, DUREE_VERROU_REVALIDATION
+        ):
+            _executeur.submit(self._revalide, cle, fonction)
+
+    def _revalide(self, cle, fonction):
+        try:
+            self._rafraichit(cle, fonction)
+        except APIError:
+            # la valeur périmée continue d'être servie jusqu'à la prochaine tentative
+            pass
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+        finally:
+            caches["partage"].delete(f"{cle}:revalidation")
+            connections.close_all()
@@ -0,0 +1,162 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api.exceptions import APIError
+from api.exceptions import DisjoncteurOuvertError
+from api.exceptions import LimiteDebitError
+from api.exceptions import SERVER_ERROR
+from api.exceptions import SirenError
+from logs import event_logger
+
+# Disjoncteur (circuit breaker) par API distante, dont l'état est partagé entre les workers via le cache "partage".
+# - fermé : les appels sont effectués et leurs résultats comptabilisés sur une fenêtre glissante,
+#   le disjoncteur s'ouvre quand la part d'appels en erreur ou trop lents dépasse un seuil ;
+# - ouvert : les appels échouent immédiatement (DisjoncteurOuvertError) pour passer directement au fallback ;
+# - semi-ouvert : une fois la durée d'ouverture écoulée, un seul appel de test est autorisé,
+#   qui referme le disjoncteur s'il réussit ou le rouvre sinon.
+# Les appels sont comptabilisés par worker dans le cache local (alias "default"), dont l'incrément est atomique
+# et sans aller-retour en base : le cache partagé en base de données n'a pas d'incrément atomique
+# et n'est lu qu'une fois par appel (état), puis écrit aux seuls changements d'état.
+# Le premier worker dont la fenêtre dépasse le seuil ouvre le disjoncteur pour tous.
+# Les compteurs sont propres à chaque période de fermeture : ceux d'avant une ouverture ne sont plus lus ensuite.
+
+FERME = "fermé"
+OUVERT = "ouvert"
+SEMI_OUVERT = "semi-ouvert"
+
+NOMBRE_TRANCHES_FENETRE = 6
+
+
+class Disjoncteur:
+    def __init__(self, nom):
+        self.nom = nom
+
+    @property
+    def _cache(self):
+        return caches["partage"]
+
+    @property
+    def _cache_local(self):
+        return caches["default"]
+
+    def _cle(self, suffixe):
+        return f"disjoncteur:{self.nom}:{suffixe}"
+
+    def _etat_partage(self):
+        return self._cache.get(self._cle("etat"), {"etat": FERME})
+
+    @property
+    def etat(self):
+        return self._etat_courant(self._etat_partage())
+
+    def _etat_courant(self, etat):
+        if (
+            etat["etat"] == OUVERT
+            and time.time() - etat["depuis"] >= settings.API_DISJONCTEUR_DUREE_OUVERTURE
+        ):
+            return SEMI_OUVERT
+        return etat["etat"]
+
+    def appelle(self, fonction, *args, **kwargs):
+        test = False
+        etat_partage = self._etat_partage()
+        # période de fermeture en cours, dont les appels sont comptabilisés ensemble
+        periode = etat_partage.get("depuis", 0)
+        etat = self._etat_courant(etat_partage)
+        if etat == OUVERT:
+            raise DisjoncteurOuvertError(SERVER_ERROR)
+        elif etat == SEMI_OUVERT:
+            # un seul appel de test à la fois, tous workers confondus
+            if not self._cache.add(
+                self._cle("test"), True, settings.API_DISJONCTEUR_DUREE_OUVERTURE
+            ):
+                raise DisjoncteurOuvertError(SERVER_ERROR)
+            self._change_etat(SEMI_OUVERT)
+            test = True
+
+        debut = time.monotonic()
+        try:
+            resultat = fonction(*args, **kwargs)
+        except LimiteDebitError:
+            # refus du limiteur de débit local : l'API n'a pas été appelée, rien n'est comptabilisé
+            if test:
+                self._cache.delete(self._cle("test"))
+            raise
+        except SirenError:
+            # erreur fonctionnelle : l'API a répondu correctement
+            self._enregistre(periode, time.monotonic() - debut, test)
+            raise
+        except APIError:
+            self._enregistre(periode, time.monotonic() - debut, test, erreur=True)
+            raise
+        self._enregistre(periode, time.monotonic() - debut, test)
+        return resultat
+
+    def _enregistre(self, periode, duree, test, erreur=False):
+        echec = erreur or duree >= settings.API_DISJONCTEUR_SEUIL_LATENCE
+        if test:
+            self._cache.delete(self._cle("test"))
+            # une nouvelle période de fermeture commence, avec une fenêtre vide
+            self._change_etat(OUVERT if echec else FERME)
+            return
+
+        tranche = self._tranche_courante()
+        self._incremente(f"{periode}:appels:{tranche}")
+        if echec:
+            self._incremente(f"{periode}:echecs:{tranche}")
+            appels, echecs = self._fenetre(periode)
+            if (
+                appels >= settings.API_DISJONCTEUR_NOMBRE_MINIMUM_APPELS
+                and echecs / appels >= settings.API_DISJONCTEUR_SEUIL_ECHECS
+                and self.etat == FERME
+            ):
+                self._change_etat(OUVERT)
+
+    def _duree_tranche(self):
+        return settings.API_DISJONCTEUR_FENETRE / NOMBRE_TRANCHES_FENETRE
+
+    def _tranche_courante(self):
+        return int(time.time() // self._duree_tranche())
+
+    def _tranches_fenetre(self):
+        tranche = self._tranche_courante()
+        return range(tranche - NOMBRE_TRANCHES_FENETRE + 1, tranche + 1)
+
+    def _incremente(self, suffixe):
+        cle = self._cle(suffixe)
+        self._cache_local.add(
+            cle, 0, settings.API_DISJONCTEUR_FENETRE + self._duree_tranche()
+        )
+        try:
+            self._cache_local.incr(cle)
+        except ValueError:
+            # compteur expiré entre add et incr : l'appel n'est pas comptabilisé
+            pass
+
+    def _fenetre(self, periode):
+        cles = {
+            compteur: [
+                self._cle(f"{periode}:{compteur}:{tranche}")
+                for tranche in self._tranches_fenetre()
+            ]
+            for compteur in ("appels", "echecs")
+        }
+        valeurs = self._cache_local.get_many(cles["appels"] + cles["echecs"])
+        return tuple(
+            sum(valeurs.get(cle, 0) for cle in cles[compteur])
+            for compteur in ("appels", "echecs")
+        )
+
+    def _change_etat(self, etat):
+        etat_precedent = self._cache.get(self._cle("etat"), {"etat": FERME})["etat"]
+        self._cache.set(
+            self._cle("etat"), {"etat": etat, "depuis": time.time()}, timeout=None
+        )
+        if etat != etat_precedent:
+            log = event_logger.warning if etat == OUVERT else event_logger.info
+            log(
+                "api:disjoncteur",
+                {"api": self.nom, "etat": etat, "etatPrecedent": etat_precedent},
+            )
@@ -1,9 +1,10 @@
-import requests
 import sentry_sdk
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
 from api.exceptions import INVALID_REQUEST_SENTRY_MESSAGE
+from api.exceptions import LimiteDebitError
 
 EGAPRO_TIMEOUT = 3
 
@@ -23,7 +24,10 @@ def indicateurs_bdese(siren, annee):
     }
     try:
         url = f"https://egapro.travail.gouv.fr/api/public/declaration/{siren}/{annee}"
-        response = requests.get(url, timeout=EGAPRO_TIMEOUT)
+        response = transport.get(url, timeout=EGAPRO_TIMEOUT)
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
@@ -46,9 +50,9 @@ def indicateurs_bdese(siren, annee):
             objectifs_progression = {}
             for egapro_indicateur, data in egapro_data_indicateurs.items():
                 if objectif := data["objectif_de_progression"]:
-                    objectifs_progression[
-                        EGAPRO_INDICATEURS[egapro_indicateur]
-                    ] = objectif
+                    objectifs_progression[EGAPRO_INDICATEURS[egapro_indicateur]] = (
+                        objectif
+                    )
             if objectifs_progression:
                 bdese_data_from_egapro["objectifs_progression"] = "\n".join(
                     f"{egapro_indicateur} : {objectif}"
@@ -69,7 +73,10 @@ def is_index_egapro_published(siren, annee):
     NOM_API = "index EgaPro (is_index_egapro_published)"
     try:
         url = f"https://egapro.travail.gouv.fr/api/public/declaration/{siren}/{annee}"
-        response = requests.get(url, timeout=EGAPRO_TIMEOUT)
+        response = transport.get(url, timeout=EGAPRO_TIMEOUT)
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
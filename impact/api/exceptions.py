@@ -17,9 +17,18 @@ class TooManyRequestError(APIError):
     pass
 
 
+# refus du limiteur de débit local (cf. api.limiteur) : aucun appel n'a été fait à l'API
+class LimiteDebitError(TooManyRequestError):
+    pass
+
+
 class ServerError(APIError):
     pass
 
 
 class SirenError(APIError):
     pass
+
+
+class DisjoncteurOuvertError(APIError):
+    pass
@@ -0,0 +1,56 @@
+import csv
+import io
+import itertools
+import zipfile
+
+from django.core.management.base import CommandError
+
+# Lecture en flux des fichiers open data volumineux importés par les commandes `import_stock_sirene`
+# et `import_ratios_financiers` : les lignes sont lues une à une et traitées par lots, la mémoire utilisée reste bornée.
+
+TAILLE_LOT = 5000
+
+
+def par_lots(elements, taille=TAILLE_LOT):
+    elements = iter(elements)
+    while lot := list(itertools.islice(elements, taille)):
+        yield lot
+
+
+def lignes(chemin, colonnes, delimiter=","):
+    if chemin.endswith(".parquet"):
+        yield from _lignes_parquet(chemin, colonnes)
+    elif chemin.endswith(".zip"):
+        with zipfile.ZipFile(chemin) as archive:
+            with archive.open(archive.namelist()[0]) as fichier:
+                yield from lignes_csv(
+                    io.TextIOWrapper(fichier, encoding="utf-8"), colonnes, delimiter
+                )
+    else:
+        with open(chemin, encoding="utf-8") as fichier:
+            yield from lignes_csv(fichier, colonnes, delimiter)
+
+
+def lignes_csv(fichier, colonnes, delimiter=","):
+    # fichier : fichier texte ou tout itérable de lignes
+    for ligne in csv.DictReader(fichier, delimiter=delimiter):
+        yield {colonne: ligne[colonne] for colonne in colonnes}
+
+
+def _lignes_parquet(chemin, colonnes):
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise CommandError(
+            "La lecture des fichiers Parquet nécessite pyarrow : utilisez le fichier CSV ou installez pyarrow"
+        )
+    fichier = pyarrow.parquet.ParquetFile(chemin)
+    for lot in fichier.iter_batches(batch_size=TAILLE_LOT, columns=colonnes):
+        yield from lot.to_pylist()
+
+
+def entier_ou_none(valeur):
+    try:
+        return int(valeur)
+    except (ValueError, TypeError):
+        return None
@@ -1,30 +1,243 @@
+import contextvars
+import hashlib
+import itertools
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+import sentry_sdk
+from django.conf import settings
+from django.db import connections
+
 import api.ratios_financiers
 import api.recherche_entreprises
 import api.sirene
+from api.cache import CacheAPI
+from api.disjoncteur import Disjoncteur
 from api.exceptions import APIError
+from api.exceptions import SERVER_ERROR
 from api.exceptions import SirenError
+from api.models import UniteLegale
+from api.sirene import convertit_tranche_effectif
+
+cache_identite = CacheAPI("identite", "API_CACHE_IDENTITE_TTL")
+cache_donnees_financieres = CacheAPI(
+    "donnees_financieres", "API_CACHE_DONNEES_FINANCIERES_TTL"
+)
+cache_recherche = CacheAPI(
+    "recherche", "API_CACHE_RECHERCHE_TTL", "API_CACHE_RECHERCHE_PERIME_TTL"
+)
+disjoncteur_recherche_entreprises = Disjoncteur("recherche_entreprises")
+disjoncteur_sirene = Disjoncteur("sirene")
+
+_executeur = ThreadPoolExecutor(max_workers=8, thread_name_prefix="infos-entreprise")
+
+
+def infos_entreprise(siren, donnees_financieres=False, actualise=False):
+    """informations d'une entreprise, servies depuis le cache (cf. api.cache) si possible
+
+    actualise : True pour ignorer les caches et interroger les sources, par exemple dans les commandes force_*
+    """
+
+    def identite():
+        return cache_identite.get(siren, lambda: _identite(siren), actualise=actualise)
+
+    def donnees_financieres_api():
+        return cache_donnees_financieres.get(
+            siren,
+            lambda: api.ratios_financiers.dernier_exercice_comptable(siren),
+            actualise=actualise,
+        )
+
+    if not donnees_financieres:
+        return identite()
+
+    # les ratios financiers importés localement sont consultés avant l'API
+    donnees_locales = api.ratios_financiers.dernier_exercice_comptable_local(siren)
+    if (
+        donnees_locales is not None
+        or not settings.API_INFOS_ENTREPRISE_APPELS_CONCURRENTS
+    ):
+        infos = identite()
+        try:
+            infos.update(donnees_locales or donnees_financieres_api())
+        except APIError:
+            infos.update(api.ratios_financiers.dernier_exercice_comptable_vide())
+        return infos
+
+    # Les données d'identité et les données financières sont indépendantes : elles sont récupérées dans deux threads
+    # et attendues ensemble dans le délai global. Au-delà, les données financières sont laissées vides,
+    # comme en cas d'erreur de l'API, et l'absence des données d'identité est une erreur de l'API.
+    # Un calcul hors délai se poursuit en arrière-plan et alimente le cache.
+    futur_identite = _soumet(identite)
+    futur_donnees_financieres = _soumet(donnees_financieres_api)
+    wait(
+        [futur_identite, futur_donnees_financieres],
+        timeout=settings.API_INFOS_ENTREPRISE_DELAI,
+    )
+    if not futur_identite.done():
+        raise APIError(SERVER_ERROR)
+    infos = futur_identite.result()
+    try:
+        infos.update(futur_donnees_financieres.result(timeout=0))
+    except (APIError, TimeoutError):
+        infos.update(api.ratios_financiers.dernier_exercice_comptable_vide())
+    return infos
+
 
+def _soumet(fonction):
+    # le contexte de l'appelant (par exemple `attente_illimitee()` du limiteur de débit) est transmis au thread
+    return _executeur.submit(contextvars.copy_context().run, _dans_un_thread, fonction)
+
+
+def _dans_un_thread(fonction):
+    try:
+        return fonction()
+    finally:
+        # le cache partagé et le limiteur de débit peuvent avoir ouvert une connexion à la base dans ce thread
+        connections.close_all()
+
+
+def _identite(siren):
+    # la copie locale du stock Sirene est consultée en premier,
+    # elle n'est suffisante que si le siège de l'entreprise y est connu (code postal et pays)
+    unite_legale = _unite_legale(siren)
+    if unite_legale and unite_legale.siege_connu:
+        return _infos_unite_legale(unite_legale)
 
-def infos_entreprise(siren, donnees_financieres=False):
     try:
-        infos = api.recherche_entreprises.recherche_par_siren(siren)
+        infos = disjoncteur_recherche_entreprises.appelle(
+            api.recherche_entreprises.recherche_par_siren, siren
+        )
     except SirenError:
         raise
     except APIError:
-        # utilise l'API Sirene en fallback
-        infos = api.sirene.recherche_unite_legale_par_siren(siren)
-
-    if donnees_financieres:
+        # utilise l'API Sirene en fallback, directement si l'API recherche entreprises est réputée indisponible
         try:
-            infos.update(api.ratios_financiers.dernier_exercice_comptable(siren))
+            infos = disjoncteur_sirene.appelle(
+                api.sirene.recherche_unite_legale_par_siren, siren
+            )
+        except SirenError:
+            raise
         except APIError:
-            infos.update(api.ratios_financiers.dernier_exercice_comptable_vide())
+            # les informations incomplètes du stock Sirene sont préférables à une erreur
+            if unite_legale:
+                return _infos_unite_legale(unite_legale)
+            raise
     return infos
 
 
+def _unite_legale(siren):
+    if not settings.API_STOCK_SIRENE_ACTIF:
+        return None
+    return UniteLegale.objects.filter(siren=siren).first()
+
+
+def _infos_unite_legale(unite_legale):
+    # même format que les API recherche entreprises et Sirene
+    return {
+        "siren": unite_legale.siren,
+        "effectif": convertit_tranche_effectif(unite_legale.tranche_effectif),
+        "denomination": unite_legale.denomination,
+        "categorie_juridique_sirene": unite_legale.categorie_juridique_sirene,
+        "code_pays_etranger_sirene": unite_legale.code_pays_etranger_sirene,
+        "code_postal": unite_legale.code_postal,
+        "code_NAF": unite_legale.code_NAF,
+    }
+
+
+def infos_entreprises(sirens, donnees_financieres=False, actualise=False):
+    """version par lot de `infos_entreprise` pour les traitements de masse (commandes, exports)
+
+    renvoie un générateur de triplets (siren, infos, erreur) au fur et à mesure des résolutions
+    """
+    return resolution_par_lot(
+        lambda siren: infos_entreprise(
+            siren, donnees_financieres=donnees_financieres, actualise=actualise
+        ),
+        sirens,
+    )
+
+
+def resolution_par_lot(fonction, sirens):
+    """applique `fonction` à chaque SIREN avec au plus API_RESOLUTION_PAR_LOT_CONCURRENCE appels simultanés
+
+    Les résultats sont renvoyés dans leur ordre d'arrivée, sous forme de triplets (siren, resultat, erreur) :
+    une erreur sur un SIREN est renvoyée avec celui-ci sans interrompre le traitement des autres.
+    Les SIREN sont consommés au fur et à mesure : l'itérable peut être un queryset ou un fichier volumineux.
+    Le débit des appels reste soumis aux limiteurs des API (cf. api.limiteur), avec le contexte de l'appelant
+    (par exemple `attente_illimitee()`)."""
+    concurrence = settings.API_RESOLUTION_PAR_LOT_CONCURRENCE
+    sirens = iter(sirens)
+    executeur = ThreadPoolExecutor(
+        max_workers=concurrence, thread_name_prefix="resolution-par-lot"
+    )
+    en_cours = {}
+
+    def soumet(nombre):
+        for siren in itertools.islice(sirens, nombre):
+            futur = executeur.submit(
+                contextvars.copy_context().run,
+                _resout_dans_un_thread,
+                fonction,
+                siren,
+            )
+            en_cours[futur] = siren
+
+    try:
+        # quelques SIREN d'avance pour que les threads ne restent pas inoccupés
+        soumet(2 * concurrence)
+        while en_cours:
+            termines, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in termines:
+                siren = en_cours.pop(futur)
+                try:
+                    yield siren, futur.result(), None
+                except APIError as e:
+                    yield siren, None, e
+                except Exception as e:
+                    sentry_sdk.capture_exception(e)
+                    yield siren, None, e
+            soumet(len(termines))
+    finally:
+        executeur.shutdown(cancel_futures=True)
+
+
+def _resout_dans_un_thread(fonction, siren):
+    try:
+        return fonction(siren)
+    finally:
+        # le cache partagé et le limiteur de débit peuvent avoir ouvert une connexion à la base dans ce thread
+        connections.close_all()
+
+
 def recherche_par_nom_ou_siren(recherche):
+    # seule une recherche identique (après normalisation) est servie depuis le cache :
+    # la recherche textuelle de l'API ne permet pas de déduire les résultats d'une recherche plus longue
+    return cache_recherche.get(
+        _cle_recherche(normalise_recherche(recherche)), lambda: _recherche(recherche)
+    )
+
+
+def _recherche(recherche):
     try:
-        resultats = api.recherche_entreprises.recherche_textuelle(recherche)
+        resultats = disjoncteur_recherche_entreprises.appelle(
+            api.recherche_entreprises.recherche_textuelle, recherche
+        )
     except APIError:
-        resultats = api.sirene.recherche_unites_legales_par_nom_ou_siren(recherche)
+        resultats = disjoncteur_sirene.appelle(
+            api.sirene.recherche_unites_legales_par_nom_ou_siren, recherche
+        )
     return resultats
+
+
+def normalise_recherche(recherche):
+    # insensible à la casse, aux accents et aux espaces superflus
+    recherche = unicodedata.normalize("NFKD", recherche.casefold())
+    recherche = "".join(c for c in recherche if not unicodedata.combining(c))
+    return " ".join(recherche.split())
+
+
+def _cle_recherche(recherche_normalisee):
+    return hashlib.sha256(recherche_normalisee.encode()).hexdigest()
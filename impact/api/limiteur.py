@@ -0,0 +1,135 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+
+from api.exceptions import LimiteDebitError
+from api.exceptions import TOO_MANY_REQUESTS_ERROR
+from api.models import SeauDeJetons
+
+# Limiteur de débit des appels sortants vers les API publiques, partagé entre les workers gunicorn
+# et les commandes via la base de données (aucun service supplémentaire nécessaire).
+# Chaque hôte listé dans API_LIMITES_DEBIT dispose d'un seau à jetons : `debit` jetons par seconde,
+# dans la limite de `capacite` jetons accumulés. Chaque appel consomme un jeton.
+# En mode bloquant, un jeton est réservé à l'avance et l'appel attend qu'il soit disponible,
+# sauf si l'attente dépasse l'attente maximale (API_LIMITEUR_ATTENTE_MAX secondes par défaut) :
+# les commandes de traitement par lot peuvent lever cette limite avec `attente_illimitee()`.
+# Le verrou de la ligne du seau (select_for_update) sérialise les acquisitions d'un même hôte, tous workers confondus :
+# c'est le principe d'un débit global, et ce verrou n'est tenu que le temps d'une courte transaction,
+# l'attente du jeton réservé se faisant après sa validation. Avec quelques appels par seconde et par hôte,
+# cette contention (quelques millisecondes) reste négligeable devant la durée des appels aux API.
+
+_attente_illimitee = ContextVar("attente_illimitee", default=False)
+
+
+@dataclass
+class Statistiques:
+    acquisitions: int = 0
+    refus: int = 0
+    attentes: int = 0
+    duree_attente: float = 0
+
+    @property
+    def duree_attente_moyenne(self):
+        return self.duree_attente / self.attentes if self.attentes else 0
+
+
+class Limiteur:
+    def __init__(self, nom, debit, capacite):
+        self.nom = nom
+        self.debit = debit
+        self.capacite = capacite
+        self.statistiques = Statistiques()
+
+    def acquiert(self, bloquant=True, attente_max=None):
+        """consomme un jeton et renvoie True, ou renvoie False si aucun jeton n'est disponible à temps
+
+        en mode non bloquant, renvoie False immédiatement si aucun jeton n'est disponible
+        """
+        if not bloquant:
+            attente_max = 0
+        elif attente_max is None:
+            attente_max = (
+                math.inf
+                if _attente_illimitee.get()
+                else settings.API_LIMITEUR_ATTENTE_MAX
+            )
+
+        attente = self._reserve(attente_max)
+        if attente is None:
+            self.statistiques.refus += 1
+            return False
+        if attente > 0:
+            time.sleep(attente)
+            self.statistiques.attentes += 1
+            self.statistiques.duree_attente += attente
+        self.statistiques.acquisitions += 1
+        return True
+
+    def _reserve(self, attente_max):
+        # réserve un jeton et renvoie le temps d'attente avant de pouvoir l'utiliser,
+        # ou None (sans rien réserver) si ce temps dépasse attente_max
+        maintenant = time.time()
+        with transaction.atomic():
+            seau, _ = SeauDeJetons.objects.select_for_update().get_or_create(
+                nom=self.nom,
+                defaults={"jetons": self.capacite, "horodatage": maintenant},
+            )
+            jetons = min(
+                self.capacite,
+                seau.jetons + max(maintenant - seau.horodatage, 0) * self.debit,
+            )
+            attente = max(1 - jetons, 0) / self.debit
+            if attente > attente_max:
+                return None
+            # le nombre de jetons devient négatif quand des jetons sont réservés à l'avance
+            seau.jetons = jetons - 1
+            seau.horodatage = maintenant
+            seau.save(update_fields=["jetons", "horodatage"])
+        return attente
+
+
+_limiteurs = {}
+
+
+def limiteur(url):
+    # renvoie le limiteur de l'hôte de l'url, ou None si ses appels ne sont pas limités
+    hote = urlsplit(url).hostname
+    if (limite := settings.API_LIMITES_DEBIT.get(hote)) is None:
+        return None
+    debit, capacite = limite
+    limiteur_hote = _limiteurs.get(hote)
+    if (
+        limiteur_hote is None
+        or limiteur_hote.debit != debit
+        or limiteur_hote.capacite != capacite
+    ):
+        limiteur_hote = _limiteurs[hote] = Limiteur(hote, debit, capacite)
+    return limiteur_hote
+
+
+def acquiert_pour(url):
+    if (limiteur_hote := limiteur(url)) is not None:
+        if not limiteur_hote.acquiert():
+            raise LimiteDebitError(TOO_MANY_REQUESTS_ERROR)
+
+
+def statistiques():
+    return {
+        nom: limiteur_hote.statistiques for nom, limiteur_hote in _limiteurs.items()
+    }
+
+
+@contextmanager
+def attente_illimitee():
+    """les appels effectués dans le bloc attendent leur jeton aussi longtemps que nécessaire"""
+    jeton = _attente_illimitee.set(True)
+    try:
+        yield
+    finally:
+        _attente_illimitee.reset(jeton)
@@ -0,0 +1,152 @@
+from datetime import date
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from api import transport
+from api.import_stock import lignes
+from api.import_stock import lignes_csv
+from api.import_stock import TAILLE_LOT
+from api.models import RatiosFinanciers
+from api.ratios_financiers import tranche_chiffre_affaires
+
+# export complet du jeu de données interrogé par l'API ratios financiers (cf. api.ratios_financiers)
+EXPORT_URL = "https://data.economie.gouv.fr/api/explore/v2.1/catalog/datasets/ratios_inpi_bce/exports/csv"
+EXPORT_TIMEOUT = 60
+COLONNES = ["siren", "date_cloture_exercice", "type_bilan", "chiffre_d_affaires"]
+TYPES_BILAN = ("C", "S", "K")
+
+# hors import complet, seuls les exercices clos depuis moins de 2 ans avant le dernier exercice connu
+# sont téléchargés : les comptes sont déposés dans les mois qui suivent la clôture
+PROFONDEUR_IMPORT_INCREMENTAL = relativedelta(years=2)
+
+
+class Command(BaseCommand):
+    help = "Importe le dernier exercice comptable par SIREN et type de bilan du jeu de données ratios_inpi_bce"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fichier",
+            help="chemin d'un export CSV (séparateur ;) déjà téléchargé, à la place du téléchargement",
+        )
+        parser.add_argument(
+            "--complet",
+            action="store_true",
+            help="importe tous les exercices au lieu des seuls exercices récents",
+        )
+
+    def handle(self, *args, **options):
+        start_time = datetime.now()
+
+        if options["fichier"]:
+            lignes_export = lignes(options["fichier"], COLONNES, delimiter=";")
+        else:
+            depuis = None if options["complet"] else self._debut_import_incremental()
+            self.stdout.write(
+                self.style.NOTICE(
+                    f" > téléchargement des exercices clos depuis le {depuis}"
+                    if depuis
+                    else " > téléchargement de tous les exercices"
+                )
+            )
+            lignes_export = self._telecharge(depuis)
+
+        nombre = self._importe(lignes_export, date.today())
+
+        processing_time = (datetime.now() - start_time).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{nombre} exercices mis à jour en {processing_time:.2f} secondes"
+            )
+        )
+
+    def _debut_import_incremental(self):
+        dernier_exercice = RatiosFinanciers.objects.aggregate(
+            Max("date_cloture_exercice")
+        )["date_cloture_exercice__max"]
+        return (
+            dernier_exercice - PROFONDEUR_IMPORT_INCREMENTAL
+            if dernier_exercice
+            else None
+        )
+
+    def _telecharge(self, depuis):
+        params = {"select": ",".join(COLONNES), "delimiter": ";"}
+        if depuis:
+            params["where"] = f"date_cloture_exercice >= date'{depuis.isoformat()}'"
+        with transport.get(
+            EXPORT_URL, params=params, stream=True, timeout=EXPORT_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            response.encoding = "utf-8"
+            yield from lignes_csv(
+                response.iter_lines(decode_unicode=True), COLONNES, delimiter=";"
+            )
+
+    def _importe(self, lignes_export, date_import):
+        nombre = 0
+        lot = {}
+        for ligne in lignes_export:
+            if ratios := convertit_ratios(ligne, date_import):
+                cle = (ratios.siren, ratios.type_bilan)
+                # seul le dernier exercice est conservé par SIREN et type de bilan
+                if (
+                    cle not in lot
+                    or lot[cle].date_cloture_exercice < ratios.date_cloture_exercice
+                ):
+                    lot[cle] = ratios
+            if len(lot) >= TAILLE_LOT:
+                nombre += self._enregistre(lot)
+                lot = {}
+        if lot:
+            nombre += self._enregistre(lot)
+        return nombre
+
+    def _enregistre(self, lot):
+        # un exercice plus ancien que celui déjà enregistré est ignoré
+        for ratios in RatiosFinanciers.objects.filter(
+            siren__in={siren for siren, _ in lot}
+        ):
+            cle = (ratios.siren, ratios.type_bilan)
+            if (
+                cle in lot
+                and lot[cle].date_cloture_exercice < ratios.date_cloture_exercice
+            ):
+                del lot[cle]
+        RatiosFinanciers.objects.bulk_create(
+            lot.values(),
+            update_conflicts=True,
+            unique_fields=["siren", "type_bilan"],
+            update_fields=[
+                "date_cloture_exercice",
+                "tranche_chiffre_affaires",
+                "date_import",
+            ],
+        )
+        return len(lot)
+
+
+def convertit_ratios(ligne, date_import):
+    try:
+        # l'export peut présenter les montants sous forme décimale
+        chiffre_affaires = int(float(ligne["chiffre_d_affaires"]))
+    except (ValueError, TypeError):
+        chiffre_affaires = None
+    if (
+        chiffre_affaires is None
+        or ligne["type_bilan"] not in TYPES_BILAN
+        or not ligne["date_cloture_exercice"]
+    ):
+        return None
+    return RatiosFinanciers(
+        siren=ligne["siren"],
+        type_bilan=ligne["type_bilan"],
+        date_cloture_exercice=date.fromisoformat(ligne["date_cloture_exercice"]),
+        # la tranche est calculée à l'import comme pour les réponses de l'API
+        tranche_chiffre_affaires=tranche_chiffre_affaires(
+            chiffre_affaires, ligne["type_bilan"]
+        ),
+        date_import=date_import,
+    )
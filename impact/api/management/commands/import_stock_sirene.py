@@ -0,0 +1,161 @@
+from datetime import date
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.import_stock import entier_ou_none
+from api.import_stock import lignes
+from api.import_stock import par_lots
+from api.models import UniteLegale
+
+# Fichiers open data du répertoire Sirene (plusieurs Go) : https://www.data.gouv.fr/fr/datasets/base-sirene-des-entreprises-et-de-leurs-etablissements-siren-siret/
+
+COLONNES_UNITES_LEGALES = [
+    "siren",
+    "statutDiffusionUniteLegale",
+    "etatAdministratifUniteLegale",
+    "denominationUniteLegale",
+    "nomUniteLegale",
+    "categorieJuridiqueUniteLegale",
+    "activitePrincipaleUniteLegale",
+    "nomenclatureActivitePrincipaleUniteLegale",
+    "trancheEffectifsUniteLegale",
+]
+COLONNES_ETABLISSEMENTS = [
+    "siren",
+    "etablissementSiege",
+    "codePostalEtablissement",
+    "codePaysEtrangerEtablissement",
+]
+
+
+class Command(BaseCommand):
+    help = "Importe le stock des unités légales Sirene (CSV, CSV zippé ou Parquet) dans la table locale consultée avant les API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "unites_legales",
+            help="chemin du fichier StockUniteLegale",
+        )
+        parser.add_argument(
+            "--etablissements",
+            help="chemin du fichier StockEtablissement, pour renseigner le code postal et le pays du siège",
+        )
+
+    def handle(self, *args, **options):
+        start_time = datetime.now()
+        date_import = date.today()
+
+        self.stdout.write(self.style.NOTICE(" > import des unités légales"))
+        nombre = self._importe_unites_legales(options["unites_legales"], date_import)
+        self.stdout.write(f" > {nombre} unités légales importées")
+
+        # les unités légales absentes du nouveau stock (cessées ou devenues non diffusibles) sont retirées
+        supprimees, _ = UniteLegale.objects.filter(date_import__lt=date_import).delete()
+        self.stdout.write(f" > {supprimees} unités légales supprimées")
+
+        if options["etablissements"]:
+            self.stdout.write(self.style.NOTICE(" > import des sièges"))
+            nombre = self._importe_sieges(options["etablissements"], date_import)
+            self.stdout.write(f" > {nombre} sièges importés")
+
+        processing_time = (datetime.now() - start_time).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Commande exécutée avec succès en {processing_time:.2f} secondes"
+            )
+        )
+
+    def _importe_unites_legales(self, chemin, date_import):
+        nombre = 0
+        unites_legales = (
+            unite_legale
+            for ligne in lignes(chemin, COLONNES_UNITES_LEGALES)
+            if (unite_legale := convertit_unite_legale(ligne, date_import))
+        )
+        for lot in par_lots(unites_legales):
+            # le siège de l'import précédent est oublié : il n'est renseigné que par le stock des établissements
+            # importé avec ce stock des unités légales (cf. _importe_sieges)
+            UniteLegale.objects.bulk_create(
+                lot,
+                update_conflicts=True,
+                unique_fields=["siren"],
+                update_fields=[
+                    "denomination",
+                    "categorie_juridique_sirene",
+                    "code_NAF",
+                    "tranche_effectif",
+                    "siege_connu",
+                    "code_postal",
+                    "code_pays_etranger_sirene",
+                    "date_import",
+                ],
+            )
+            nombre += len(lot)
+        return nombre
+
+    def _importe_sieges(self, chemin, date_import):
+        nombre = 0
+        sieges = (
+            UniteLegale(
+                siren=ligne["siren"],
+                siege_connu=True,
+                code_postal=ligne["codePostalEtablissement"] or None,
+                code_pays_etranger_sirene=entier_ou_none(
+                    ligne["codePaysEtrangerEtablissement"]
+                ),
+                # valeurs requises par l'insertion, jamais écrites : seules les unités légales existantes sont mises à jour
+                denomination="",
+                date_import=date_import,
+            )
+            for ligne in lignes(chemin, COLONNES_ETABLISSEMENTS)
+            if str(ligne["etablissementSiege"]).lower() == "true"
+        )
+        for lot in par_lots(sieges):
+            # les sièges des unités légales absentes de la table sont ignorés
+            existantes = set(
+                UniteLegale.objects.filter(
+                    siren__in=[siege.siren for siege in lot]
+                ).values_list("siren", flat=True)
+            )
+            lot = [siege for siege in lot if siege.siren in existantes]
+            UniteLegale.objects.bulk_create(
+                lot,
+                update_conflicts=True,
+                unique_fields=["siren"],
+                update_fields=[
+                    "siege_connu",
+                    "code_postal",
+                    "code_pays_etranger_sirene",
+                ],
+            )
+            nombre += len(lot)
+        return nombre
+
+
+def convertit_unite_legale(ligne, date_import):
+    # seules les unités légales actives et diffusibles sont conservées,
+    # les autres restent recherchées sur les API
+    if (
+        ligne["statutDiffusionUniteLegale"] != "O"
+        or ligne["etatAdministratifUniteLegale"] != "A"
+    ):
+        return None
+    denomination = ligne["denominationUniteLegale"] or ligne["nomUniteLegale"]
+    if not denomination:
+        return None
+    return UniteLegale(
+        siren=ligne["siren"],
+        denomination=denomination[:255],
+        categorie_juridique_sirene=entier_ou_none(
+            ligne["categorieJuridiqueUniteLegale"]
+        ),
+        # même format que l'API Sirene, pour la nomenclature NAF en vigueur
+        code_NAF=(
+            ligne["activitePrincipaleUniteLegale"] or None
+            if ligne["nomenclatureActivitePrincipaleUniteLegale"] == "NAFRev2"
+            else None
+        ),
+        tranche_effectif=ligne["trancheEffectifsUniteLegale"] or None,
+        date_import=date_import,
+    )
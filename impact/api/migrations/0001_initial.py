@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:12
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SeauDeJetons",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nom", models.CharField(max_length=255, unique=True)),
+                ("jetons", models.FloatField()),
+                ("horodatage", models.FloatField()),
+            ],
+            options={
+                "verbose_name": "seau de jetons",
+                "verbose_name_plural": "seaux de jetons",
+            },
+        ),
+    ]
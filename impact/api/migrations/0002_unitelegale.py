@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:17
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UniteLegale",
+            fields=[
+                (
+                    "siren",
+                    models.CharField(max_length=9, primary_key=True, serialize=False),
+                ),
+                ("denomination", models.CharField(max_length=255)),
+                ("categorie_juridique_sirene", models.IntegerField(null=True)),
+                ("code_NAF", models.CharField(max_length=6, null=True)),
+                ("tranche_effectif", models.CharField(max_length=2, null=True)),
+                ("siege_connu", models.BooleanField(default=False)),
+                ("code_postal", models.CharField(max_length=5, null=True)),
+                ("code_pays_etranger_sirene", models.IntegerField(null=True)),
+                ("date_import", models.DateField()),
+            ],
+            options={
+                "verbose_name": "unité légale Sirene",
+                "verbose_name_plural": "unités légales Sirene",
+            },
+        ),
+    ]
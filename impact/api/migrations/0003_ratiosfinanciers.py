@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:20
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_unitelegale"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatiosFinanciers",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("siren", models.CharField(max_length=9)),
+                ("type_bilan", models.CharField(max_length=1)),
+                ("date_cloture_exercice", models.DateField()),
+                ("tranche_chiffre_affaires", models.CharField(max_length=9)),
+                ("date_import", models.DateField()),
+            ],
+            options={
+                "verbose_name": "ratios financiers",
+                "verbose_name_plural": "ratios financiers",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("siren", "type_bilan"), name="unique_ratios_financiers"
+                    )
+                ],
+            },
+        ),
+    ]
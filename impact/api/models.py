@@ -0,0 +1,63 @@
+from django.db import models
+
+
+# État d'un seau à jetons du limiteur de débit (cf. api.limiteur), partagé entre tous les workers et commandes
+class SeauDeJetons(models.Model):
+    nom = models.CharField(max_length=255, unique=True)
+    jetons = models.FloatField()
+    # timestamp (en secondes) du dernier remplissage, pour calculer les jetons regagnés depuis
+    horodatage = models.FloatField()
+
+    class Meta:
+        verbose_name = "seau de jetons"
+        verbose_name_plural = "seaux de jetons"
+
+    def __str__(self):
+        return self.nom
+
+
+# Copie locale du stock des unités légales (entreprises) du répertoire Sirene de l'Insee,
+# importée par la commande `import_stock_sirene` et consultée avant les API (cf. api.infos_entreprise)
+class UniteLegale(models.Model):
+    siren = models.CharField(max_length=9, primary_key=True)
+    denomination = models.CharField(max_length=255)
+    categorie_juridique_sirene = models.IntegerField(null=True)
+    code_NAF = models.CharField(max_length=6, null=True)
+    # code Insee de la tranche d'effectif, converti à la lecture comme pour l'API Sirene
+    tranche_effectif = models.CharField(max_length=2, null=True)
+    # les informations du siège proviennent du stock des établissements, importé séparément
+    siege_connu = models.BooleanField(default=False)
+    code_postal = models.CharField(max_length=5, null=True)
+    code_pays_etranger_sirene = models.IntegerField(null=True)
+    date_import = models.DateField()
+
+    class Meta:
+        verbose_name = "unité légale Sirene"
+        verbose_name_plural = "unités légales Sirene"
+
+    def __str__(self):
+        return f"{self.siren} {self.denomination}"
+
+
+# Dernier exercice comptable par SIREN et type de bilan issu du jeu de données ratios_inpi_bce,
+# importé par la commande `import_ratios_financiers` et consulté avant l'API (cf. api.ratios_financiers)
+class RatiosFinanciers(models.Model):
+    siren = models.CharField(max_length=9)
+    # C : bilan complet, S : bilan simplifié, K : bilan consolidé
+    type_bilan = models.CharField(max_length=1)
+    date_cloture_exercice = models.DateField()
+    # tranche déjà calculée, parmi CaracteristiquesAnnuelles.CA_CHOICES ou CA_CONSOLIDE_CHOICES selon le type de bilan
+    tranche_chiffre_affaires = models.CharField(max_length=9)
+    date_import = models.DateField()
+
+    class Meta:
+        verbose_name = "ratios financiers"
+        verbose_name_plural = "ratios financiers"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["siren", "type_bilan"], name="unique_ratios_financiers"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.siren} {self.type_bilan} {self.date_cloture_exercice}"
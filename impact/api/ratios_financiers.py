@@ -1,11 +1,14 @@
 from datetime import date
 
-import requests
 import sentry_sdk
+from django.conf import settings
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
+from api.exceptions import LimiteDebitError
 from api.exceptions import ServerError
+from api.models import RatiosFinanciers
 from entreprises.models import CaracteristiquesAnnuelles
 
 NOM_API = "ratios financiers"
@@ -15,7 +18,7 @@ RATIOS_FINANCIERS_TIMEOUT = 3
 def dernier_exercice_comptable(siren):
     donnees_financieres = dernier_exercice_comptable_vide()
     try:
-        response = requests.get(
+        response = transport.get(
             "https://data.economie.gouv.fr/api/records/1.0/search/",
             params={
                 "dataset": "ratios_inpi_bce",
@@ -24,6 +27,9 @@ def dernier_exercice_comptable(siren):
             },
             timeout=RATIOS_FINANCIERS_TIMEOUT,
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
@@ -34,9 +40,9 @@ def dernier_exercice_comptable(siren):
         try:
             record = response.json()["records"][0]
             fields = record["fields"]
-            donnees_financieres[
-                "date_cloture_exercice"
-            ] = _extrait_date_cloture_exercice(fields)
+            donnees_financieres["date_cloture_exercice"] = (
+                _extrait_date_cloture_exercice(fields)
+            )
             donnees_financieres.update(_extrait_chiffre_affaires(fields))
         except IndexError:
             pass
@@ -54,6 +60,26 @@ def dernier_exercice_comptable(siren):
     return donnees_financieres
 
 
+def dernier_exercice_comptable_local(siren):
+    # données importées par la commande `import_ratios_financiers`, None si le SIREN n'y figure pas
+    if not settings.API_STOCK_RATIOS_FINANCIERS_ACTIF:
+        return None
+    ratios = list(
+        RatiosFinanciers.objects.filter(siren=siren).order_by("-date_cloture_exercice")
+    )
+    if not ratios:
+        return None
+    # comme pour l'API, seuls les bilans du dernier exercice sont retenus
+    donnees_financieres = dernier_exercice_comptable_vide()
+    donnees_financieres["date_cloture_exercice"] = ratios[0].date_cloture_exercice
+    for ratio in ratios:
+        if ratio.date_cloture_exercice == donnees_financieres["date_cloture_exercice"]:
+            donnees_financieres[champ_tranche_chiffre_affaires(ratio.type_bilan)] = (
+                ratio.tranche_chiffre_affaires
+            )
+    return donnees_financieres
+
+
 def dernier_exercice_comptable_vide():
     return {
         "date_cloture_exercice": None,
@@ -67,33 +93,34 @@ def _extrait_date_cloture_exercice(fields):
 
 
 def _extrait_chiffre_affaires(fields):
-    donnees_financieres = {}
     chiffre_affaires = int(fields["chiffre_d_affaires"])
     type_bilan = fields["type_bilan"]
+    if tranche := tranche_chiffre_affaires(chiffre_affaires, type_bilan):
+        return {champ_tranche_chiffre_affaires(type_bilan): tranche}
+    return {}
+
+
+def champ_tranche_chiffre_affaires(type_bilan):
+    if type_bilan == "K":  # bilan consolidé
+        return "tranche_chiffre_affaires_consolide"
+    return "tranche_chiffre_affaires"
+
+
+def tranche_chiffre_affaires(chiffre_affaires, type_bilan):
     if type_bilan in ("C", "S"):  # bilan complet ou simplifié
         if chiffre_affaires < 900_000:  # 0-900k
-            tranche_chiffre_affaires = CaracteristiquesAnnuelles.CA_MOINS_DE_900K
+            return CaracteristiquesAnnuelles.CA_MOINS_DE_900K
         elif chiffre_affaires < 50_000_000:  # 900k-50M
-            tranche_chiffre_affaires = CaracteristiquesAnnuelles.CA_ENTRE_900K_ET_50M
+            return CaracteristiquesAnnuelles.CA_ENTRE_900K_ET_50M
         elif chiffre_affaires < 100_000_000:  # 50M-100M
-            tranche_chiffre_affaires = CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M
+            return CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M
         else:  # 100M+
-            tranche_chiffre_affaires = CaracteristiquesAnnuelles.CA_100M_ET_PLUS
-        donnees_financieres["tranche_chiffre_affaires"] = tranche_chiffre_affaires
+            return CaracteristiquesAnnuelles.CA_100M_ET_PLUS
     elif type_bilan == "K":  # bilan consolidé
         if chiffre_affaires < 60_000_000:  # 0-60M
-            tranche_chiffre_affaires_consolide = (
-                CaracteristiquesAnnuelles.CA_MOINS_DE_60M
-            )
+            return CaracteristiquesAnnuelles.CA_MOINS_DE_60M
         elif chiffre_affaires < 100_000_000:  # 60M-100M
-            tranche_chiffre_affaires_consolide = (
-                CaracteristiquesAnnuelles.CA_ENTRE_60M_ET_100M
-            )
+            return CaracteristiquesAnnuelles.CA_ENTRE_60M_ET_100M
         else:  # 100M+
-            tranche_chiffre_affaires_consolide = (
-                CaracteristiquesAnnuelles.CA_100M_ET_PLUS
-            )
-        donnees_financieres[
-            "tranche_chiffre_affaires_consolide"
-        ] = tranche_chiffre_affaires_consolide
-    return donnees_financieres
+            return CaracteristiquesAnnuelles.CA_100M_ET_PLUS
+    return None
@@ -1,9 +1,10 @@
-import requests
 import sentry_sdk
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
 from api.exceptions import INVALID_REQUEST_SENTRY_MESSAGE
+from api.exceptions import LimiteDebitError
 from api.exceptions import SERVER_ERROR
 from api.exceptions import ServerError
 from api.exceptions import SIREN_NOT_FOUND_ERROR
@@ -23,7 +24,10 @@ RECHERCHE_ENTREPRISE_TIMEOUT = 3
 def recherche_par_siren(siren):
     try:
         url = f"https://recherche-entreprises.api.gouv.fr/search?q={siren}&page=1&per_page=1&mtm_campaign=portail-rse"
-        response = requests.get(url, timeout=RECHERCHE_ENTREPRISE_TIMEOUT)
+        response = transport.get(url, timeout=RECHERCHE_ENTREPRISE_TIMEOUT)
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
@@ -116,9 +120,12 @@ def recherche_textuelle(recherche):
         ]
 
     try:
-        response = requests.get(
+        response = transport.get(
             url, params=params, timeout=RECHERCHE_ENTREPRISE_TIMEOUT
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
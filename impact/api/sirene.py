@@ -1,11 +1,12 @@
 from datetime import date
 
-import requests
 import sentry_sdk
 from django.conf import settings
 
+from api import transport
 from api.exceptions import API_ERROR_SENTRY_MESSAGE
 from api.exceptions import APIError
+from api.exceptions import LimiteDebitError
 from api.exceptions import SERVER_ERROR
 from api.exceptions import ServerError
 from api.exceptions import SIREN_NOT_FOUND_ERROR
@@ -24,11 +25,14 @@ def recherche_unite_legale_par_siren(siren):
     # documentation api sirene 3.11 https://portail-api.insee.fr/catalog/api/2ba0e549-5587-3ef1-9082-99cd865de66f/doc
     url = f"https://api.insee.fr/api-sirene/3.11/siren/{siren}?date={date.today().isoformat()}"
     try:
-        response = requests.get(
+        response = transport.get(
             url,
             headers={"X-INSEE-Api-Key-Integration": settings.API_SIRENE_KEY},
             timeout=SIRENE_TIMEOUT,
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
@@ -124,12 +128,15 @@ def recherche_unites_legales_par_nom_ou_siren(recherche):
     }
 
     try:
-        response = requests.get(
+        response = transport.get(
             url,
             params=params,
             headers={"X-INSEE-Api-Key-Integration": settings.API_SIRENE_KEY},
             timeout=SIRENE_TIMEOUT,
         )
+    except LimiteDebitError:
+        # refus du limiteur de débit local, transmis tel quel (ni Sentry ni erreur du serveur)
+        raise
     except Exception as e:
         with sentry_sdk.new_scope() as scope:
             scope.set_level("info")
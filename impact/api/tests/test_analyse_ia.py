@@ -12,13 +12,13 @@ CALLBACK_URL = "https://callback.test"
 
 
 def test_succès_lancement_analyse(mocker, settings):
-    settings.API_ANALYSE_IA_BASE_URL = (
-        API_ANALYSE_IA_BASE_URL
-    ) = "https://analyse-ia.test"
+    settings.API_ANALYSE_IA_BASE_URL = API_ANALYSE_IA_BASE_URL = (
+        "https://analyse-ia.test"
+    )
     settings.API_ANALYSE_IA_TOKEN = API_ANALYSE_IA_TOKEN = "TOKEN"
     json_content = {"status": "processing"}
     faked_request = mocker.patch(
-        "requests.post", return_value=MockedResponse(200, json_content)
+        "api.transport.post", return_value=MockedResponse(200, json_content)
     )
 
     etat = lancement_analyse(DOCUMENT_ID, DOCUMENT_URL, CALLBACK_URL)
@@ -38,7 +38,7 @@ def test_succès_lancement_analyse(mocker, settings):
 
 def test_echec_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
-    mocker.patch("requests.post", side_effect=Timeout)
+    mocker.patch("api.transport.post", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError) as e:
@@ -54,7 +54,7 @@ def test_echec_exception_provoquee_par_l_api(mocker):
 
 
 def test_echec_erreur_de_l_API(mocker):
-    mocker.patch("requests.post", return_value=MockedResponse(500))
+    mocker.patch("api.transport.post", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError) as e:
@@ -70,7 +70,7 @@ def test_echec_erreur_de_l_API(mocker):
 def test_succès_lancement_analyse_mais_status_manquant(mocker):
     json_content = {}
     faked_request = mocker.patch(
-        "requests.post", return_value=MockedResponse(200, json_content)
+        "api.transport.post", return_value=MockedResponse(200, json_content)
     )
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
@@ -0,0 +1,132 @@
+import pytest
+from django.core.cache import caches
+from freezegun import freeze_time
+
+from api.cache import CacheAPI
+from api.exceptions import APIError
+
+CLE = "123456789"
+
+
+@pytest.fixture
+def cache_api(settings):
+    settings.API_CACHE_TEST_TTL = 60
+    settings.API_CACHE_PERIME_TTL = 3600
+    return CacheAPI("test", "API_CACHE_TEST_TTL")
+
+
+@pytest.fixture
+def revalidation_synchrone(mocker):
+    return mocker.patch(
+        "api.cache._executeur.submit",
+        side_effect=lambda fonction, *args: fonction(*args),
+    )
+
+
+def test_miss_puis_hit_local(cache_api, mocker):
+    fonction = mocker.Mock(return_value={"siren": CLE})
+
+    assert cache_api.get(CLE, fonction) == {"siren": CLE}
+    assert cache_api.get(CLE, fonction) == {"siren": CLE}
+
+    fonction.assert_called_once_with()
+    assert cache_api.statistiques.misses == 1
+    assert cache_api.statistiques.hits_local == 1
+
+
+def test_hit_partage_quand_le_cache_local_est_vide(cache_api, mocker):
+    fonction = mocker.Mock(return_value={"siren": CLE})
+    cache_api.get(CLE, fonction)
+    caches["default"].clear()
+
+    assert cache_api.get(CLE, fonction) == {"siren": CLE}
+
+    fonction.assert_called_once_with()
+    assert cache_api.statistiques.hits_partage == 1
+    assert cache_api.statistiques.hits == 1
+
+
+def test_hit_partage_depuis_le_cache_en_base(
+    cache_api, cache_partage_en_base, mocker, django_assert_num_queries
+):
+    fonction = mocker.Mock(return_value={"siren": CLE})
+    cache_api.get(CLE, fonction)
+    caches["default"].clear()
+
+    with django_assert_num_queries(1):
+        assert cache_api.get(CLE, fonction) == {"siren": CLE}
+    # la valeur est ensuite lue dans le cache local
+    with django_assert_num_queries(0):
+        assert cache_api.get(CLE, fonction) == {"siren": CLE}
+
+    fonction.assert_called_once_with()
+    assert cache_api.statistiques.hits_partage == 1
+
+
+def test_les_erreurs_ne_sont_pas_mises_en_cache(cache_api, mocker):
+    fonction = mocker.Mock(side_effect=APIError)
+
+    for _ in range(2):
+        with pytest.raises(APIError):
+            cache_api.get(CLE, fonction)
+
+    assert fonction.call_count == 2
+    assert cache_api.statistiques.misses == 2
+
+
+def test_valeur_perimee_servie_puis_revalidee(
+    cache_api, mocker, revalidation_synchrone
+):
+    fonction = mocker.Mock(side_effect=[{"version": 1}, {"version": 2}])
+    with freeze_time("2025-01-01 12:00:00"):
+        cache_api.get(CLE, fonction)
+
+    with freeze_time("2025-01-01 12:05:00"):
+        assert cache_api.get(CLE, fonction) == {"version": 1}
+        assert cache_api.get(CLE, fonction) == {"version": 2}
+
+    assert fonction.call_count == 2
+    assert cache_api.statistiques.hits_perimes == 1
+
+
+def test_valeur_perimee_conservee_si_la_revalidation_echoue(
+    cache_api, mocker, revalidation_synchrone
+):
+    fonction = mocker.Mock(side_effect=[{"version": 1}, APIError])
+    with freeze_time("2025-01-01 12:00:00"):
+        cache_api.get(CLE, fonction)
+
+    with freeze_time("2025-01-01 12:05:00"):
+        assert cache_api.get(CLE, fonction) == {"version": 1}
+
+    assert fonction.call_count == 2
+
+
+def test_actualisation_ignore_le_cache_et_le_remplace(cache_api, mocker):
+    fonction = mocker.Mock(side_effect=[{"version": 1}, {"version": 2}])
+    cache_api.get(CLE, fonction)
+
+    assert cache_api.get(CLE, fonction, actualise=True) == {"version": 2}
+    assert cache_api.get(CLE, fonction) == {"version": 2}
+
+    assert fonction.call_count == 2
+
+
+def test_actualisation_sans_repli_sur_la_valeur_perimee(cache_api, mocker):
+    fonction = mocker.Mock(side_effect=[{"version": 1}, APIError])
+    with freeze_time("2025-01-01 12:00:00"):
+        cache_api.get(CLE, fonction)
+
+    with freeze_time("2025-01-01 12:05:00"):
+        with pytest.raises(APIError):
+            cache_api.get(CLE, fonction, actualise=True)
+
+
+def test_invalide(cache_api, mocker):
+    fonction = mocker.Mock(return_value={"siren": CLE})
+    cache_api.get(CLE, fonction)
+
+    cache_api.invalide(CLE)
+    cache_api.get(CLE, fonction)
+
+    assert fonction.call_count == 2
@@ -0,0 +1,211 @@
+import pytest
+from django.core.cache import caches
+from freezegun import freeze_time
+
+from api.disjoncteur import Disjoncteur
+from api.disjoncteur import FERME
+from api.disjoncteur import OUVERT
+from api.disjoncteur import SEMI_OUVERT
+from api.exceptions import APIError
+from api.exceptions import DisjoncteurOuvertError
+from api.exceptions import LimiteDebitError
+from api.exceptions import SirenError
+from logs.models import EventLog
+
+
+@pytest.fixture
+def disjoncteur(settings):
+    settings.API_DISJONCTEUR_FENETRE = 60
+    settings.API_DISJONCTEUR_NOMBRE_MINIMUM_APPELS = 4
+    settings.API_DISJONCTEUR_SEUIL_ECHECS = 0.5
+    settings.API_DISJONCTEUR_SEUIL_LATENCE = 2
+    settings.API_DISJONCTEUR_DUREE_OUVERTURE = 30
+    return Disjoncteur("test")
+
+
+def _echoue():
+    raise APIError()
+
+
+def _reussit():
+    return "ok"
+
+
+def _ouvre(disjoncteur):
+    for _ in range(4):
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+
+
+@pytest.mark.django_db
+def test_ouverture_apres_trop_d_echecs(disjoncteur, mocker):
+    with freeze_time("2025-01-01 12:00:00"):
+        disjoncteur.appelle(_reussit)
+        disjoncteur.appelle(_reussit)
+        assert disjoncteur.etat == FERME
+
+        _ouvre(disjoncteur)
+        assert disjoncteur.etat == OUVERT
+
+        fonction = mocker.Mock()
+        with pytest.raises(DisjoncteurOuvertError):
+            disjoncteur.appelle(fonction)
+        assert not fonction.called
+
+    log = EventLog.objects.get()
+    assert log.msg == "api:disjoncteur"
+    assert log.payload == {"api": "test", "etat": OUVERT, "etatPrecedent": FERME}
+
+
+def test_reste_ferme_sous_le_nombre_minimum_d_appels(disjoncteur):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+
+    assert disjoncteur.etat == FERME
+
+
+def test_les_erreurs_fonctionnelles_ne_comptent_pas(disjoncteur):
+    def siren_inconnu():
+        raise SirenError()
+
+    for _ in range(5):
+        with pytest.raises(SirenError):
+            disjoncteur.appelle(siren_inconnu)
+
+    assert disjoncteur.etat == FERME
+
+
+@pytest.mark.django_db
+def test_les_appels_trop_lents_comptent_comme_des_echecs(disjoncteur, mocker):
+    mocker.patch("api.disjoncteur.time.monotonic", side_effect=[0, 3] * 4)
+
+    for _ in range(4):
+        disjoncteur.appelle(_reussit)
+
+    assert disjoncteur.etat == OUVERT
+
+
+@pytest.mark.django_db
+def test_appel_de_test_reussi_referme_le_disjoncteur(disjoncteur):
+    with freeze_time("2025-01-01 12:00:00"):
+        _ouvre(disjoncteur)
+
+    with freeze_time("2025-01-01 12:00:31"):
+        assert disjoncteur.etat == SEMI_OUVERT
+        assert disjoncteur.appelle(_reussit) == "ok"
+        assert disjoncteur.etat == FERME
+
+        # la fenêtre est réinitialisée à la fermeture
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+        assert disjoncteur.etat == FERME
+
+    assert [log.payload["etat"] for log in EventLog.objects.order_by("created_at")] == [
+        OUVERT,
+        SEMI_OUVERT,
+        FERME,
+    ]
+
+
+@pytest.mark.django_db
+def test_appel_de_test_en_echec_rouvre_le_disjoncteur(disjoncteur):
+    with freeze_time("2025-01-01 12:00:00"):
+        _ouvre(disjoncteur)
+
+    with freeze_time("2025-01-01 12:00:31"):
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+
+        assert disjoncteur.etat == OUVERT
+
+
+@pytest.mark.django_db
+def test_un_seul_appel_de_test_a_la_fois(disjoncteur):
+    with freeze_time("2025-01-01 12:00:00"):
+        _ouvre(disjoncteur)
+
+    with freeze_time("2025-01-01 12:00:31"):
+
+        def appel_concurrent():
+            with pytest.raises(DisjoncteurOuvertError):
+                disjoncteur.appelle(_reussit)
+            return "ok"
+
+        assert disjoncteur.appelle(appel_concurrent) == "ok"
+
+
+def test_etat_partage_entre_les_workers_par_le_cache_en_base(
+    disjoncteur, cache_partage_en_base
+):
+    with freeze_time("2025-01-01 12:00:00"):
+        _ouvre(disjoncteur)
+        # un autre worker ne partage que le cache en base
+        caches["default"].clear()
+        autre_worker = Disjoncteur("test")
+
+        assert autre_worker.etat == OUVERT
+        with pytest.raises(DisjoncteurOuvertError):
+            autre_worker.appelle(_reussit)
+
+    with freeze_time("2025-01-01 12:00:31"):
+
+        def appel_concurrent():
+            with pytest.raises(DisjoncteurOuvertError):
+                autre_worker.appelle(_reussit)
+            return "ok"
+
+        assert disjoncteur.appelle(appel_concurrent) == "ok"
+        assert autre_worker.etat == FERME
+
+
+def test_appels_comptabilises_sans_ecriture_dans_le_cache_en_base(
+    disjoncteur, cache_partage_en_base, django_assert_num_queries
+):
+    # seule la lecture de l'état partagé est faite en base
+    with django_assert_num_queries(1):
+        disjoncteur.appelle(_reussit)
+    with django_assert_num_queries(1):
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+
+
+def test_echecs_comptabilises_par_worker(disjoncteur):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            disjoncteur.appelle(_echoue)
+    # un autre worker ne voit pas les échecs du premier
+    caches["default"].clear()
+
+    with pytest.raises(APIError):
+        disjoncteur.appelle(_echoue)
+
+    assert disjoncteur.etat == FERME
+
+
+def test_les_refus_du_limiteur_de_debit_ne_comptent_pas(disjoncteur):
+    def refuse():
+        raise LimiteDebitError()
+
+    for _ in range(5):
+        with pytest.raises(LimiteDebitError):
+            disjoncteur.appelle(refuse)
+
+    assert disjoncteur.etat == FERME
+
+
+@pytest.mark.django_db
+def test_refus_du_limiteur_de_debit_pendant_l_appel_de_test(disjoncteur):
+    def refuse():
+        raise LimiteDebitError()
+
+    with freeze_time("2025-01-01 12:00:00"):
+        _ouvre(disjoncteur)
+
+    with freeze_time("2025-01-01 12:00:31"):
+        with pytest.raises(LimiteDebitError):
+            disjoncteur.appelle(refuse)
+
+        # l'appel de test reste possible
+        assert disjoncteur.appelle(_reussit) == "ok"
+        assert disjoncteur.etat == FERME
@@ -16,7 +16,8 @@ def test_succes_is_index_egapro_published_avec_declaration(mocker):
     # Example response from https://egapro.travail.gouv.fr/api/public/declaration/552032534/2021
     index_egapro_data = """{"entreprise":{"siren":"552032534","r\u00e9gion":"\u00cele-de-France","code_naf":"70.10Z","effectif":{"total":867,"tranche":"251:999"},"d\u00e9partement":"Paris","raison_sociale":"DANONE"},"indicateurs":{"promotions":{"non_calculable":null,"note":15,"objectif_de_progression":null},"augmentations_et_promotions":{"non_calculable":null,"note":null,"objectif_de_progression":null},"r\u00e9mun\u00e9rations":{"non_calculable":null,"note":29,"objectif_de_progression":null},"cong\u00e9s_maternit\u00e9":{"non_calculable":null,"note":15,"objectif_de_progression":null},"hautes_r\u00e9mun\u00e9rations":{"non_calculable":null,"note":0,"objectif_de_progression":null,"r\u00e9sultat":1,"population_favorable":"femmes"}},"d\u00e9claration":{"index":79,"ann\u00e9e_indicateurs":2021,"mesures_correctives":null}}"""
     egapro_request = mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(200, json.loads(index_egapro_data)),
     )
 
     assert is_index_egapro_published(SIREN, 2021)
@@ -32,7 +33,8 @@ def test_succes_is_index_egapro_published_sans_declaration(mocker):
         """{"error":"No declaration with siren 889297453 and year 2020"}"""
     )
     egapro_request = mocker.patch(
-        "requests.get", return_value=MockedResponse(404, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(404, json.loads(index_egapro_data)),
     )
 
     assert not is_index_egapro_published(SIREN, 2020)
@@ -43,7 +45,7 @@ def test_succes_is_index_egapro_published_sans_declaration(mocker):
 
 
 def test_echec_is_index_egapro_published_requete_api_invalide(mocker):
-    mocker.patch("requests.get", return_value=MockedResponse(400))
+    mocker.patch("api.transport.get", return_value=MockedResponse(400))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError):
@@ -55,7 +57,7 @@ def test_echec_is_index_egapro_published_requete_api_invalide(mocker):
 
 
 def test_echec_is_index_egapro_published_erreur_de_l_api(mocker):
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError):
@@ -68,7 +70,7 @@ def test_echec_is_index_egapro_published_erreur_de_l_api(mocker):
 
 def test_echec_is_index_egapro_published_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
-    faked_request = mocker.patch("requests.get", side_effect=Timeout)
+    faked_request = mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError):
@@ -99,7 +101,8 @@ def test_succes_indicateurs_avec_un_seul_objectif_de_progression(mocker):
     index_egapro_data = """{"entreprise":{"siren":"552032534","r\u00e9gion":"\u00cele-de-France","code_naf":"70.10Z","effectif":{"total":867,"tranche":"251:999"},"d\u00e9partement":"Paris","raison_sociale":"DANONE"},"indicateurs":{"promotions":{"non_calculable":null,"note":15,"objectif_de_progression":null},"augmentations_et_promotions":{"non_calculable":null,"note":null,"objectif_de_progression":null},"r\u00e9mun\u00e9rations":{"non_calculable":null,"note":29,"objectif_de_progression":null},"cong\u00e9s_maternit\u00e9":{"non_calculable":null,"note":15,"objectif_de_progression":null},"hautes_r\u00e9mun\u00e9rations":{"non_calculable":null,"note":0,"objectif_de_progression":"plus dans le futur","r\u00e9sultat":1,"population_favorable":"femmes"}},"d\u00e9claration":{"index":79,"ann\u00e9e_indicateurs":2021,"mesures_correctives":null}}"""
 
     egapro_request = mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(200, json.loads(index_egapro_data)),
     )
 
     bdese_indicateurs = indicateurs_bdese(SIREN, 2021)
@@ -119,7 +122,8 @@ def test_succes_indicateurs_sans_objectif_de_progression(mocker):
     index_egapro_data = """{"entreprise":{"siren":"552032534","r\u00e9gion":"\u00cele-de-France","code_naf":"70.10Z","effectif":{"total":867,"tranche":"251:999"},"d\u00e9partement":"Paris","raison_sociale":"DANONE"},"indicateurs":{"promotions":{"non_calculable":null,"note":15,"objectif_de_progression":null},"augmentations_et_promotions":{"non_calculable":null,"note":null,"objectif_de_progression":null},"r\u00e9mun\u00e9rations":{"non_calculable":null,"note":29,"objectif_de_progression":null},"cong\u00e9s_maternit\u00e9":{"non_calculable":null,"note":15,"objectif_de_progression":null},"hautes_r\u00e9mun\u00e9rations":{"non_calculable":null,"note":0,"objectif_de_progression":null,"r\u00e9sultat":1,"population_favorable":"femmes"}},"d\u00e9claration":{"index":79,"ann\u00e9e_indicateurs":2021,"mesures_correctives":null}}"""
 
     mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(200, json.loads(index_egapro_data)),
     )
 
     bdese_indicateurs = indicateurs_bdese(SIREN, 2021)
@@ -132,7 +136,8 @@ def test_succes_indicateurs_avec_tous_les_objectifs_de_progression(mocker):
     index_egapro_data = """{"entreprise":{"siren":"552032534","r\u00e9gion":"\u00cele-de-France","code_naf":"70.10Z","effectif":{"total":867,"tranche":"251:999"},"d\u00e9partement":"Paris","raison_sociale":"DANONE"},"indicateurs":{"promotions":{"non_calculable":null,"note":15,"objectif_de_progression":"P1"},"augmentations_et_promotions":{"non_calculable":null,"note":null,"objectif_de_progression":"P2"},"r\u00e9mun\u00e9rations":{"non_calculable":null,"note":29,"objectif_de_progression":"P3"},"cong\u00e9s_maternit\u00e9":{"non_calculable":null,"note":15,"objectif_de_progression":"P4"},"hautes_r\u00e9mun\u00e9rations":{"non_calculable":null,"note":0,"objectif_de_progression":"P5","r\u00e9sultat":1,"population_favorable":"femmes"}},"d\u00e9claration":{"index":79,"ann\u00e9e_indicateurs":2021,"mesures_correctives":null}}"""
 
     mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(200, json.loads(index_egapro_data)),
     )
 
     bdese_indicateurs = indicateurs_bdese(SIREN, 2021)
@@ -150,7 +155,8 @@ def test_succes_indicateurs_sans_resultat(mocker):
     )
 
     mocker.patch(
-        "requests.get", return_value=MockedResponse(404, json.loads(index_egapro_data))
+        "api.transport.get",
+        return_value=MockedResponse(404, json.loads(index_egapro_data)),
     )
 
     bdese_indicateurs = indicateurs_bdese(SIREN, 1990)
@@ -162,7 +168,7 @@ def test_succes_indicateurs_sans_resultat(mocker):
 
 
 def test_echec_indicateurs_requete_api_invalide(mocker):
-    mocker.patch("requests.get", return_value=MockedResponse(400))
+    mocker.patch("api.transport.get", return_value=MockedResponse(400))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError):
@@ -174,7 +180,7 @@ def test_echec_indicateurs_requete_api_invalide(mocker):
 
 
 def test_echec_indicateurs_erreur_de_l_api(mocker):
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError):
@@ -187,7 +193,7 @@ def test_echec_indicateurs_erreur_de_l_api(mocker):
 
 def test_echec_indicateurs_bdese_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
-    faked_request = mocker.patch("requests.get", side_effect=Timeout)
+    faked_request = mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError):
@@ -0,0 +1,138 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from api.infos_entreprise import infos_entreprise
+from api.models import RatiosFinanciers
+from api.ratios_financiers import dernier_exercice_comptable_local
+from entreprises.models import CaracteristiquesAnnuelles
+
+EXPORT = """siren;date_cloture_exercice;type_bilan;chiffre_d_affaires
+000000001;2022-12-31;C;1000000
+000000001;2023-12-31;C;60000000
+000000001;2021-12-31;K;50000000
+000000001;2023-12-31;K;150000000.0
+000000002;2023-06-30;S;800000
+000000002;2024-06-30;S;
+000000003;2023-12-31;X;1000
+"""
+
+
+@pytest.fixture
+def export(tmp_path):
+    chemin = tmp_path / "ratios_inpi_bce.csv"
+    chemin.write_text(EXPORT)
+    return str(chemin)
+
+
+@pytest.mark.django_db
+def test_import_du_dernier_exercice_par_siren_et_type_de_bilan(export):
+    call_command("import_ratios_financiers", fichier=export)
+
+    assert sorted(
+        RatiosFinanciers.objects.values_list(
+            "siren", "type_bilan", "date_cloture_exercice", "tranche_chiffre_affaires"
+        )
+    ) == [
+        (
+            "000000001",
+            "C",
+            date(2023, 12, 31),
+            CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M,
+        ),
+        (
+            "000000001",
+            "K",
+            date(2023, 12, 31),
+            CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+        ),
+        (
+            "000000002",
+            "S",
+            date(2023, 6, 30),
+            CaracteristiquesAnnuelles.CA_MOINS_DE_900K,
+        ),
+    ]
+
+
+@pytest.mark.django_db
+def test_un_exercice_plus_ancien_ne_remplace_pas_l_exercice_enregistre(export):
+    RatiosFinanciers.objects.create(
+        siren="000000002",
+        type_bilan="S",
+        date_cloture_exercice=date(2024, 6, 30),
+        tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_ENTRE_900K_ET_50M,
+        date_import=date(2025, 1, 1),
+    )
+
+    call_command("import_ratios_financiers", fichier=export)
+
+    ratios = RatiosFinanciers.objects.get(siren="000000002")
+    assert ratios.date_cloture_exercice == date(2024, 6, 30)
+    assert ratios.tranche_chiffre_affaires == (
+        CaracteristiquesAnnuelles.CA_ENTRE_900K_ET_50M
+    )
+
+
+@pytest.mark.django_db
+def test_import_incremental_telecharge_les_exercices_recents(mocker):
+    RatiosFinanciers.objects.create(
+        siren="000000002",
+        type_bilan="S",
+        date_cloture_exercice=date(2024, 6, 30),
+        tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_ENTRE_900K_ET_50M,
+        date_import=date(2025, 1, 1),
+    )
+    response = mocker.MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.return_value = iter(EXPORT.splitlines())
+    telechargement = mocker.patch("api.transport.get", return_value=response)
+
+    call_command("import_ratios_financiers")
+
+    assert (
+        telechargement.call_args.kwargs["params"]["where"]
+        == "date_cloture_exercice >= date'2022-06-30'"
+    )
+    assert RatiosFinanciers.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_dernier_exercice_comptable_local(settings, export):
+    settings.API_STOCK_RATIOS_FINANCIERS_ACTIF = True
+    call_command("import_ratios_financiers", fichier=export)
+
+    assert dernier_exercice_comptable_local("000000001") == {
+        "date_cloture_exercice": date(2023, 12, 31),
+        "tranche_chiffre_affaires": CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M,
+        "tranche_chiffre_affaires_consolide": CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+    }
+    assert dernier_exercice_comptable_local("000000002") == {
+        "date_cloture_exercice": date(2023, 6, 30),
+        "tranche_chiffre_affaires": CaracteristiquesAnnuelles.CA_MOINS_DE_900K,
+        "tranche_chiffre_affaires_consolide": None,
+    }
+    assert dernier_exercice_comptable_local("000000009") is None
+
+
+@pytest.mark.django_db
+def test_infos_entreprise_utilise_les_ratios_financiers_importes(
+    settings, export, mocker
+):
+    settings.API_STOCK_RATIOS_FINANCIERS_ACTIF = True
+    call_command("import_ratios_financiers", fichier=export)
+    mocker.patch(
+        "api.recherche_entreprises.recherche_par_siren",
+        return_value={"siren": "000000002", "denomination": "Entreprise SAS"},
+    )
+    api_ratios_financiers = mocker.patch(
+        "api.ratios_financiers.dernier_exercice_comptable"
+    )
+
+    infos = infos_entreprise("000000002", donnees_financieres=True)
+
+    assert infos["tranche_chiffre_affaires"] == (
+        CaracteristiquesAnnuelles.CA_MOINS_DE_900K
+    )
+    assert not api_ratios_financiers.called
@@ -0,0 +1,140 @@
+import zipfile
+
+import pytest
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from api.exceptions import APIError
+from api.infos_entreprise import infos_entreprise
+from api.models import UniteLegale
+from entreprises.models import CaracteristiquesAnnuelles
+
+UNITES_LEGALES = """siren,statutDiffusionUniteLegale,etatAdministratifUniteLegale,denominationUniteLegale,nomUniteLegale,categorieJuridiqueUniteLegale,activitePrincipaleUniteLegale,nomenclatureActivitePrincipaleUniteLegale,trancheEffectifsUniteLegale
+000000001,O,A,ENTREPRISE SAS,,5710,01.11Z,NAFRev2,42
+000000002,O,A,,DUPONT,1000,62.01Z,NAFRev2,NN
+000000003,O,C,ENTREPRISE CESSEE,,5710,01.11Z,NAFRev2,
+000000004,P,A,[ND],[ND],5710,01.11Z,NAFRev2,
+000000005,O,A,ANCIENNE NOMENCLATURE,,5710,01.1A,NAFRev1,
+"""
+ETABLISSEMENTS = """siren,etablissementSiege,codePostalEtablissement,codePaysEtrangerEtablissement
+000000001,false,75001,
+000000001,true,33800,
+000000002,true,,99139
+000000003,true,69001,
+"""
+
+
+@pytest.fixture
+def fichiers_stock(tmp_path):
+    unites_legales = tmp_path / "StockUniteLegale_utf8.zip"
+    with zipfile.ZipFile(unites_legales, "w") as archive:
+        archive.writestr("StockUniteLegale_utf8.csv", UNITES_LEGALES)
+    etablissements = tmp_path / "StockEtablissement_utf8.csv"
+    etablissements.write_text(ETABLISSEMENTS)
+    return str(unites_legales), str(etablissements)
+
+
+@pytest.mark.django_db
+def test_import_des_unites_legales_actives_et_diffusibles(fichiers_stock):
+    unites_legales, etablissements = fichiers_stock
+    UniteLegale.objects.create(
+        siren="000000009", denomination="RADIEE", date_import="2025-01-01"
+    )
+
+    with freeze_time("2025-02-01"):
+        call_command(
+            "import_stock_sirene", unites_legales, etablissements=etablissements
+        )
+
+    assert sorted(UniteLegale.objects.values_list("siren", flat=True)) == [
+        "000000001",
+        "000000002",
+        "000000005",
+    ]
+    unite_legale = UniteLegale.objects.get(siren="000000001")
+    assert unite_legale.denomination == "ENTREPRISE SAS"
+    assert unite_legale.categorie_juridique_sirene == 5710
+    assert unite_legale.code_NAF == "01.11Z"
+    assert unite_legale.tranche_effectif == "42"
+    assert unite_legale.siege_connu
+    assert unite_legale.code_postal == "33800"
+    assert unite_legale.code_pays_etranger_sirene is None
+    unite_legale = UniteLegale.objects.get(siren="000000002")
+    assert unite_legale.denomination == "DUPONT"
+    assert unite_legale.tranche_effectif == "NN"
+    assert unite_legale.code_pays_etranger_sirene == 99139
+    unite_legale = UniteLegale.objects.get(siren="000000005")
+    assert unite_legale.code_NAF is None
+    assert not unite_legale.siege_connu
+
+
+@pytest.mark.django_db
+def test_import_oublie_le_siege_de_l_import_precedent(fichiers_stock, tmp_path):
+    unites_legales, etablissements = fichiers_stock
+    with freeze_time("2025-01-01"):
+        call_command(
+            "import_stock_sirene", unites_legales, etablissements=etablissements
+        )
+    # le siège de 000000002 n'apparaît plus dans le nouveau stock des établissements
+    nouveaux_etablissements = tmp_path / "StockEtablissement_utf8_2.csv"
+    nouveaux_etablissements.write_text(
+        """siren,etablissementSiege,codePostalEtablissement,codePaysEtrangerEtablissement
+000000001,true,33000,
+"""
+    )
+
+    with freeze_time("2025-02-01"):
+        call_command(
+            "import_stock_sirene",
+            unites_legales,
+            etablissements=str(nouveaux_etablissements),
+        )
+
+    unite_legale = UniteLegale.objects.get(siren="000000001")
+    assert unite_legale.code_postal == "33000"
+    assert unite_legale.denomination == "ENTREPRISE SAS"
+    unite_legale = UniteLegale.objects.get(siren="000000002")
+    assert not unite_legale.siege_connu
+    assert unite_legale.code_pays_etranger_sirene is None
+
+
+@pytest.mark.django_db
+def test_infos_entreprise_depuis_le_stock_sans_appel_aux_api(
+    settings, fichiers_stock, mocker
+):
+    settings.API_STOCK_SIRENE_ACTIF = True
+    unites_legales, etablissements = fichiers_stock
+    call_command("import_stock_sirene", unites_legales, etablissements=etablissements)
+    recherche_par_siren = mocker.patch("api.recherche_entreprises.recherche_par_siren")
+
+    infos = infos_entreprise("000000001")
+
+    assert infos == {
+        "siren": "000000001",
+        "effectif": CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+        "denomination": "ENTREPRISE SAS",
+        "categorie_juridique_sirene": 5710,
+        "code_pays_etranger_sirene": None,
+        "code_postal": "33800",
+        "code_NAF": "01.11Z",
+    }
+    assert not recherche_par_siren.called
+
+
+@pytest.mark.django_db
+def test_infos_entreprise_stock_incomplet_utilise_si_les_api_sont_indisponibles(
+    settings, fichiers_stock, mocker
+):
+    settings.API_STOCK_SIRENE_ACTIF = True
+    unites_legales, _ = fichiers_stock
+    call_command("import_stock_sirene", unites_legales)
+    recherche_par_siren = mocker.patch(
+        "api.recherche_entreprises.recherche_par_siren", side_effect=APIError
+    )
+    mocker.patch("api.sirene.recherche_unite_legale_par_siren", side_effect=APIError)
+
+    infos = infos_entreprise("000000001")
+
+    recherche_par_siren.assert_called_once_with("000000001")
+    assert infos["denomination"] == "ENTREPRISE SAS"
+    assert infos["code_postal"] is None
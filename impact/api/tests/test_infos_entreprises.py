@@ -1,3 +1,5 @@
+import threading
+import time
 from datetime import date
 
 import pytest
@@ -5,6 +7,7 @@ import pytest
 from api.exceptions import APIError
 from api.exceptions import SirenError
 from api.infos_entreprise import infos_entreprise
+from api.infos_entreprise import infos_entreprises
 from api.infos_entreprise import recherche_par_nom_ou_siren
 from entreprises.models import CaracteristiquesAnnuelles
 
@@ -156,6 +159,206 @@ def test_infos_entreprise_echec_de_l_API_ratios_financiers_non_bloquant(
     }
 
 
+def test_infos_entreprise_mises_en_cache(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers
+):
+    mock_api_recherche_par_siren.return_value = INFOS_ENTREPRISE
+    mock_api_ratios_financiers.return_value = INFOS_FINANCIERES
+
+    infos_entreprise(SIREN)
+    infos = infos_entreprise(SIREN, donnees_financieres=True)
+    infos_avec_donnees_financieres_en_cache = infos_entreprise(
+        SIREN, donnees_financieres=True
+    )
+
+    mock_api_recherche_par_siren.assert_called_once_with(SIREN)
+    mock_api_ratios_financiers.assert_called_once_with(SIREN)
+    assert infos == INFOS_ENTREPRISE | INFOS_FINANCIERES
+    assert infos_avec_donnees_financieres_en_cache == infos
+
+
+def test_infos_entreprise_echec_de_l_API_ratios_financiers_non_mis_en_cache(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers
+):
+    mock_api_recherche_par_siren.return_value = INFOS_ENTREPRISE
+    mock_api_ratios_financiers.side_effect = [APIError(), INFOS_FINANCIERES]
+
+    infos_entreprise(SIREN, donnees_financieres=True)
+    infos = infos_entreprise(SIREN, donnees_financieres=True)
+
+    assert mock_api_ratios_financiers.call_count == 2
+    assert infos == INFOS_ENTREPRISE | INFOS_FINANCIERES
+
+
+@pytest.mark.django_db
+def test_infos_entreprise_fallback_direct_quand_api_recherche_entreprises_indisponible(
+    mock_api_recherche_par_siren, mock_api_sirene, settings
+):
+    settings.API_DISJONCTEUR_NOMBRE_MINIMUM_APPELS = 2
+    mock_api_recherche_par_siren.side_effect = APIError
+    mock_api_sirene.return_value = INFOS_ENTREPRISE
+
+    for siren in ("000000001", "000000002", "000000003"):
+        infos = infos_entreprise(siren)
+
+    assert mock_api_recherche_par_siren.call_count == 2
+    assert mock_api_sirene.call_count == 3
+    assert infos == INFOS_ENTREPRISE
+
+
+def test_infos_entreprise_donnees_financieres_recuperees_en_parallele(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers
+):
+    # chaque appel attend que l'autre ait commencé : ils ne peuvent aboutir que s'ils sont concurrents
+    debut_identite = threading.Event()
+    debut_donnees_financieres = threading.Event()
+
+    def recherche_par_siren(siren):
+        debut_identite.set()
+        assert debut_donnees_financieres.wait(timeout=2)
+        return INFOS_ENTREPRISE
+
+    def dernier_exercice_comptable(siren):
+        debut_donnees_financieres.set()
+        assert debut_identite.wait(timeout=2)
+        return INFOS_FINANCIERES
+
+    mock_api_recherche_par_siren.side_effect = recherche_par_siren
+    mock_api_ratios_financiers.side_effect = dernier_exercice_comptable
+
+    infos = infos_entreprise(SIREN, donnees_financieres=True)
+
+    assert infos == INFOS_ENTREPRISE | INFOS_FINANCIERES
+
+
+def test_infos_entreprise_donnees_financieres_vides_si_le_delai_est_depasse(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers, settings
+):
+    settings.API_INFOS_ENTREPRISE_DELAI = 0.05
+    fin_du_test = threading.Event()
+
+    def dernier_exercice_comptable(siren):
+        fin_du_test.wait(timeout=2)
+        return INFOS_FINANCIERES
+
+    mock_api_recherche_par_siren.return_value = INFOS_ENTREPRISE
+    mock_api_ratios_financiers.side_effect = dernier_exercice_comptable
+
+    infos = infos_entreprise(SIREN, donnees_financieres=True)
+    fin_du_test.set()
+
+    assert infos == INFOS_ENTREPRISE | {
+        "date_cloture_exercice": None,
+        "tranche_chiffre_affaires": None,
+        "tranche_chiffre_affaires_consolide": None,
+    }
+
+
+def test_infos_entreprise_erreur_si_les_donnees_d_identite_depassent_le_delai(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers, settings
+):
+    settings.API_INFOS_ENTREPRISE_DELAI = 0.05
+    fin_du_test = threading.Event()
+
+    def recherche_par_siren(siren):
+        fin_du_test.wait(timeout=2)
+        return INFOS_ENTREPRISE
+
+    mock_api_recherche_par_siren.side_effect = recherche_par_siren
+    mock_api_ratios_financiers.return_value = INFOS_FINANCIERES
+
+    debut = time.monotonic()
+    with pytest.raises(APIError):
+        infos_entreprise(SIREN, donnees_financieres=True)
+    duree = time.monotonic() - debut
+    fin_du_test.set()
+
+    assert duree < 1
+
+
+def test_infos_entreprise_appels_sequentiels(
+    mock_api_recherche_par_siren, mock_api_ratios_financiers, settings
+):
+    settings.API_INFOS_ENTREPRISE_APPELS_CONCURRENTS = False
+    mock_api_recherche_par_siren.return_value = INFOS_ENTREPRISE
+    mock_api_ratios_financiers.return_value = INFOS_FINANCIERES
+
+    infos = infos_entreprise(SIREN, donnees_financieres=True)
+
+    assert infos == INFOS_ENTREPRISE | INFOS_FINANCIERES
+
+
+def test_infos_entreprises_erreurs_renvoyees_par_siren(
+    mock_api_recherche_par_siren, mock_api_sirene
+):
+    def recherche_par_siren(siren):
+        if siren == "000000002":
+            raise SirenError("Message d'erreur")
+        return INFOS_ENTREPRISE | {"siren": siren}
+
+    mock_api_recherche_par_siren.side_effect = recherche_par_siren
+
+    resultats = {
+        siren: (infos, erreur)
+        for siren, infos, erreur in infos_entreprises(
+            ["000000001", "000000002", "000000003"]
+        )
+    }
+
+    assert resultats["000000001"] == (INFOS_ENTREPRISE | {"siren": "000000001"}, None)
+    assert resultats["000000003"] == (INFOS_ENTREPRISE | {"siren": "000000003"}, None)
+    infos, erreur = resultats["000000002"]
+    assert infos is None
+    assert isinstance(erreur, SirenError)
+
+
+def test_infos_entreprises_nombre_d_appels_simultanes_borne(
+    mock_api_recherche_par_siren, settings
+):
+    settings.API_RESOLUTION_PAR_LOT_CONCURRENCE = 2
+    verrou = threading.Lock()
+    appels = {"en_cours": 0, "maximum": 0}
+    deux_appels_en_cours = threading.Barrier(2, timeout=2)
+
+    def recherche_par_siren(siren):
+        with verrou:
+            appels["en_cours"] += 1
+            appels["maximum"] = max(appels["maximum"], appels["en_cours"])
+        # les deux premiers appels ne peuvent aboutir que s'ils sont concurrents
+        if siren in ("000000001", "000000002"):
+            deux_appels_en_cours.wait()
+        with verrou:
+            appels["en_cours"] -= 1
+        return INFOS_ENTREPRISE | {"siren": siren}
+
+    mock_api_recherche_par_siren.side_effect = recherche_par_siren
+    sirens = [f"{numero:09d}" for numero in range(1, 11)]
+
+    resultats = list(infos_entreprises(sirens))
+
+    assert sorted(siren for siren, _, _ in resultats) == sirens
+    assert appels["maximum"] == 2
+
+
+def test_infos_entreprises_renvoyees_au_fur_et_a_mesure(mock_api_recherche_par_siren):
+    # le premier SIREN résolu est renvoyé sans attendre la résolution du second
+    fin_du_test = threading.Event()
+
+    def recherche_par_siren(siren):
+        if siren == "000000002":
+            fin_du_test.wait(timeout=2)
+        return INFOS_ENTREPRISE | {"siren": siren}
+
+    mock_api_recherche_par_siren.side_effect = recherche_par_siren
+    resultats = infos_entreprises(["000000002", "000000001"])
+
+    siren, _, _ = next(resultats)
+    fin_du_test.set()
+
+    assert siren == "000000001"
+    assert [siren for siren, _, _ in resultats] == ["000000002"]
+
+
 def test_recherche_par_nom_ou_siren_succes_api_recherche_entreprises(
     mock_api_recherche_textuelle, mock_api_recherche_unites_legales_par_nom_ou_siren
 ):
@@ -203,3 +406,33 @@ def test_recherche_par_nom_ou_siren_echecs_api_recherche_entreprises_et_api_sire
         RECHERCHE
     )
     assert str(e.value) == "Message d'erreur sirene"
+
+
+def test_recherche_par_nom_ou_siren_mise_en_cache_insensible_a_la_casse_et_aux_espaces(
+    mock_api_recherche_textuelle,
+):
+    mock_api_recherche_textuelle.return_value = RESULTATS_RECHERCHE
+
+    recherche_par_nom_ou_siren(RECHERCHE)
+    resultats = recherche_par_nom_ou_siren(f" {RECHERCHE.upper()}  ")
+
+    mock_api_recherche_textuelle.assert_called_once_with(RECHERCHE)
+    assert resultats == RESULTATS_RECHERCHE
+
+
+def test_recherche_par_nom_ou_siren_plus_longue_interroge_l_api(
+    mock_api_recherche_textuelle,
+):
+    # la recherche textuelle n'est pas monotone : une recherche plus longue peut trouver
+    # des entreprises absentes des résultats d'un préfixe, même vides
+    mock_api_recherche_textuelle.return_value = {
+        "nombre_resultats": 0,
+        "entreprises": [],
+    }
+    recherche_par_nom_ou_siren("total e")
+
+    mock_api_recherche_textuelle.return_value = RESULTATS_RECHERCHE
+    resultats = recherche_par_nom_ou_siren("total energies")
+
+    assert mock_api_recherche_textuelle.call_count == 2
+    assert resultats == RESULTATS_RECHERCHE
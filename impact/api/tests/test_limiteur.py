@@ -0,0 +1,94 @@
+import pytest
+from freezegun import freeze_time
+
+from api import limiteur
+from api import transport
+from api.exceptions import LimiteDebitError
+from api.limiteur import Limiteur
+
+URL = "https://recherche-entreprises.api.gouv.fr/search?q=123456789"
+
+
+@pytest.fixture
+def sleep(mocker):
+    return mocker.patch("api.limiteur.time.sleep")
+
+
+@pytest.mark.django_db
+def test_consomme_la_capacite_puis_refuse_en_mode_non_bloquant(sleep):
+    limiteur_api = Limiteur("api", debit=1, capacite=2)
+
+    with freeze_time("2025-01-01 12:00:00"):
+        assert limiteur_api.acquiert(bloquant=False)
+        assert limiteur_api.acquiert(bloquant=False)
+        assert not limiteur_api.acquiert(bloquant=False)
+
+    assert not sleep.called
+    assert limiteur_api.statistiques.acquisitions == 2
+    assert limiteur_api.statistiques.refus == 1
+
+
+@pytest.mark.django_db
+def test_les_jetons_sont_regagnes_au_debit_configure(sleep):
+    limiteur_api = Limiteur("api", debit=2, capacite=1)
+    with freeze_time("2025-01-01 12:00:00"):
+        assert limiteur_api.acquiert(bloquant=False)
+        assert not limiteur_api.acquiert(bloquant=False)
+
+    with freeze_time("2025-01-01 12:00:00.5"):
+        assert limiteur_api.acquiert(bloquant=False)
+
+
+@pytest.mark.django_db
+def test_attend_son_jeton_en_mode_bloquant(sleep):
+    limiteur_api = Limiteur("api", debit=4, capacite=1)
+
+    with freeze_time("2025-01-01 12:00:00"):
+        assert limiteur_api.acquiert(attente_max=1)
+        assert limiteur_api.acquiert(attente_max=1)
+        assert limiteur_api.acquiert(attente_max=1)
+
+    assert [appel.args[0] for appel in sleep.call_args_list] == [0.25, 0.5]
+    assert limiteur_api.statistiques.attentes == 2
+    assert limiteur_api.statistiques.duree_attente == 0.75
+    assert limiteur_api.statistiques.duree_attente_moyenne == 0.375
+
+
+@pytest.mark.django_db
+def test_abandonne_si_l_attente_depasse_l_attente_maximale(settings, sleep):
+    settings.API_LIMITEUR_ATTENTE_MAX = 0.1
+    limiteur_api = Limiteur("api", debit=1, capacite=1)
+
+    with freeze_time("2025-01-01 12:00:00"):
+        assert limiteur_api.acquiert()
+        assert not limiteur_api.acquiert()
+        with limiteur.attente_illimitee():
+            assert limiteur_api.acquiert()
+
+    sleep.assert_called_once_with(1)
+
+
+@pytest.mark.django_db
+def test_etat_partage_entre_les_processus(sleep):
+    # deux workers disposent chacun de leur propre instance du limiteur
+    with freeze_time("2025-01-01 12:00:00"):
+        assert Limiteur("api", debit=1, capacite=1).acquiert(bloquant=False)
+        assert not Limiteur("api", debit=1, capacite=1).acquiert(bloquant=False)
+        assert Limiteur("autre-api", debit=1, capacite=1).acquiert(bloquant=False)
+
+
+@pytest.mark.django_db
+def test_transport_soumis_au_limiteur_de_l_hote(settings, mocker, sleep):
+    settings.API_LIMITES_DEBIT = {"recherche-entreprises.api.gouv.fr": (1, 1)}
+    settings.API_LIMITEUR_ATTENTE_MAX = 0
+    requete = mocker.patch("requests.Session.get")
+
+    with freeze_time("2025-01-01 12:00:00"):
+        transport.get(URL, timeout=3)
+        with pytest.raises(LimiteDebitError):
+            transport.get(URL, timeout=3)
+        # hôte non limité
+        transport.get("https://api.insee.fr/api-sirene/3.11/siren", timeout=3)
+
+    assert requete.call_count == 2
+    assert limiteur.statistiques()["recherche-entreprises.api.gouv.fr"].refus == 1
@@ -2,8 +2,10 @@ import pytest
 from requests.exceptions import Timeout
 
 from api.exceptions import APIError
+from api.exceptions import LimiteDebitError
 from api.exceptions import ServerError
 from api.exceptions import SirenError
+from api.exceptions import TOO_MANY_REQUESTS_ERROR
 from api.exceptions import TooManyRequestError
 from api.recherche_entreprises import RECHERCHE_ENTREPRISE_TIMEOUT
 from api.recherche_entreprises import recherche_par_siren
@@ -45,7 +47,7 @@ def test_succes_recherche_par_siren_comportant_la_raison_sociale(mocker):
         ],
     }
     faked_request = mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json_content)
+        "api.transport.get", return_value=MockedResponse(200, json_content)
     )
 
     infos = recherche_par_siren(SIREN)
@@ -80,7 +82,7 @@ def test_succes_recherche_par_siren_sans_la_raison_sociale(mocker):
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_par_siren(SIREN)
 
@@ -96,7 +98,7 @@ def test_succes_recherche_par_siren_pas_de_resultat(mocker):
         "per_page": 1,
         "total_pages": 0,
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     with pytest.raises(SirenError) as e:
         recherche_par_siren(SIREN)
@@ -109,7 +111,7 @@ def test_succes_recherche_par_siren_pas_de_resultat(mocker):
 
 def test_echec_recherche_par_siren_requete_api_invalide(mocker):
     SIREN = "123456789"
-    mocker.patch("requests.get", return_value=MockedResponse(400))
+    mocker.patch("api.transport.get", return_value=MockedResponse(400))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError) as e:
@@ -126,7 +128,7 @@ def test_echec_recherche_par_siren_requete_api_invalide(mocker):
 
 def test_echec_recherche_par_siren_trop_de_requetes(mocker):
     SIREN = "123456789"
-    mocker.patch("requests.get", return_value=MockedResponse(429))
+    mocker.patch("api.transport.get", return_value=MockedResponse(429))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(TooManyRequestError) as e:
@@ -142,7 +144,7 @@ def test_echec_recherche_par_siren_trop_de_requetes(mocker):
 
 def test_echec_recherche_par_siren_erreur_de_l_API(mocker):
     SIREN = "123456789"
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(ServerError) as e:
@@ -158,7 +160,7 @@ def test_echec_recherche_par_siren_erreur_de_l_API(mocker):
 def test_echec_recherche_par_siren_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
     SIREN = "123456789"
-    mocker.patch("requests.get", side_effect=Timeout)
+    mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError) as e:
@@ -173,6 +175,18 @@ def test_echec_recherche_par_siren_exception_provoquee_par_l_api(mocker):
     )
 
 
+def test_echec_recherche_par_siren_refus_du_limiteur_de_debit(mocker):
+    mocker.patch(
+        "api.transport.get", side_effect=LimiteDebitError(TOO_MANY_REQUESTS_ERROR)
+    )
+    capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
+
+    with pytest.raises(LimiteDebitError):
+        recherche_par_siren("123456789")
+
+    assert not capture_exception_mock.called
+
+
 def test_entreprise_inexistante_mais_pourtant_retournée_par_l_API_recherche_par_siren(
     mocker,
 ):
@@ -195,7 +209,7 @@ def test_entreprise_inexistante_mais_pourtant_retournée_par_l_API_recherche_par
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(SirenError) as e:
@@ -229,7 +243,7 @@ def test_recherche_par_siren_pas_de_nature_juridique(nature_juridique, mocker):
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     infos = recherche_par_siren(SIREN)
@@ -256,7 +270,7 @@ def test_recherche_par_siren_pas_de_code_pays_etranger(mocker):
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     infos = recherche_par_siren(SIREN)
@@ -282,7 +296,7 @@ def test_recherche_par_siren_code_pays_etranger_vaut_null_car_en_France(mocker):
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     infos = recherche_par_siren(SIREN)
@@ -307,7 +321,7 @@ def test_recherche_par_siren_pas_d_activite_principale(activite_principale, mock
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_par_siren(SIREN)
 
@@ -333,7 +347,7 @@ def test_recherche_par_siren_code_postal_au_format_incorrect(code_postal, mocker
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_par_siren(SIREN)
 
@@ -357,7 +371,7 @@ def test_recherche_par_siren_pas_de_code_postal(mocker):
             }
         ],
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_par_siren(SIREN)
 
@@ -391,7 +405,7 @@ def test_api_recherche_textuelle_pas_de_resultat(mocker):
         "per_page": 5,
         "total_pages": 0,
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     resultats = recherche_textuelle(RECHERCHE)
 
@@ -403,7 +417,7 @@ def test_api_recherche_textuelle_pas_de_resultat(mocker):
 
 def test_echec_recherche_textuelle_requete_api_invalide(mocker):
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", return_value=MockedResponse(400))
+    mocker.patch("api.transport.get", return_value=MockedResponse(400))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(APIError) as e:
@@ -420,7 +434,7 @@ def test_echec_recherche_textuelle_requete_api_invalide(mocker):
 
 def test_echec_recherche_textuelle_trop_de_requetes(mocker):
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", return_value=MockedResponse(429))
+    mocker.patch("api.transport.get", return_value=MockedResponse(429))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(TooManyRequestError) as e:
@@ -436,7 +450,7 @@ def test_echec_recherche_textuelle_trop_de_requetes(mocker):
 
 def test_echec_recherche_textuelle_erreur_de_l_API(mocker):
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(ServerError) as e:
@@ -452,7 +466,7 @@ def test_echec_recherche_textuelle_erreur_de_l_API(mocker):
 def test_echec_recherche_textuelle_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", side_effect=Timeout)
+    mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError) as e:
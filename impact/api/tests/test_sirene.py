@@ -52,7 +52,7 @@ def test_recherche_par_siren_succès_avec_résultat_comportant_la_denomination(
     }
     settings.API_SIRENE_KEY = api_sirene_key
     faked_request = mocker.patch(
-        "requests.get", return_value=MockedResponse(200, json_content)
+        "api.transport.get", return_value=MockedResponse(200, json_content)
     )
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
@@ -88,7 +88,7 @@ def test_recherche_par_siren_succès_avec_résultat_sans_la_denomination(mocker)
             "trancheEffectifsUniteLegale": "20",
         },
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_unite_legale_par_siren(SIREN)
 
@@ -98,7 +98,7 @@ def test_recherche_par_siren_succès_avec_résultat_sans_la_denomination(mocker)
 def test_recherche_par_siren_succès_pas_de_résultat(mocker):
     SIREN = "000000000"
     # un siren non trouvé renvoie une 404
-    mocker.patch("requests.get", return_value=MockedResponse(404))
+    mocker.patch("api.transport.get", return_value=MockedResponse(404))
 
     with pytest.raises(SirenError) as e:
         recherche_unite_legale_par_siren(SIREN)
@@ -112,7 +112,7 @@ def test_recherche_par_siren_succès_pas_de_résultat(mocker):
 def test_recherche_par_siren_echec_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
     SIREN = "123456789"
-    mocker.patch("requests.get", side_effect=Timeout)
+    mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError) as e:
@@ -129,7 +129,7 @@ def test_recherche_par_siren_echec_exception_provoquee_par_l_api(mocker):
 
 def test_recherche_par_siren_echec_trop_de_requetes(mocker):
     SIREN = "123456789"
-    mocker.patch("requests.get", return_value=MockedResponse(429))
+    mocker.patch("api.transport.get", return_value=MockedResponse(429))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(TooManyRequestError) as e:
@@ -143,7 +143,7 @@ def test_recherche_par_siren_echec_trop_de_requetes(mocker):
 
 def test_recherche_par_siren_echec_erreur_de_l_API(mocker):
     SIREN = "123456789"
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(ServerError) as e:
@@ -177,7 +177,7 @@ def test_pas_de_categorie_juridique(categorie_juridique, mocker):
             "trancheEffectifsUniteLegale": "20",
         },
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     infos = recherche_unite_legale_par_siren(SIREN)
@@ -206,7 +206,7 @@ def test_pas_d_activite_principale(activite_principale, mocker):
             "trancheEffectifsUniteLegale": "20",
         },
     }
-    mocker.patch("requests.get", return_value=MockedResponse(200, json_content))
+    mocker.patch("api.transport.get", return_value=MockedResponse(200, json_content))
 
     infos = recherche_unite_legale_par_siren(SIREN)
 
@@ -233,7 +233,7 @@ def test_api_recherche_par_nom_ou_siren_fonctionnelle():
 def test_api_recherche_par_nom_ou_siren_pas_de_resultat(mocker):
     RECHERCHE = "DANONE"
 
-    mocker.patch("requests.get", return_value=MockedResponse(404))
+    mocker.patch("api.transport.get", return_value=MockedResponse(404))
 
     resultats = recherche_unites_legales_par_nom_ou_siren(RECHERCHE)
 
@@ -245,7 +245,7 @@ def test_api_recherche_par_nom_ou_siren_pas_de_resultat(mocker):
 
 def test_echec_recherche_par_nom_ou_siren_trop_de_requetes(mocker):
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", return_value=MockedResponse(429))
+    mocker.patch("api.transport.get", return_value=MockedResponse(429))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(TooManyRequestError) as e:
@@ -259,7 +259,7 @@ def test_echec_recherche_par_nom_ou_siren_trop_de_requetes(mocker):
 
 def test_echec_recherche_par_nom_ou_siren_erreur_de_l_API(mocker):
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", return_value=MockedResponse(500))
+    mocker.patch("api.transport.get", return_value=MockedResponse(500))
     capture_message_mock = mocker.patch("sentry_sdk.capture_message")
 
     with pytest.raises(ServerError) as e:
@@ -275,7 +275,7 @@ def test_echec_recherche_par_nom_ou_siren_erreur_de_l_API(mocker):
 def test_echec_recherche_par_nom_ou_siren_exception_provoquee_par_l_api(mocker):
     """le Timeout est un cas réel mais l'implémentation attrape toutes les erreurs possibles"""
     RECHERCHE = "DANONE"
-    mocker.patch("requests.get", side_effect=Timeout)
+    mocker.patch("api.transport.get", side_effect=Timeout)
     capture_exception_mock = mocker.patch("sentry_sdk.capture_exception")
 
     with pytest.raises(APIError) as e:
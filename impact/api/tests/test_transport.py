@@ -0,0 +1,120 @@
+import pytest
+import responses
+from urllib3 import HTTPResponse
+
+from api import transport
+
+URL = "https://recherche-entreprises.api.gouv.fr/search"
+
+
+@pytest.fixture(autouse=True)
+def sessions_neuves(settings):
+    settings.API_HTTP_BACKOFF_FACTOR = 0
+    transport.ferme_sessions()
+    yield
+    transport.ferme_sessions()
+
+
+def test_une_session_partagee_par_hote():
+    session = transport.session(URL)
+
+    assert transport.session(f"{URL}?q=123456789") is session
+    assert (
+        transport.session("https://api.insee.fr/api-sirene/3.11/siren") is not session
+    )
+
+
+def test_pool_de_connexions_borne_par_les_settings(settings):
+    settings.API_HTTP_POOL_MAXSIZE = 3
+
+    adapter = transport.session(URL).get_adapter(URL)
+
+    assert adapter._pool_maxsize == 3
+
+
+@responses.activate
+def test_nouvelle_tentative_apres_une_reponse_503(settings):
+    settings.API_HTTP_RETRIES = 2
+    responses.get(URL, status=503, headers={"Retry-After": "120"})
+    responses.get(URL, status=200, json={"total_results": 0})
+
+    response = transport.get(URL, timeout=3)
+
+    assert response.status_code == 200
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_derniere_reponse_renvoyee_quand_les_tentatives_sont_epuisees(settings):
+    settings.API_HTTP_RETRIES = 1
+    responses.get(URL, status=503)
+
+    response = transport.get(URL, timeout=3)
+
+    assert response.status_code == 503
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_nouvelle_tentative_apres_une_reponse_429(settings):
+    settings.API_HTTP_RETRIES = 2
+    responses.get(URL, status=429, headers={"Retry-After": "0"})
+    responses.get(URL, status=200, json={"total_results": 0})
+
+    response = transport.get(URL, timeout=3)
+
+    assert response.status_code == 200
+    assert len(responses.calls) == 2
+
+
+@pytest.mark.parametrize("retry_after, attente", [("1", 1), ("120", 2)])
+def test_attente_retry_after_respectee_dans_la_limite_du_plafond(
+    settings, retry_after, attente
+):
+    settings.API_HTTP_RETRY_AFTER_MAX = 2
+    response = HTTPResponse(status=429, headers={"Retry-After": retry_after})
+
+    assert transport._politique_retry().get_retry_after(response) == attente
+
+
+@responses.activate
+def test_aucun_cookie_conserve_entre_les_appels():
+    responses.get(URL, status=200, headers={"Set-Cookie": "session=abc; Path=/"})
+
+    transport.get(URL, timeout=3)
+
+    assert not transport.session(URL).cookies
+
+
+@responses.activate
+def test_nouvelles_tentatives_soumises_au_limiteur(settings, mocker):
+    settings.API_HTTP_RETRIES = 2
+    acquiert_pour = mocker.patch("api.limiteur.acquiert_pour")
+    responses.get(URL, status=502)
+
+    transport.get(URL, timeout=3)
+
+    assert len(responses.calls) == 3
+    assert acquiert_pour.call_count == 3
+    assert all(
+        appel.args[0].startswith("https://recherche-entreprises.api.gouv.fr")
+        for appel in acquiert_pour.call_args_list
+    )
+
+
+@responses.activate
+def test_pas_de_nouvelle_tentative_sur_un_post(settings):
+    settings.API_HTTP_RETRIES = 2
+    url = "http://127.0.0.1:43440/run-task"
+    responses.post(url, status=503)
+
+    response = transport.post(url, {"document_id": 1}, timeout=3)
+
+    assert response.status_code == 503
+    assert len(responses.calls) == 1
+
+
+def test_au_plus_une_nouvelle_tentative_sur_erreur_de_connexion(settings):
+    settings.API_HTTP_RETRIES = 3
+
+    assert transport._politique_retry().connect == 1
@@ -0,0 +1,108 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api import limiteur
+
+# Couche de transport HTTP commune à tous les clients du package `api`.
+# Une session `requests` est conservée par hôte et par processus (worker gunicorn ou commande)
+# afin de réutiliser les connexions TCP/TLS (keep-alive) vers les quelques hôtes publics interrogés.
+# Chaque appel, nouvelles tentatives comprises, est soumis au limiteur de débit partagé de son hôte (cf. api.limiteur).
+
+_sessions = {}
+_verrou = threading.Lock()
+
+
+class _Retry(Retry):
+    # chaque nouvelle tentative est soumise au limiteur de débit de l'hôte, comme l'appel initial
+    def increment(
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        nouvelle_tentative = super().increment(
+            method, url, response, error, _pool, _stacktrace
+        )
+        # urllib3 transmet le chemin de l'url et le pool de connexions de l'hôte
+        limiteur.acquiert_pour(
+            f"{_pool.scheme}://{_pool.host}" if _pool is not None else url
+        )
+        return nouvelle_tentative
+
+    def get_retry_after(self, response):
+        # l'attente demandée par l'API est respectée dans la limite de API_HTTP_RETRY_AFTER_MAX secondes,
+        # pour ne pas bloquer le thread d'une requête web
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, settings.API_HTTP_RETRY_AFTER_MAX)
+
+
+def _politique_retry():
+    return _Retry(
+        total=settings.API_HTTP_RETRIES,
+        # les délais de connexion des appels s'additionnent à chaque tentative lors d'une panne de l'hôte
+        connect=min(settings.API_HTTP_RETRIES, 1),
+        read=0,
+        status=settings.API_HTTP_RETRIES,
+        backoff_factor=settings.API_HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        # la dernière réponse est renvoyée telle quelle aux clients qui gèrent déjà les codes d'erreur
+        raise_on_status=False,
+    )
+
+
+def _cle_hote(url):
+    url = urlsplit(url)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def _cree_session(hote):
+    session = requests.Session()
+    # la session est partagée par tous les appels vers l'hôte : aucun cookie n'est conservé entre eux
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.API_HTTP_POOL_MAXSIZE,
+        pool_block=False,
+        max_retries=_politique_retry(),
+    )
+    session.mount(f"{hote}/", adapter)
+    return session
+
+
+def session(url):
+    hote = _cle_hote(url)
+    if (session_hote := _sessions.get(hote)) is None:
+        with _verrou:
+            if (session_hote := _sessions.get(hote)) is None:
+                session_hote = _sessions[hote] = _cree_session(hote)
+    return session_hote
+
+
+def get(url, **kwargs):
+    limiteur.acquiert_pour(url)
+    return session(url).get(url, **kwargs)
+
+
+def post(url, data=None, **kwargs):
+    limiteur.acquiert_pour(url)
+    return session(url).post(url, data, **kwargs)
+
+
+def ferme_sessions():
+    with _verrou:
+        for session_hote in _sessions.values():
+            session_hote.close()
+        _sessions.clear()
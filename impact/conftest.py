@@ -2,11 +2,14 @@ from datetime import date
 from uuid import uuid4
 
 import pytest
+from django.core.cache import caches
 
 from entreprises.models import ActualisationCaracteristiquesAnnuelles
 from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import Entreprise
 from habilitations.models import Habilitation
+from impact.settings import CACHES
+from public.simulation import reglementations_applicables
 
 CODE_SA = 5505
 CODE_SA_COOPERATIVE = 5551
@@ -34,6 +37,58 @@ def use_in_memory_storage(settings):
     }
 
 
+# Isole les tests les uns des autres en utilisant des caches mémoire vidés à chaque test,
+# y compris pour le cache partagé (en base de données hors tests)
+@pytest.fixture(autouse=True)
+def use_empty_in_memory_caches(settings):
+    settings.CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": alias,
+        }
+        for alias in ("default", "partage")
+    }
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+# Cache partagé tel que configuré hors tests (en base de données),
+# pour les tests de son utilisation entre workers (la table est créée avec la base de test)
+@pytest.fixture
+def cache_partage_en_base(db, settings):
+    settings.CACHES = settings.CACHES | {"partage": CACHES["partage"]}
+    caches["partage"].clear()
+
+
+# Les appels aux API sont simulés : le limiteur de débit partagé et les copies locales du stock Sirene
+# et des ratios financiers (en base de données) sont désactivés
+@pytest.fixture(autouse=True)
+def disable_api_database_features(settings):
+    settings.API_LIMITES_DEBIT = {}
+    settings.API_STOCK_SIRENE_ACTIF = False
+    settings.API_STOCK_RATIOS_FINANCIERS_ACTIF = False
+
+
+# Les statuts des réglementations ne sont calculés en parallèle qu'en dehors d'une transaction
+# (cf. reglementations.statuts.calcule_statuts), donc seulement dans les tests transactionnels.
+# La base SQLite en mémoire des tests ne supporte pas les écritures concurrentes : ces tests calculent
+# les statuts séquentiellement, sauf s'ils activent les calculs concurrents (cf. reglementations/tests/test_statuts.py)
+@pytest.fixture(autouse=True)
+def calcul_sequentiel_des_statuts_hors_transaction(request, settings):
+    marqueur = request.node.get_closest_marker("django_db")
+    if marqueur and marqueur.kwargs.get("transaction"):
+        settings.REGLEMENTATIONS_STATUTS_CALCULS_CONCURRENTS = False
+
+
+# Les données de la simulation publique sont enregistrées dans le thread courant :
+# les données créées dans la transaction d'un test ne sont pas visibles depuis d'autres threads,
+# et la table de décision de la simulation est vidée pour isoler les tests (est_soumis y est souvent simulé)
+@pytest.fixture(autouse=True)
+def simulation_sans_etat(settings):
+    settings.SIMULATION_ENREGISTREMENT_DIFFERE = False
+    reglementations_applicables.cache_clear()
+
+
 @pytest.fixture
 def alice(django_user_model):
     alice = django_user_model.objects.create(
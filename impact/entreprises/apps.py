@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class EntreprisesConfig(AppConfig):
+    name = "entreprises"
+
+    def ready(self):
+        import entreprises.signals  # noqa
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
+from entreprises.models import qualifie_caracteristiques_annuelles
+
+
+class Command(BaseCommand):
+    help = "Recalcule l'état qualifiant des caractéristiques annuelles et les dernières caractéristiques qualifiantes de toutes les entreprises (à lancer après une modification des critères de qualification)"
+
+    def handle(self, *args, **options):
+        caracteristiques_modifiees = []
+        entreprises_modifiees = []
+        for entreprise in Entreprise.objects.prefetch_related(
+            Prefetch(
+                "caracteristiquesannuelles_set",
+                queryset=CaracteristiquesAnnuelles.objects.order_by("-annee"),
+            )
+        ):
+            dernieres_caracteristiques_qualifiantes, modifiees = (
+                qualifie_caracteristiques_annuelles(
+                    entreprise, entreprise.caracteristiquesannuelles_set.all()
+                )
+            )
+            caracteristiques_modifiees.extend(modifiees)
+            if entreprise.caracteristiques_qualifiantes_id != getattr(
+                dernieres_caracteristiques_qualifiantes, "pk", None
+            ):
+                entreprise.caracteristiques_qualifiantes = (
+                    dernieres_caracteristiques_qualifiantes
+                )
+                entreprises_modifiees.append(entreprise)
+
+        # bulk_update ne modifie pas les dates de mise à jour
+        CaracteristiquesAnnuelles.objects.bulk_update(
+            caracteristiques_modifiees, ["qualifiantes"], batch_size=1000
+        )
+        Entreprise.objects.bulk_update(
+            entreprises_modifiees, ["caracteristiques_qualifiantes"], batch_size=1000
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(caracteristiques_modifiees)} caractéristiques annuelles et {len(entreprises_modifiees)} entreprises actualisées"
+            )
+        )
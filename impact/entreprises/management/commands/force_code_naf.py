@@ -1,36 +1,35 @@
-import time
-
 from django.core.management.base import BaseCommand
 
-import api.exceptions
-import api.recherche_entreprises
+import api.infos_entreprise
+import api.limiteur
 from entreprises.models import Entreprise
 
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
+        entreprises = {}
         for entreprise in Entreprise.objects.all():
             if entreprise.code_NAF:
                 print(
                     f"IGNORE: {entreprise.siren} {entreprise.denomination} {entreprise.code_NAF}"
                 )
             else:
-                try:
-                    maj(entreprise)
+                entreprises[entreprise.siren] = entreprise
+
+        # les SIREN sont résolus en parallèle, au débit autorisé par le limiteur partagé de l'API
+        resultats = api.infos_entreprise.infos_entreprises(entreprises, actualise=True)
+        with api.limiteur.attente_illimitee():
+            for siren, infos_entreprise, erreur in resultats:
+                if erreur:
+                    print(f"ERREUR {erreur}: {siren}")
+                else:
+                    entreprise = entreprises[siren]
+                    maj(entreprise, infos_entreprise)
                     print(
                         f"OK: {entreprise.siren} {entreprise.denomination} {entreprise.code_NAF}"
                     )
-                except api.exceptions.TooManyRequestError as e:
-                    time.sleep(1)
-                    maj(entreprise)
-                    print(
-                        f"OK (2): {entreprise.siren} {entreprise.denomination} {entreprise.code_NAF}"
-                    )
-                except api.exceptions.APIError as e:
-                    print(f"ERREUR {e}: {entreprise.siren}")
 
 
-def maj(entreprise):
-    infos_entreprise = api.recherche_entreprises.recherche_par_siren(entreprise.siren)
+def maj(entreprise, infos_entreprise):
     entreprise.code_NAF = infos_entreprise["code_NAF"]
     entreprise.save()
@@ -1,22 +1,31 @@
 from django.core.management.base import BaseCommand
 
-import api.exceptions
-import api.recherche_entreprises
+import api.infos_entreprise
+import api.limiteur
 from entreprises.models import Entreprise
 
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
+        entreprises = {}
         for entreprise in Entreprise.objects.all():
             if entreprise.denomination:
                 print(f"IGNORE: {entreprise.siren} {entreprise.denomination}")
             else:
-                try:
-                    infos_entreprise = api.recherche_entreprises.recherche_par_siren(
-                        entreprise.siren
-                    )
-                    entreprise.denomination = infos_entreprise["denomination"]
-                    entreprise.save()
+                entreprises[entreprise.siren] = entreprise
+
+        # les SIREN sont résolus en parallèle, au débit autorisé par le limiteur partagé de l'API
+        resultats = api.infos_entreprise.infos_entreprises(entreprises, actualise=True)
+        with api.limiteur.attente_illimitee():
+            for siren, infos_entreprise, erreur in resultats:
+                if erreur:
+                    print(f"ERREUR {erreur}: {siren}")
+                else:
+                    entreprise = entreprises[siren]
+                    maj(entreprise, infos_entreprise)
                     print(f"OK: {entreprise.siren} {entreprise.denomination}")
-                except api.exceptions.APIError as e:
-                    print(f"ERREUR {e}: {entreprise.siren}")
+
+
+def maj(entreprise, infos_entreprise):
+    entreprise.denomination = infos_entreprise["denomination"]
+    entreprise.save()
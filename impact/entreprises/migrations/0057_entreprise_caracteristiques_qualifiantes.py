@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:48
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "entreprises",
+            "0056_remove_caracteristiquesannuelles_systeme_management_energie",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entreprise",
+            name="caracteristiques_qualifiantes",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="entreprises.caracteristiquesannuelles",
+                verbose_name="Dernières caractéristiques qualifiantes",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:51
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("entreprises", "0057_entreprise_caracteristiques_qualifiantes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="caracteristiquesannuelles",
+            name="qualifiantes",
+            field=models.BooleanField(
+                db_index=True,
+                default=False,
+                editable=False,
+                verbose_name="Caractéristiques qualifiantes",
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from django.db import migrations
+from django.db.models import Prefetch
+from django.utils import timezone
+
+DATE_REQUALIFICATION = timezone.make_aware(datetime.strptime("2024-11-15", "%Y-%m-%d"))
+
+
+def remplit_caracteristiques_qualifiantes(apps, schema_editor):
+    """Remplit l'état qualifiant des caractéristiques annuelles et les dernières caractéristiques qualifiantes
+
+    Les règles de qualification sont celles de CaracteristiquesAnnuelles.sont_qualifiantes à la date de la migration.
+    Les mises à jour en masse ne modifient pas les dates de mise à jour.
+    """
+    Entreprise = apps.get_model("entreprises", "Entreprise")
+    CaracteristiquesAnnuelles = apps.get_model(
+        "entreprises", "CaracteristiquesAnnuelles"
+    )
+    caracteristiques_modifiees = []
+    entreprises_modifiees = []
+    for entreprise in Entreprise.objects.prefetch_related(
+        Prefetch(
+            "caracteristiquesannuelles_set",
+            queryset=CaracteristiquesAnnuelles.objects.order_by("-annee"),
+        )
+    ).iterator(chunk_size=1000):
+        dernieres_caracteristiques_qualifiantes = None
+        for caracteristiques in entreprise.caracteristiquesannuelles_set.all():
+            qualifiantes = sont_qualifiantes(caracteristiques, entreprise)
+            if qualifiantes != caracteristiques.qualifiantes:
+                caracteristiques.qualifiantes = qualifiantes
+                caracteristiques_modifiees.append(caracteristiques)
+            if qualifiantes and not dernieres_caracteristiques_qualifiantes:
+                dernieres_caracteristiques_qualifiantes = caracteristiques
+        if dernieres_caracteristiques_qualifiantes:
+            entreprise.caracteristiques_qualifiantes = (
+                dernieres_caracteristiques_qualifiantes
+            )
+            entreprises_modifiees.append(entreprise)
+    CaracteristiquesAnnuelles.objects.bulk_update(
+        caracteristiques_modifiees, ["qualifiantes"], batch_size=1000
+    )
+    Entreprise.objects.bulk_update(
+        entreprises_modifiees, ["caracteristiques_qualifiantes"], batch_size=1000
+    )
+
+
+def sont_qualifiantes(caracteristiques, entreprise):
+    return bool(
+        caracteristiques.date_cloture_exercice
+        and entreprise.code_NAF
+        and entreprise.updated_at > DATE_REQUALIFICATION
+        and caracteristiques.effectif
+        and caracteristiques.effectif_securite_sociale
+        and caracteristiques.effectif_outre_mer
+        and caracteristiques.tranche_chiffre_affaires
+        and caracteristiques.tranche_bilan
+        and entreprise.est_cotee is not None
+        and entreprise.est_interet_public is not None
+        and caracteristiques.bdese_accord is not None
+        and caracteristiques.tranche_consommation_energie_finale
+        and groupe_est_qualifie(caracteristiques, entreprise)
+    )
+
+
+def groupe_est_qualifie(caracteristiques, entreprise):
+    if entreprise.appartient_groupe is None:
+        return False
+    elif not entreprise.appartient_groupe:
+        return True
+    else:
+        comptes_consolides_sont_qualifies = bool(
+            not entreprise.comptes_consolides
+            or (
+                caracteristiques.tranche_chiffre_affaires_consolide
+                and caracteristiques.tranche_bilan_consolide
+            )
+        )
+        return bool(
+            caracteristiques.effectif_groupe
+            and caracteristiques.effectif_groupe_france
+            and entreprise.est_societe_mere is not None
+            and entreprise.societe_mere_en_france is not None
+            and entreprise.comptes_consolides is not None
+            and comptes_consolides_sont_qualifies
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("entreprises", "0058_caracteristiquesannuelles_qualifiantes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remplit_caracteristiques_qualifiantes, migrations.RunPython.noop
+        ),
+    ]
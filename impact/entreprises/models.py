@@ -8,6 +8,7 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db import transaction
 from django.utils import timezone
 
 import api
@@ -24,6 +25,18 @@ DENOMINATION_MAX_LENGTH = 250
 # si aucune MàJ n'a eu lieu après cette date.
 DATE_REQUALIFICATION = timezone.make_aware(datetime.strptime("2024-11-15", "%Y-%m-%d"))
 
+# champs de l'entreprise lus par CaracteristiquesAnnuelles.sont_qualifiantes
+CHAMPS_QUALIFICATION_ENTREPRISE = (
+    "code_NAF",
+    "updated_at",
+    "est_cotee",
+    "est_interet_public",
+    "appartient_groupe",
+    "est_societe_mere",
+    "societe_mere_en_france",
+    "comptes_consolides",
+)
+
 
 @dataclass
 class ActualisationCaracteristiquesAnnuelles:
@@ -139,40 +152,44 @@ def convertit_code_NAF(code_NAF):
             return {"code": code, "label": label}
 
 
+# EEE : Espace économique européen
+CODES_PAYS_EEE = (
+    99109,  # Allemagne
+    99110,  # Autriche
+    99131,  # Belgique
+    99111,  # Bulgarie
+    99254,  # Chypre
+    99119,  # Croatie
+    99101,  # Danemark
+    99134,  # Espagne
+    99106,  # Estonie
+    99105,  # Finlande
+    None,  # France
+    99126,  # Grèce
+    99112,  # Hongrie
+    99136,  # Irlande
+    99102,  # Islande
+    99127,  # Italie
+    99107,  # Lettonie
+    99113,  # Liechtenstein
+    99108,  # Lituanie
+    99137,  # Luxembourg
+    99144,  # Malte
+    99103,  # Norvège
+    99135,  # Pays-Bas
+    99122,  # Pologne
+    99139,  # Portugal
+    99116,  # République tchèque
+    99114,  # Roumanie
+    99117,  # Slovaquie
+    99145,  # Slovénie
+    99104,  # Suède
+)
+
+
 def est_dans_EEE(code_pays_etranger):
     """EEE : Espace économique européen"""
-    return code_pays_etranger in (
-        99109,  # Allemagne
-        99110,  # Autriche
-        99131,  # Belgique
-        99111,  # Bulgarie
-        99254,  # Chypre
-        99119,  # Croatie
-        99101,  # Danemark
-        99134,  # Espagne
-        99106,  # Estonie
-        99105,  # Finlande
-        None,  # France
-        99126,  # Grèce
-        99112,  # Hongrie
-        99136,  # Irlande
-        99102,  # Islande
-        99127,  # Italie
-        99107,  # Lettonie
-        99113,  # Liechtenstein
-        99108,  # Lituanie
-        99137,  # Luxembourg
-        99144,  # Malte
-        99103,  # Norvège
-        99135,  # Pays-Bas
-        99122,  # Pologne
-        99139,  # Portugal
-        99116,  # République tchèque
-        99114,  # Roumanie
-        99117,  # Slovaquie
-        99145,  # Slovénie
-        99104,  # Suède
-    )
+    return code_pays_etranger in CODES_PAYS_EEE
 
 
 @dataclass
@@ -247,10 +264,80 @@ class Entreprise(TimestampedModel):
     analyses_ia = models.ManyToManyField(
         AnalyseIA, related_name="entreprises", blank=True
     )
+    # dénormalisation de la recherche des dernières caractéristiques qualifiantes,
+    # maintenue à l'enregistrement de l'entreprise et de ses caractéristiques annuelles
+    # et à la suppression de caractéristiques annuelles (cf. entreprises.signals),
+    # mais jamais écrite par un enregistrement ordinaire de l'entreprise (cf. _do_update)
+    # Les modifications en masse (update, bulk_create) doivent être suivies de actualise_caracteristiques_qualifiantes
+    # ou de la commande du même nom.
+    caracteristiques_qualifiantes = models.ForeignKey(
+        "CaracteristiquesAnnuelles",
+        verbose_name="Dernières caractéristiques qualifiantes",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     def __str__(self):
         return f"{self.siren} {self.denomination}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        entreprise = super().from_db(db, field_names, values)
+        entreprise._qualification_enregistree = entreprise._valeurs_qualification()
+        return entreprise
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None:
+            self._qualification_enregistree = self._valeurs_qualification()
+        else:
+            # valeurs enregistrées inconnues : la qualification sera recalculée au prochain enregistrement
+            self.__dict__.pop("_qualification_enregistree", None)
+
+    def save(self, *args, **kwargs):
+        creation = self._state.adding
+        super().save(*args, **kwargs)
+        # la qualification dépend aussi des données de l'entreprise :
+        # recalculée uniquement si les champs lus par la qualification ont changé
+        # (une nouvelle entreprise n'a pas encore de caractéristiques annuelles)
+        valeurs_qualification = self._valeurs_qualification()
+        if not creation and valeurs_qualification != getattr(
+            self, "_qualification_enregistree", None
+        ):
+            with transaction.atomic():
+                self.actualise_caracteristiques_qualifiantes()
+        self._qualification_enregistree = valeurs_qualification
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # les dernières caractéristiques qualifiantes ne sont écrites que par actualise_caracteristiques_qualifiantes
+        # (sauf demande explicite) : une instance chargée avant une requalification
+        # ne remet pas l'ancienne valeur en base à son prochain enregistrement
+        if (
+            update_fields is None
+            or "caracteristiques_qualifiantes" not in update_fields
+        ):
+            values = [
+                valeur
+                for valeur in values
+                if valeur[0].name != "caracteristiques_qualifiantes"
+            ]
+        return super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        )
+
+    def _valeurs_qualification(self):
+        # les champs différés valent DEFERRED, tant qu'ils ne sont pas chargés ils ne sont pas enregistrés
+        valeurs = {
+            champ: self.__dict__.get(champ, models.DEFERRED)
+            for champ in CHAMPS_QUALIFICATION_ENTREPRISE
+        }
+        if isinstance(valeurs["updated_at"], datetime):
+            valeurs["updated_at"] = valeurs["updated_at"] > DATE_REQUALIFICATION
+        return valeurs
+
     @property
     def dernier_exercice_clos(self):
         annee_en_cours = date.today().year
@@ -287,11 +374,29 @@ class Entreprise(TimestampedModel):
 
     @property
     def dernieres_caracteristiques_qualifiantes(self):
-        for caracteristiques in CaracteristiquesAnnuelles.objects.filter(
-            entreprise=self,
-        ).order_by("-annee"):
-            if caracteristiques.sont_qualifiantes:
-                return caracteristiques
+        if caracteristiques := self.caracteristiques_qualifiantes:
+            caracteristiques.entreprise = self
+        return caracteristiques
+
+    def actualise_caracteristiques_qualifiantes(self):
+        """recalcule l'état qualifiant des caractéristiques annuelles et les dernières caractéristiques qualifiantes
+
+        Les mises à jour sont ciblées : elles ne modifient pas les dates de mise à jour.
+        """
+        dernieres_caracteristiques_qualifiantes, modifiees = (
+            qualifie_caracteristiques_annuelles(
+                self,
+                CaracteristiquesAnnuelles.objects.filter(entreprise=self).order_by(
+                    "-annee"
+                ),
+            )
+        )
+        # bulk_update ne modifie pas les dates de mise à jour
+        CaracteristiquesAnnuelles.objects.bulk_update(modifiees, ["qualifiantes"])
+        Entreprise.objects.filter(pk=self.pk).update(
+            caracteristiques_qualifiantes=dernieres_caracteristiques_qualifiantes
+        )
+        self.caracteristiques_qualifiantes = dernieres_caracteristiques_qualifiantes
 
     @property
     def dernieres_caracteristiques(self):
@@ -593,6 +698,14 @@ class CaracteristiquesAnnuelles(TimestampedModel):
         choices=[BLANK_CHOICE] + CONSOMMATION_ENERGIE_CHOICES,
         null=True,
     )
+    # valeur enregistrée de sont_qualifiantes, pour les requêtes sur la qualification des entreprises
+    # maintenue comme Entreprise.caracteristiques_qualifiantes (cf. Entreprise.actualise_caracteristiques_qualifiantes)
+    qualifiantes = models.BooleanField(
+        verbose_name="Caractéristiques qualifiantes",
+        default=False,
+        db_index=True,
+        editable=False,
+    )
 
     class Meta:
         constraints = [
@@ -604,6 +717,12 @@ class CaracteristiquesAnnuelles(TimestampedModel):
         verbose_name = "Caractéristiques annuelles"
         verbose_name_plural = "Caractéristiques annuelles"
 
+    def save(self, *args, **kwargs):
+        self.qualifiantes = self.sont_qualifiantes
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.entreprise.actualise_caracteristiques_qualifiantes()
+
     @property
     def groupe_est_qualifie(self):
         if self.entreprise.appartient_groupe is None:
@@ -651,3 +770,22 @@ class CaracteristiquesAnnuelles(TimestampedModel):
             self.date_cloture_exercice.month == 12
             and self.date_cloture_exercice.day == 31
         )
+
+
+def qualifie_caracteristiques_annuelles(entreprise, caracteristiques_annuelles):
+    """recalcule l'état qualifiant des caractéristiques annuelles d'une entreprise, triées par année décroissante
+
+    Renvoie les dernières caractéristiques qualifiantes et les caractéristiques dont l'état qualifiant a changé
+    (modifiées mais pas enregistrées).
+    """
+    dernieres_caracteristiques_qualifiantes = None
+    modifiees = []
+    for caracteristiques in caracteristiques_annuelles:
+        caracteristiques.entreprise = entreprise
+        qualifiantes = caracteristiques.sont_qualifiantes
+        if qualifiantes != caracteristiques.qualifiantes:
+            caracteristiques.qualifiantes = qualifiantes
+            modifiees.append(caracteristiques)
+        if qualifiantes and not dernieres_caracteristiques_qualifiantes:
+            dernieres_caracteristiques_qualifiantes = caracteristiques
+    return dernieres_caracteristiques_qualifiantes, modifiees
@@ -0,0 +1,21 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
+
+# Maintien des dernières caractéristiques qualifiantes d'une entreprise (cf. Entreprise.caracteristiques_qualifiantes)
+#
+# post_delete est aussi émis pour les suppressions d'un queryset (dont l'action de suppression de l'admin) :
+# la clé étrangère est remise à NULL par la suppression et doit désigner les caractéristiques qualifiantes précédentes.
+
+
+@receiver(post_delete, sender=CaracteristiquesAnnuelles)
+def actualise_caracteristiques_qualifiantes(sender, instance, origin, **kwargs):
+    # les suppressions en cascade d'une entreprise ne concernent pas ses caractéristiques qualifiantes
+    if isinstance(origin, Entreprise) or (
+        isinstance(origin, QuerySet) and origin.model is Entreprise
+    ):
+        return
+    instance.entreprise.actualise_caracteristiques_qualifiantes()
@@ -2,6 +2,10 @@ import pytest
 from django.core.management import call_command
 
 import api.exceptions
+from api.infos_entreprise import cache_identite
+from entreprises.management.commands.actualise_caracteristiques_qualifiantes import (
+    Command as CommandCaracteristiquesQualifiantes,
+)
 from entreprises.management.commands.force_categorie_juridique_sirene import (
     Command as CommandCategorieJuridiqueSirene,
 )
@@ -10,6 +14,7 @@ from entreprises.management.commands.force_denomination import (
     Command as CommandDenomination,
 )
 from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
 
 
 @pytest.mark.django_db(transaction=True)
@@ -52,6 +57,32 @@ def test_ne_modifie_pas_la_denomination_si_deja_remplie(
     assert entreprise_non_qualifiee.denomination == RAISON_SOCIALE
 
 
+@pytest.mark.django_db(transaction=True)
+def test_ignore_les_informations_en_cache(db, mocker, entreprise_non_qualifiee):
+    entreprise_non_qualifiee.denomination = ""
+    entreprise_non_qualifiee.save()
+    cache_identite.get(
+        entreprise_non_qualifiee.siren,
+        lambda: {
+            "siren": entreprise_non_qualifiee.siren,
+            "denomination": "ANCIENNE RAISON SOCIALE",
+        },
+    )
+
+    mocker.patch(
+        "api.recherche_entreprises.recherche_par_siren",
+        return_value={
+            "siren": entreprise_non_qualifiee.siren,
+            "effectif": CaracteristiquesAnnuelles.EFFECTIF_ENTRE_50_ET_249,
+            "denomination": "RAISON SOCIALE",
+        },
+    )
+    CommandDenomination().handle()
+
+    entreprise_non_qualifiee.refresh_from_db()
+    assert entreprise_non_qualifiee.denomination == "RAISON SOCIALE"
+
+
 @pytest.mark.django_db(transaction=True)
 def test_erreur_de_l_api(capsys, db, mocker, entreprise_non_qualifiee):
     entreprise_non_qualifiee.denomination = ""
@@ -61,6 +92,10 @@ def test_erreur_de_l_api(capsys, db, mocker, entreprise_non_qualifiee):
         "api.recherche_entreprises.recherche_par_siren",
         side_effect=api.exceptions.APIError,
     )
+    mocker.patch(
+        "api.sirene.recherche_unite_legale_par_siren",
+        side_effect=api.exceptions.APIError,
+    )
     call_command("force_denomination")
 
     assert entreprise_non_qualifiee.denomination == ""
@@ -159,3 +194,36 @@ def test_ne_modifie_pas_le_code_NAF_si_deja_remplie(
 
     entreprise_non_qualifiee.refresh_from_db()
     assert entreprise_non_qualifiee.code_NAF == CODE_NAF_ENREGISTRE
+
+
+def test_actualise_les_caracteristiques_qualifiantes(entreprise_factory):
+    entreprise = entreprise_factory()
+    entreprise_sans_caracteristiques_qualifiantes = entreprise_factory(
+        siren="000000002", est_cotee=None
+    )
+    # valeurs obsolètes, par exemple après une modification des critères de qualification
+    CaracteristiquesAnnuelles.objects.update(qualifiantes=False)
+    Entreprise.objects.filter(pk=entreprise.pk).update(
+        caracteristiques_qualifiantes=None
+    )
+    Entreprise.objects.filter(
+        pk=entreprise_sans_caracteristiques_qualifiantes.pk
+    ).update(
+        caracteristiques_qualifiantes=entreprise_sans_caracteristiques_qualifiantes.dernieres_caracteristiques
+    )
+
+    CommandCaracteristiquesQualifiantes().handle()
+
+    entreprise.refresh_from_db()
+    entreprise_sans_caracteristiques_qualifiantes.refresh_from_db()
+    assert (
+        entreprise.caracteristiques_qualifiantes
+        == entreprise.dernieres_caracteristiques
+    )
+    assert (
+        entreprise_sans_caracteristiques_qualifiantes.caracteristiques_qualifiantes
+        is None
+    )
+    assert list(CaracteristiquesAnnuelles.objects.filter(qualifiantes=True)) == [
+        entreprise.dernieres_caracteristiques
+    ]
@@ -4,7 +4,9 @@ from datetime import timedelta
 from datetime import timezone
 
 import pytest
+from django.db import connection
 from django.db import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
 
 from conftest import CODE_AUTRE
@@ -265,6 +267,165 @@ def test_dernieres_caracteristiques_qualifiantes(entreprise_non_qualifiee):
         )
 
 
+def test_dernieres_caracteristiques_qualifiantes_maintenues_a_l_enregistrement(
+    entreprise_factory,
+):
+    entreprise = entreprise_factory(date_cloture_exercice=date(2023, 12, 31))
+    caracteristiques_2023 = entreprise.caracteristiques_annuelles(2023)
+    entreprise_en_base = Entreprise.objects.get(pk=entreprise.pk)
+    assert entreprise_en_base.caracteristiques_qualifiantes == caracteristiques_2023
+
+    caracteristiques_2024 = CaracteristiquesAnnuelles.objects.get(
+        pk=caracteristiques_2023.pk
+    )
+    caracteristiques_2024.pk = None
+    caracteristiques_2024.annee = 2024
+    caracteristiques_2024.date_cloture_exercice = date(2024, 12, 31)
+    caracteristiques_2024.save()
+    entreprise_en_base.refresh_from_db()
+    assert entreprise_en_base.caracteristiques_qualifiantes == caracteristiques_2024
+
+    caracteristiques_2024.delete()
+    entreprise_en_base.refresh_from_db()
+    assert entreprise_en_base.caracteristiques_qualifiantes == caracteristiques_2023
+
+    # la qualification dépend aussi des données de l'entreprise
+    entreprise.est_cotee = None
+    entreprise.save()
+    entreprise_en_base.refresh_from_db()
+    assert entreprise_en_base.caracteristiques_qualifiantes is None
+    assert entreprise.dernieres_caracteristiques_qualifiantes is None
+
+
+def test_dernieres_caracteristiques_qualifiantes_maintenues_a_la_suppression_d_un_queryset(
+    entreprise_factory,
+):
+    entreprise = entreprise_factory(date_cloture_exercice=date(2023, 12, 31))
+    caracteristiques_2023 = entreprise.caracteristiques_annuelles(2023)
+    caracteristiques_2024 = CaracteristiquesAnnuelles.objects.get(
+        pk=caracteristiques_2023.pk
+    )
+    caracteristiques_2024.pk = None
+    caracteristiques_2024.annee = 2024
+    caracteristiques_2024.save()
+
+    CaracteristiquesAnnuelles.objects.filter(pk=caracteristiques_2024.pk).delete()
+
+    assert (
+        Entreprise.objects.get(pk=entreprise.pk).caracteristiques_qualifiantes
+        == caracteristiques_2023
+    )
+
+
+def test_suppression_d_une_entreprise_qualifiee(entreprise_factory):
+    entreprise = entreprise_factory()
+
+    Entreprise.objects.filter(pk=entreprise.pk).delete()
+
+    assert not CaracteristiquesAnnuelles.objects.exists()
+
+
+def test_qualification_recalculee_uniquement_si_les_champs_lus_sont_modifies(
+    entreprise_factory,
+):
+    entreprise = Entreprise.objects.get(pk=entreprise_factory().pk)
+
+    entreprise.denomination = "Nouvelle dénomination"
+    with CaptureQueriesContext(connection) as requetes:
+        entreprise.save()
+    assert not any(
+        "entreprises_caracteristiquesannuelles" in requete["sql"]
+        for requete in requetes
+    )
+
+    entreprise.est_cotee = None
+    entreprise.save()
+    assert (
+        Entreprise.objects.get(pk=entreprise.pk).caracteristiques_qualifiantes is None
+    )
+
+
+def test_enregistrement_d_une_entreprise_chargee_avant_une_requalification(
+    entreprise_factory,
+):
+    entreprise = entreprise_factory(date_cloture_exercice=date(2023, 12, 31))
+    caracteristiques_2023 = entreprise.caracteristiques_annuelles(2023)
+    entreprise_chargee = Entreprise.objects.get(pk=entreprise.pk)
+    caracteristiques_2024 = CaracteristiquesAnnuelles.objects.get(
+        pk=caracteristiques_2023.pk
+    )
+    caracteristiques_2024.pk = None
+    caracteristiques_2024.annee = 2024
+    caracteristiques_2024.save()
+
+    entreprise_chargee.denomination = "Nouvelle dénomination"
+    entreprise_chargee.save()
+
+    assert (
+        Entreprise.objects.get(pk=entreprise.pk).caracteristiques_qualifiantes
+        == caracteristiques_2024
+    )
+
+    # l'ancienne valeur n'est pas réécrite même si ses caractéristiques ont été supprimées
+    entreprise_chargee = Entreprise.objects.get(pk=entreprise.pk)
+    caracteristiques_2024.delete()
+    entreprise_chargee.save()
+    assert (
+        Entreprise.objects.get(pk=entreprise.pk).caracteristiques_qualifiantes
+        == caracteristiques_2023
+    )
+
+
+def test_dernieres_caracteristiques_qualifiantes_sans_requete(
+    entreprise_factory, django_assert_num_queries
+):
+    entreprise = Entreprise.objects.select_related("caracteristiques_qualifiantes").get(
+        pk=entreprise_factory().pk
+    )
+
+    with django_assert_num_queries(0):
+        caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+        assert caracteristiques.entreprise == entreprise
+
+
+def test_actualise_caracteristiques_qualifiantes_conserve_la_date_de_mise_a_jour(
+    entreprise_factory,
+):
+    entreprise = entreprise_factory()
+    date_mise_a_jour = Entreprise.objects.get(pk=entreprise.pk).updated_at
+
+    entreprise.actualise_caracteristiques_qualifiantes()
+
+    assert Entreprise.objects.get(pk=entreprise.pk).updated_at == date_mise_a_jour
+
+
+def test_etat_qualifiant_enregistre(entreprise_factory):
+    entreprise = entreprise_factory(date_cloture_exercice=date(2023, 12, 31))
+    caracteristiques = entreprise.caracteristiques_annuelles(2023)
+    assert caracteristiques.qualifiantes
+    entreprise_non_qualifiee = entreprise_factory(siren="000000002", effectif=None)
+    assert not entreprise_non_qualifiee.dernieres_caracteristiques.qualifiantes
+
+    assert list(
+        Entreprise.objects.exclude(caracteristiquesannuelles__qualifiantes=True)
+    ) == [entreprise_non_qualifiee]
+
+    caracteristiques.tranche_bilan = None
+    caracteristiques.save()
+    assert not CaracteristiquesAnnuelles.objects.get(
+        pk=caracteristiques.pk
+    ).qualifiantes
+
+    caracteristiques.tranche_bilan = CaracteristiquesAnnuelles.BILAN_MOINS_DE_450K
+    caracteristiques.save()
+    # la qualification dépend aussi des données de l'entreprise
+    entreprise.appartient_groupe = None
+    entreprise.save()
+    assert not CaracteristiquesAnnuelles.objects.get(
+        pk=caracteristiques.pk
+    ).qualifiantes
+
+
 def test_actualise_caracteristiques(entreprise_non_qualifiee):
     assert entreprise_non_qualifiee.caracteristiques_actuelles() is None
 
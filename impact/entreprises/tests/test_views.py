@@ -800,6 +800,26 @@ def test_recherche_entreprise_avec_resultats(
     assert reverse("entreprises:preremplissage_siren") in content
 
 
+def test_recherche_entreprise_depassee_par_une_recherche_plus_recente(
+    client, mock_api_recherche_par_nom_ou_siren
+):
+    client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 32
+    client.get(
+        "/entreprises/fragments/recherche-entreprise",
+        query_params={"recherche": "Entreprise SAS"},
+        headers={"X-Request-Start": "t=1700000002.000"},
+    )
+
+    response = client.get(
+        "/entreprises/fragments/recherche-entreprise",
+        query_params={"recherche": "Entreprise SA"},
+        headers={"X-Request-Start": "t=1700000001.000"},
+    )
+
+    assert response.status_code == 204
+    mock_api_recherche_par_nom_ou_siren.assert_called_once_with("Entreprise SAS")
+
+
 def test_recherche_entreprise_moins_de_3_caractères(
     client, mock_api_recherche_par_nom_ou_siren
 ):
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import BadRequest
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.shortcuts import render
 
@@ -19,6 +20,7 @@ from entreprises.forms import PreremplissageSirenForm
 from habilitations.models import Habilitation
 from habilitations.models import HabilitationError
 from users.forms import message_erreur_proprietaires
+from utils.htmx import requete_depassee
 
 
 def get_current_entreprise(request):
@@ -218,12 +220,17 @@ def recherche_entreprise(request):
             }
         ]
     elif len(recherche) >= 3:
+        # une frappe plus récente rend cette recherche inutile : rien n'est renvoyé (HTMX ne remplace pas la cible sur une 204)
+        if requete_depassee(request, "recherche_entreprise"):
+            return HttpResponse(status=204)
         try:
             resultats = api.infos_entreprise.recherche_par_nom_ou_siren(recherche)
             nombre_resultats = resultats["nombre_resultats"]
             entreprises = resultats["entreprises"]
         except APIError as e:
             erreur_recherche_entreprise = str(e)
+        if requete_depassee(request, "recherche_entreprise"):
+            return HttpResponse(status=204)
     return render(
         request,
         "fragments/resultats_recherche_entreprise.html",
@@ -85,6 +85,8 @@ MIDDLEWARE = [
     "utils.middlewares.HTMXRequestMiddleware",
     "utils.middlewares.HTMXRetargetMiddleware",
     "utils.middlewares.HTMXAuthRedirectMiddleware",
+    # mémorisation des critères des réglementations le temps de la requête
+    "reglementations.middlewares.EvaluationReglementationsMiddleware",
     # django-hosts : doit être à la fin
     "django_hosts.middleware.HostsResponseMiddleware",
 ]
@@ -124,6 +126,30 @@ DATABASES = {
 
 DATABASE_ROUTERS = ["impact.db_routers.MetabaseRouter"]
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# - "default" : cache mémoire propre à chaque processus,
+# - "partage" : cache en base de données commun à tous les workers
+#   (la table est créée par la commande `createcachetable`).
+# Le cache partagé n'a ni incrément atomique ni accès en un seul aller-retour pour les écritures
+# (comptage des entrées, lecture puis écriture) : il n'est lu qu'après un échec du cache local
+# et écrit après un appel aux API, bien plus long que ces requêtes, ou à un changement d'état d'un disjoncteur.
+# Les compteurs fréquemment incrémentés restent dans le cache local (cf. api.disjoncteur).
+# Le nombre maximal d'entrées, au-delà duquel chaque écriture purge une partie du cache, est relevé en conséquence.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+    "partage": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_partage",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CACHE_PARTAGE_MAX_ENTRIES", 100_000))
+        },
+    },
+}
+
 # Storages
 MEDIA_ROOT = Path(BASE_DIR, "media")
 MEDIA_URL = "media/"
@@ -296,6 +322,116 @@ API_SIRENE_KEY = os.getenv("API_SIRENE_KEY")
 API_ANALYSE_IA_BASE_URL = os.getenv("API_ANALYSE_IA_BASE_URL")
 API_ANALYSE_IA_TOKEN = os.getenv("API_ANALYSE_IA_TOKEN", "")
 
+# Transport HTTP des clients API (cf. api.transport) :
+# - taille maximale du pool de connexions conservées par hôte,
+# - nombre de nouvelles tentatives (429, 502, 503 et 504, au plus une sur erreur de connexion) et facteur de backoff exponentiel,
+# - attente maximale (en secondes) demandée par l'en-tête Retry-After qui est respectée.
+API_HTTP_POOL_MAXSIZE = int(os.getenv("API_HTTP_POOL_MAXSIZE", 10))
+API_HTTP_RETRIES = int(os.getenv("API_HTTP_RETRIES", 1))
+API_HTTP_BACKOFF_FACTOR = float(os.getenv("API_HTTP_BACKOFF_FACTOR", 0.2))
+API_HTTP_RETRY_AFTER_MAX = float(os.getenv("API_HTTP_RETRY_AFTER_MAX", 2))
+
+# Cache des informations entreprise (cf. api.cache) :
+# durées de validité (en secondes) des données d'identité et des données financières,
+# et durée pendant laquelle une donnée expirée peut encore être servie pendant son rafraîchissement.
+API_CACHE_IDENTITE_TTL = int(os.getenv("API_CACHE_IDENTITE_TTL", 60 * 60 * 24))
+API_CACHE_DONNEES_FINANCIERES_TTL = int(
+    os.getenv("API_CACHE_DONNEES_FINANCIERES_TTL", 60 * 60 * 24 * 7)
+)
+API_CACHE_PERIME_TTL = int(os.getenv("API_CACHE_PERIME_TTL", 60 * 60 * 24 * 7))
+# Cache des recherches d'entreprise par nom ou SIREN (autocomplétion) :
+# durées courtes car les résultats ne sont utiles que le temps de la saisie.
+API_CACHE_RECHERCHE_TTL = int(os.getenv("API_CACHE_RECHERCHE_TTL", 60 * 10))
+API_CACHE_RECHERCHE_PERIME_TTL = int(
+    os.getenv("API_CACHE_RECHERCHE_PERIME_TTL", 60 * 5)
+)
+
+# Récupération des informations entreprise avec données financières (cf. api.infos_entreprise) :
+# appels concurrents aux API d'identité et de données financières, et délai global (en secondes)
+# dans lequel les deux sont attendues : au-delà, les données financières sont laissées vides
+# et l'absence des données d'identité est traitée comme une erreur de l'API.
+API_INFOS_ENTREPRISE_APPELS_CONCURRENTS = (
+    os.getenv("API_INFOS_ENTREPRISE_APPELS_CONCURRENTS", "true") == "true"
+)
+API_INFOS_ENTREPRISE_DELAI = float(os.getenv("API_INFOS_ENTREPRISE_DELAI", 5))
+
+# État de publication de l'index EgaPro conservé localement (cf. reglementations.models.PublicationIndexEgapro) :
+# durées de validité (en secondes) d'un index publié et d'un index non publié.
+API_EGAPRO_PUBLICATION_TTL = int(
+    os.getenv("API_EGAPRO_PUBLICATION_TTL", 60 * 60 * 24 * 30)
+)
+API_EGAPRO_PUBLICATION_NEGATIVE_TTL = int(
+    os.getenv("API_EGAPRO_PUBLICATION_NEGATIVE_TTL", 60 * 60 * 24)
+)
+
+# Instantané local des publications Bilans GES (cf. reglementations.models.PublicationBGES) :
+# nombre de jours au-delà duquel l'instantané est considéré obsolète et l'API Bilans GES de nouveau interrogée.
+BGES_INSTANTANE_DUREE_VALIDITE = int(os.getenv("BGES_INSTANTANE_DUREE_VALIDITE", 7))
+# Réponses de l'API Bilans GES pour les SIREN absents de l'instantané :
+# durées de validité (en secondes) d'un bilan publié et d'une absence de publication.
+API_BGES_PUBLICATION_TTL = int(os.getenv("API_BGES_PUBLICATION_TTL", 60 * 60 * 24 * 7))
+API_BGES_PUBLICATION_NEGATIVE_TTL = int(
+    os.getenv("API_BGES_PUBLICATION_NEGATIVE_TTL", 60 * 60 * 24)
+)
+
+# Calcul des statuts des réglementations dépendant d'API externes (cf. reglementations.statuts) :
+# calculs concurrents, et délai global (en secondes) pour l'ensemble des statuts d'une page
+# au-delà duquel un statut signalant un problème technique est affiché.
+REGLEMENTATIONS_STATUTS_CALCULS_CONCURRENTS = (
+    os.getenv("REGLEMENTATIONS_STATUTS_CALCULS_CONCURRENTS", "true") == "true"
+)
+REGLEMENTATIONS_STATUTS_DELAI = float(os.getenv("REGLEMENTATIONS_STATUTS_DELAI", 5))
+# Durée (en secondes) de mise en cache par le navigateur des cartes de réglementation chargées séparément
+# (cf. reglementations.views.reglementations_cartes)
+REGLEMENTATIONS_CARTE_CACHE_TTL = int(os.getenv("REGLEMENTATIONS_CARTE_CACHE_TTL", 60))
+
+# Enregistrement des données de la simulation publique dans un thread, après le rendu du résultat
+# (cf. public.views.enregistre_simulation)
+SIMULATION_ENREGISTREMENT_DIFFERE = (
+    os.getenv("SIMULATION_ENREGISTREMENT_DIFFERE", "true") == "true"
+)
+
+# Consultation de la copie locale du stock Sirene (cf. api.models.UniteLegale et la commande import_stock_sirene)
+# avant les API pour les informations d'identité des entreprises
+API_STOCK_SIRENE_ACTIF = os.getenv("API_STOCK_SIRENE_ACTIF", "true") == "true"
+# Consultation des ratios financiers importés localement (cf. api.models.RatiosFinanciers et la commande import_ratios_financiers)
+# avant l'API ratios financiers pour les données financières des entreprises
+API_STOCK_RATIOS_FINANCIERS_ACTIF = (
+    os.getenv("API_STOCK_RATIOS_FINANCIERS_ACTIF", "true") == "true"
+)
+
+# Nombre maximum d'appels simultanés lors des résolutions de SIREN par lot (cf. api.infos_entreprise.infos_entreprises)
+API_RESOLUTION_PAR_LOT_CONCURRENCE = int(
+    os.getenv("API_RESOLUTION_PAR_LOT_CONCURRENCE", 4)
+)
+
+# Limiteur de débit partagé des appels sortants (cf. api.limiteur) :
+# débit (appels par seconde) et capacité (nombre d'appels en rafale) par hôte,
+# attente maximale (en secondes) d'un appel avant d'abandonner hors traitement par lot.
+API_LIMITES_DEBIT = {
+    "recherche-entreprises.api.gouv.fr": (
+        float(os.getenv("API_RECHERCHE_ENTREPRISES_DEBIT", 7)),
+        int(os.getenv("API_RECHERCHE_ENTREPRISES_CAPACITE", 7)),
+    ),
+    "api.insee.fr": (
+        float(os.getenv("API_SIRENE_DEBIT", 0.5)),
+        int(os.getenv("API_SIRENE_CAPACITE", 30)),
+    ),
+}
+API_LIMITEUR_ATTENTE_MAX = float(os.getenv("API_LIMITEUR_ATTENTE_MAX", 1))
+
+# Disjoncteurs des API distantes (cf. api.disjoncteur) :
+# - fenêtre glissante (en secondes) sur laquelle sont comptabilisés les appels,
+# - nombre minimum d'appels et part d'échecs (erreurs ou appels plus lents que le seuil de latence) déclenchant l'ouverture,
+# - durée (en secondes) d'ouverture avant un nouvel appel de test.
+API_DISJONCTEUR_FENETRE = int(os.getenv("API_DISJONCTEUR_FENETRE", 60))
+API_DISJONCTEUR_NOMBRE_MINIMUM_APPELS = int(
+    os.getenv("API_DISJONCTEUR_NOMBRE_MINIMUM_APPELS", 10)
+)
+API_DISJONCTEUR_SEUIL_ECHECS = float(os.getenv("API_DISJONCTEUR_SEUIL_ECHECS", 0.5))
+API_DISJONCTEUR_SEUIL_LATENCE = float(os.getenv("API_DISJONCTEUR_SEUIL_LATENCE", 2))
+API_DISJONCTEUR_DUREE_OUVERTURE = int(os.getenv("API_DISJONCTEUR_DUREE_OUVERTURE", 30))
+
 # django-hosts :
 # https://django-hosts.readthedocs.io/en/latest/
 ROOT_HOSTCONF = "impact.hosts"
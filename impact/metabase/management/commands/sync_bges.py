@@ -1,5 +1,6 @@
 import asyncio
 import csv
+from datetime import date
 from datetime import datetime
 
 import aiohttp
@@ -8,6 +9,9 @@ from six import StringIO
 
 from api.exceptions import APIError
 from metabase.models import TempBGES
+from reglementations.models import PublicationBGES
+from reglementations.models import StatutReglementation
+from reglementations.views.bges import BGESReglementation
 
 BASE_API_URL = "https://bilans-ges.ademe.fr"
 MEDIAS_URL = f"{BASE_API_URL}/api/exports/public-inventories/latest"
@@ -39,6 +43,9 @@ class Command(BaseCommand):
         # enregistrement dans la table de travail
         self._maj_table_temp_bges(result)
 
+        # instantané utilisé pour le calcul du statut de la réglementation BGES
+        self._maj_publications_bges(result)
+
     async def _fetch_file_url(self, session) -> str:
         # récupère la dernière version du fichier d'export BGES
         async with session.get(MEDIAS_URL) as response:
@@ -75,6 +82,11 @@ class Command(BaseCommand):
                         "dt_publication": datetime.strptime(
                             line["Date de publication"], "%d/%m/%Y"
                         ),
+                        "annee_reporting": (
+                            int(annee)
+                            if (annee := line.get("Année de reporting"))
+                            else None
+                        ),
                     }
                 )
         return result
@@ -82,7 +94,24 @@ class Command(BaseCommand):
     def _maj_table_temp_bges(self, results):
         rs = []
         for r in results:
-            record = TempBGES(**r)
+            record = TempBGES(siren=r["siren"], dt_publication=r["dt_publication"])
             rs.append(record)
 
         TempBGES.objects.bulk_create(rs)
+
+    def _maj_publications_bges(self, results):
+        # on ne conserve que la dernière année de reporting publiée par SIREN
+        annees_reporting = {}
+        for r in results:
+            if r["siren"] and r["annee_reporting"]:
+                annees_reporting[r["siren"]] = max(
+                    r["annee_reporting"], annees_reporting.get(r["siren"], 0)
+                )
+
+        PublicationBGES.objects.remplace_instantane(annees_reporting, date.today())
+        StatutReglementation.objects.invalide(reglementations=[BGESReglementation.id])
+        self.stdout.write(
+            self.style.NOTICE(
+                f" > {len(annees_reporting)} publications BGES enregistrées"
+            )
+        )
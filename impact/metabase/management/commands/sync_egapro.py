@@ -8,6 +8,9 @@ from django.core.management.base import BaseCommand
 
 from entreprises.models import Entreprise
 from metabase.models import TempEgaPro
+from reglementations.models import PublicationIndexEgapro
+from reglementations.models import StatutReglementation
+from reglementations.views.index_egapro import IndexEgaproReglementation
 
 FETCH_URL = "https://egapro.travail.gouv.fr/api/public/declaration/%s/%s"
 
@@ -80,6 +83,7 @@ class Command(BaseCommand):
         # pour éviter de faire des appels "lazy" pendant une opération asynchrone de Django
         entreprises = list(entreprises)
         result = dict()
+        non_publies = set()
 
         # récupére les entreprises en asynchrone via aiohttp
         async def fetch_data(session, entreprise):
@@ -89,7 +93,7 @@ class Command(BaseCommand):
                     case 200:
                         return entreprise, await response.json()
                     case 404:
-                        return None
+                        return entreprise, None
                     case _:
                         print(f"ERREUR {response.status}:", entreprise)
                         return None
@@ -105,13 +109,19 @@ class Command(BaseCommand):
                     for pairs in responses:
                         if pairs:
                             siren, response = pairs
-                            result[siren] = response
+                            if response is None:
+                                non_publies.add(siren)
+                            else:
+                                result[siren] = response
 
         asyncio.run(fetch_all_data())
 
         # enregistrement dans la table de travail
         self._maj_table_temp_egapro(result)
 
+        # état de publication consulté lors du calcul du statut de la réglementation
+        self._maj_publications_index_egapro(non_publies)
+
         if export:
             with open(export_file, "w") as f:
                 # JSON est censé toujours être de l'UTF (8 ou 16) :
@@ -132,3 +142,21 @@ class Command(BaseCommand):
                 rs.append(record)
 
         TempEgaPro.objects.bulk_create(rs)
+
+    def _maj_publications_index_egapro(self, non_publies):
+        annee_courante = datetime.now().year - 1
+        publications = {(siren, annee_courante): False for siren in non_publies}
+        for siren, reponse_api in TempEgaPro.objects.filter(
+            annee=annee_courante
+        ).values_list("siren", "reponse_api"):
+            if reponse_api is not None:
+                publications[(siren, annee_courante)] = "déclaration" in reponse_api
+        PublicationIndexEgapro.objects.enregistre(publications)
+        StatutReglementation.objects.invalide(
+            reglementations=[IndexEgaproReglementation.id]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f" > {len(publications)} états de publication de l'index EgaPro mis à jour"
+            )
+        )
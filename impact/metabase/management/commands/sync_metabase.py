@@ -31,8 +31,9 @@ from metabase.models import TempBGES
 from metabase.models import TempEgaPro
 from metabase.models import Utilisateur as MetabaseUtilisateur
 from metabase.models import VSME as MetabaseVSME
+from reglementations import statuts
+from reglementations.evaluation import evaluation
 from reglementations.models.csrd import RapportCSRD
-from reglementations.views.base import InsuffisammentQualifieeError
 from reglementations.views.base import ReglementationStatus
 from reglementations.views.bdese import BDESEReglementation
 from reglementations.views.bges import BGESReglementation
@@ -312,6 +313,8 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(message))
 
     @mesure
+    # les critères évalués sont mémorisés pour toutes les entreprises de même profil
+    @evaluation()
     def _sync_reglementations(self):
         MetabaseVSME.objects.all().delete()
         MetabaseCSRD.objects.all().delete()
@@ -330,7 +333,7 @@ class Command(BaseCommand):
         bges = []
         egapro = []
         bdese = []
-        for entreprise in (
+        entreprises = list(
             PortailRSEEntreprise.objects.filter(users__isnull=False)
             .filter(id__in=mb_entreprises)
             .prefetch_related(
@@ -341,24 +344,41 @@ class Command(BaseCommand):
                 )
             )
             .distinct()
-        ):
+        )
+        # assujettissement de toutes les entreprises aux réglementations,
+        # lu dans les statuts précalculés ou calculé en lot
+        matrice = statuts.assujettissements(
+            [
+                CSRDReglementation,
+                BDESEReglementation,
+                IndexEgaproReglementation,
+                BGESReglementation,
+            ],
+            [
+                entreprise.caracteristiques[0]
+                for entreprise in entreprises
+                if entreprise.caracteristiques
+            ],
+        )
+        for entreprise in entreprises:
             caracteristiques = (
                 entreprise.caracteristiques[0] if entreprise.caracteristiques else None
             )
             if caracteristiques:
+                assujettissement = matrice[entreprise.id]
                 if r := self._insert_vsmes(caracteristiques):
                     vsme.extend(r)
 
-                if r := self._insert_csrd(caracteristiques):
+                if r := self._insert_csrd(caracteristiques, assujettissement):
                     csrd.append(r)
 
-                if r := self._insert_bges(caracteristiques):
+                if r := self._insert_bges(caracteristiques, assujettissement):
                     bges.append(r)
 
-                if r := self._insert_bdese(caracteristiques):
+                if r := self._insert_bdese(caracteristiques, assujettissement):
                     bdese.append(r)
 
-                if r := self._insert_index_egapro(caracteristiques):
+                if r := self._insert_index_egapro(caracteristiques, assujettissement):
                     egapro.append(r)
 
         with transaction.atomic():
@@ -385,6 +405,7 @@ class Command(BaseCommand):
                 premier_indicateur_cree_le=Min("indicateurs__created_at"),
             )
             .filter(entreprise_id=entreprise.id)
+            .prefetch_related("progressions", "indicateurs")
             .order_by("-annee")
         ):
             cree_le = rapport.created_at
@@ -397,9 +418,7 @@ class Command(BaseCommand):
                     progression_par_exigence[f"progression_{code}"] = (
                         rapport.progression_par_exigence(exigence)["pourcent"]
                     )
-                choix_module = (
-                    rapport.choix_module
-                )  # mis en cache lors du calcul de progression
+                choix_module = rapport.choix_module
             else:
                 modifie_le = rapport.updated_at
                 premier_indicateur_cree_le = None
@@ -430,18 +449,18 @@ class Command(BaseCommand):
             )
         return metabase_vsmes
 
-    def _insert_csrd(self, caracteristiques):
+    def _insert_csrd(self, caracteristiques, assujettissement):
         entreprise = caracteristiques.entreprise
         result = None
         if "csrd" in settings.METABASE_DEBUG_SKIP_STEPS:
             return
-        try:
-            est_soumise = CSRDReglementation.est_soumis(caracteristiques)
-        except InsuffisammentQualifieeError:
+        est_soumise = assujettissement[CSRDReglementation.id]
+        if est_soumise is None:
+            # entreprise insuffisamment qualifiée
             return
         if est_soumise:
-            portail_rse_status = CSRDReglementation.calculate_status(
-                caracteristiques
+            portail_rse_status = statuts.calcule_statut(
+                CSRDReglementation, caracteristiques
             ).status
             statut = self._convertit_portail_rse_status_en_statut_metabase(
                 portail_rse_status
@@ -478,18 +497,18 @@ class Command(BaseCommand):
 
         return result
 
-    def _insert_bdese(self, caracteristiques):
+    def _insert_bdese(self, caracteristiques, assujettissement):
         entreprise = caracteristiques.entreprise
         result = None
         if "bdese" in settings.METABASE_DEBUG_SKIP_STEPS:
             return
-        try:
-            est_soumise = BDESEReglementation.est_soumis(caracteristiques)
-        except InsuffisammentQualifieeError:
+        est_soumise = assujettissement[BDESEReglementation.id]
+        if est_soumise is None:
+            # entreprise insuffisamment qualifiée
             return
         if est_soumise:
-            portail_rse_status = BDESEReglementation.calculate_status(
-                caracteristiques
+            portail_rse_status = statuts.calcule_statut(
+                BDESEReglementation, caracteristiques
             ).status
             statut = self._convertit_portail_rse_status_en_statut_metabase(
                 portail_rse_status
@@ -508,19 +527,23 @@ class Command(BaseCommand):
         return result
 
     @responses.activate
-    def _insert_index_egapro(self, caracteristiques):
+    def _insert_index_egapro(self, caracteristiques, assujettissement):
         # des appels API sont nécessaires pour calculate_status() : utilisation de tables de travail
         entreprise = caracteristiques.entreprise
         result = None
         if "egapro" in settings.METABASE_DEBUG_SKIP_STEPS:
             return
-        try:
-            est_soumise = IndexEgaproReglementation.est_soumis(caracteristiques)
-        except InsuffisammentQualifieeError:
+        est_soumise = assujettissement[IndexEgaproReglementation.id]
+        if est_soumise is None:
+            # entreprise insuffisamment qualifiée
             return
         if est_soumise:
-            portail_rse_status = IndexEgaproReglementation.calculate_status(
-                caracteristiques
+            # les statuts calculés avec les API simulées ne sont pas conservés
+            portail_rse_status = statuts.calcule_statut(
+                IndexEgaproReglementation,
+                caracteristiques,
+                enregistre=False,
+                sans_delai=True,
             ).status
             statut = self._convertit_portail_rse_status_en_statut_metabase(
                 portail_rse_status
@@ -537,23 +560,27 @@ class Command(BaseCommand):
         return result
 
     @responses.activate
-    def _insert_bges(self, caracteristiques):
+    def _insert_bges(self, caracteristiques, assujettissement):
         # des appels API sont nécessaires pour calculate_status() : utilisation de tables de travail
         entreprise = caracteristiques.entreprise
         result = None
         if "bges" in settings.METABASE_DEBUG_SKIP_STEPS:
             return
-        try:
-            est_soumise = BGESReglementation.est_soumis(caracteristiques)
-        except InsuffisammentQualifieeError:
+        est_soumise = assujettissement[BGESReglementation.id]
+        if est_soumise is None:
+            # entreprise insuffisamment qualifiée
             return
         if est_soumise:
             with patch(
                 "api.bges.extract_last_reporting_year",
                 _mock_extract_last_reporting_year,
             ):
-                portail_rse_status = BGESReglementation.calculate_status(
-                    caracteristiques
+                # les statuts calculés avec les API simulées ne sont pas conservés
+                portail_rse_status = statuts.calcule_statut(
+                    BGESReglementation,
+                    caracteristiques,
+                    enregistre=False,
+                    sans_delai=True,
                 ).status
                 statut = self._convertit_portail_rse_status_en_statut_metabase(
                     portail_rse_status
@@ -16,6 +16,8 @@ from entreprises.models import Entreprise
 from habilitations.enums import UserRole
 from habilitations.models import Habilitation
 from invitations.models import Invitation
+from metabase.management.commands.sync_bges import Command as SyncBGESCommand
+from metabase.management.commands.sync_egapro import Command as SyncEgaProCommand
 from metabase.models import AnalyseIA as MetabaseAnalyseIA
 from metabase.models import BDESE as MetabaseBDESE
 from metabase.models import BGES as MetabaseBGES
@@ -24,12 +26,19 @@ from metabase.models import Habilitation as MetabaseHabilitation
 from metabase.models import IndexEgaPro as MetabaseIndexEgaPro
 from metabase.models import Invitation as MetabaseInvitation
 from metabase.models import Stats as MetabaseStats
+from metabase.models import TempEgaPro
 from metabase.models import Utilisateur as MetabaseUtilisateur
 from metabase.models import VSME as MetabaseVSME
+from reglementations import statuts
 from reglementations.models import BDESE_50_300
 from reglementations.models import derniere_annee_a_remplir_bdese
+from reglementations.models import PublicationBGES
+from reglementations.models import PublicationIndexEgapro
+from reglementations.models import StatutReglementation
 from reglementations.models.csrd import RapportCSRD
 from reglementations.tests.conftest import bdese_factory  # noqa
+from reglementations.views import REGLEMENTATIONS
+from reglementations.views.bges import BGESReglementation
 from vsme.models import EXIGENCES_DE_PUBLICATION
 from vsme.models import RapportVSME
 
@@ -915,3 +924,57 @@ def test_synchronise_les_analyses_ia(entreprise_factory, alice):
     )
     assert metabase_analyse_erronee.etat == "error"
     assert metabase_analyse_erronee.message == "Une erreur est survenue"
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", METABASE_DATABASE_NAME])
+def test_sync_egapro_met_a_jour_les_etats_de_publication_de_l_index_egapro():
+    with freeze_time("2025-06-01"):
+        TempEgaPro.objects.create(
+            siren="000000001", annee="2024", reponse_api={"déclaration": {}}
+        )
+        TempEgaPro.objects.create(siren="000000002", annee="2024", reponse_api={})
+
+        SyncEgaProCommand()._maj_publications_index_egapro({"000000003"})
+
+        assert PublicationIndexEgapro.est_publie_pour("000000001", 2024)
+        assert not PublicationIndexEgapro.est_publie_pour("000000002", 2024)
+        assert not PublicationIndexEgapro.est_publie_pour("000000003", 2024)
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", METABASE_DATABASE_NAME])
+def test_sync_bges_enregistre_la_derniere_annee_de_reporting_par_siren():
+    PublicationBGES.objects.remplace_instantane({"000000009": 2019}, date(2025, 5, 1))
+    export = """SIREN principal;Date de publication;Année de reporting
+000000001;12/05/2022;2021
+000000001;14/12/2023;2022
+000000002;06/12/2019;
+"""
+    commande = SyncBGESCommand()
+
+    with freeze_time("2025-06-01"):
+        commande._maj_publications_bges(commande._extract_bges_data(export))
+
+    assert list(
+        PublicationBGES.objects.values_list(
+            "siren", "annee_reporting", "date_instantane"
+        )
+    ) == [("000000001", 2022, date(2025, 6, 1))]
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", METABASE_DATABASE_NAME])
+def test_sync_bges_invalide_les_statuts_bges_precalcules(
+    entreprise_factory, mock_api_egapro, mock_api_bges
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+    )
+    statuts.calcule_statuts(
+        REGLEMENTATIONS, entreprise.dernieres_caracteristiques_qualifiantes
+    )
+
+    SyncBGESCommand()._maj_publications_bges([])
+
+    assert not StatutReglementation.objects.filter(
+        reglementation=BGESReglementation.id
+    ).exists()
+    assert StatutReglementation.objects.count() == len(REGLEMENTATIONS) - 1
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from dataclasses import fields
+from datetime import date
+from functools import lru_cache
+
+from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
+from reglementations.assujettissement import matrice_assujettissement
+from reglementations.views import REGLEMENTATIONS
+
+# Moteur de la simulation publique, sans accès à la base de données.
+#
+# Le résultat d'une simulation ne dépend que des réponses au formulaire de simulation (ProfilSimulation) :
+# les réglementations applicables sont calculées sur des caractéristiques non enregistrées,
+# puis conservées dans une table de décision en mémoire indexée par profil.
+# Le produit cartésien de toutes les réponses possibles (plusieurs millions de profils, la catégorie juridique
+# et le pays étant des codes libres) est trop grand pour être calculé au démarrage :
+# la table est remplie au fil des simulations et une simulation déjà rencontrée se résume à une lecture de la table.
+
+TAILLE_TABLE_DE_DECISION = 10_000
+
+
+@dataclass(frozen=True)
+class ProfilSimulation:
+    date_cloture_exercice: date
+    categorie_juridique_sirene: int
+    code_pays_etranger_sirene: int | None
+    est_cotee: bool
+    appartient_groupe: bool
+    est_societe_mere: bool | None
+    comptes_consolides: bool | None
+    effectif: str
+    effectif_groupe: str | None
+    tranche_chiffre_affaires: str
+    tranche_bilan: str
+    tranche_chiffre_affaires_consolide: str | None
+    tranche_bilan_consolide: str | None
+
+    @classmethod
+    def depuis_formulaire(cls, cleaned_data):
+        return cls(
+            date_cloture_exercice=date_cloture_exercice_simulation(),
+            **{
+                champ.name: cleaned_data[champ.name]
+                for champ in fields(cls)
+                if champ.name != "date_cloture_exercice"
+            },
+        )
+
+    def caracteristiques(self):
+        """caractéristiques non enregistrées, enrichies avec des valeurs par défaut
+        pour les champs absents du formulaire de simulation simplifiée"""
+        entreprise = Entreprise(
+            categorie_juridique_sirene=self.categorie_juridique_sirene,
+            code_pays_etranger_sirene=self.code_pays_etranger_sirene,
+            est_cotee=self.est_cotee,
+            est_interet_public=False,
+            appartient_groupe=self.appartient_groupe,
+            est_societe_mere=self.est_societe_mere,
+            societe_mere_en_france=True,
+            comptes_consolides=self.comptes_consolides,
+        )
+        return CaracteristiquesAnnuelles(
+            entreprise=entreprise,
+            annee=self.date_cloture_exercice.year,
+            date_cloture_exercice=self.date_cloture_exercice,
+            effectif=self.effectif,
+            effectif_securite_sociale=self.effectif,
+            effectif_outre_mer=CaracteristiquesAnnuelles.EFFECTIF_OUTRE_MER_MOINS_DE_250,
+            effectif_groupe=self.effectif_groupe,
+            effectif_groupe_france=(
+                self.effectif_groupe if self.appartient_groupe else None
+            ),
+            tranche_chiffre_affaires=self.tranche_chiffre_affaires,
+            tranche_bilan=self.tranche_bilan,
+            tranche_chiffre_affaires_consolide=self.tranche_chiffre_affaires_consolide,
+            tranche_bilan_consolide=self.tranche_bilan_consolide,
+            bdese_accord=False,
+            tranche_consommation_energie_finale=CaracteristiquesAnnuelles.CONSOMMATION_ENERGIE_MOINS_DE_2_75GWH,
+        )
+
+
+def date_cloture_exercice_simulation():
+    return date(date.today().year - 1, 12, 31)
+
+
+@lru_cache(maxsize=TAILLE_TABLE_DE_DECISION)
+def reglementations_applicables(profil: ProfilSimulation):
+    caracteristiques = profil.caracteristiques()
+    assujettissement = matrice_assujettissement([caracteristiques], REGLEMENTATIONS)[
+        caracteristiques.entreprise_id
+    ]
+    return tuple(
+        reglementation
+        for reglementation in REGLEMENTATIONS
+        if assujettissement[reglementation.id]
+    )
@@ -11,6 +11,8 @@ import api.exceptions
 from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import Entreprise
 from habilitations.models import Habilitation
+from public.forms import SimulationForm
+from public.views import calcule_simulation
 from public.views import should_commit
 from reglementations.views.audit_energetique import AuditEnergetiqueReglementation
 from reglementations.views.bdese import BDESEReglementation
@@ -350,8 +352,6 @@ def test_lors_d_une_simulation_les_donnees_d_une_entreprise_avec_des_caracterist
 
     assert mock_est_soumis.called
     caracteristiques_simulees = mock_est_soumis.call_args.args[0]
-    assert caracteristiques_simulees.entreprise.siren == data["siren"]
-    assert caracteristiques_simulees.entreprise.denomination == data["denomination"]
     assert (
         caracteristiques_simulees.entreprise.categorie_juridique_sirene
         == data["categorie_juridique_sirene"]
@@ -431,8 +431,6 @@ def test_lors_d_une_simulation_les_donnees_d_une_entreprise_avec_utilisateur_ne_
 
     assert mock_est_soumis.called
     caracteristiques_simulees = mock_est_soumis.call_args.args[0]
-    assert caracteristiques_simulees.entreprise.siren == data["siren"]
-    assert caracteristiques_simulees.entreprise.denomination == data["denomination"]
     assert (
         caracteristiques_simulees.entreprise.categorie_juridique_sirene
         == data["categorie_juridique_sirene"]
@@ -535,8 +533,6 @@ def test_lors_d_une_simulation_les_donnees_d_une_entreprise_sans_caracteristique
 
     assert mock_est_soumis.called
     caracteristiques_simulees = mock_est_soumis.call_args.args[0]
-    assert caracteristiques_simulees.entreprise.siren == data["siren"]
-    assert caracteristiques_simulees.entreprise.denomination == data["denomination"]
     assert (
         caracteristiques_simulees.entreprise.categorie_juridique_sirene
         == data["categorie_juridique_sirene"]
@@ -644,6 +640,59 @@ def test_simulation_incorrecte(client):
     assert CaracteristiquesAnnuelles.objects.count() == 0
 
 
+def _donnees_simulation(siren="000000001"):
+    return {
+        "siren": siren,
+        "denomination": "Entreprise SAS",
+        "categorie_juridique_sirene": 5505,
+        "code_pays_etranger_sirene": "",
+        "code_NAF": "01.11Z",
+        "effectif": CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+        "tranche_chiffre_affaires": CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+        "tranche_bilan": CaracteristiquesAnnuelles.BILAN_100M_ET_PLUS,
+        "est_cotee": False,
+        "appartient_groupe": False,
+    }
+
+
+@pytest.mark.django_db
+def test_simulation_calculee_sans_acces_a_la_base(django_assert_num_queries):
+    simulation_form = SimulationForm(_donnees_simulation())
+    assert simulation_form.is_valid()
+
+    with django_assert_num_queries(0):
+        reglementations_applicables = calcule_simulation(simulation_form)
+
+    assert BDESEReglementation in reglementations_applicables
+    assert CSRDReglementation in reglementations_applicables
+    assert Entreprise.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_simulations_de_meme_profil_lues_dans_la_table_de_decision(client, mocker):
+    est_soumis = mocker.spy(BDESEReglementation, "est_soumis")
+
+    for siren in ("000000001", "000000002"):
+        response = client.post(
+            "/simulation", data=_donnees_simulation(siren), follow=True
+        )
+        assert BDESEReglementation in response.context["reglementations_applicables"]
+
+    assert est_soumis.call_count == 1
+
+
+@pytest.mark.django_db
+def test_enregistrement_de_la_simulation_differe(client, settings, mocker):
+    settings.SIMULATION_ENREGISTREMENT_DIFFERE = True
+    submit = mocker.patch("public.views._executeur.submit")
+
+    response = client.post("/simulation", data=_donnees_simulation(), follow=True)
+
+    assert response.status_code == 200
+    assert submit.called
+    assert not Entreprise.objects.exists()
+
+
 @pytest.mark.django_db
 def test_simulation_en_session_incorrecte(client):
     """
@@ -1,9 +1,11 @@
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 
+import sentry_sdk
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import BadRequest
 from django.core.mail import EmailMessage
+from django.db import connections
 from django.shortcuts import redirect
 from django.shortcuts import render
 
@@ -14,7 +16,11 @@ from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import Entreprise
 from public.forms import ContactForm
 from public.forms import SimulationForm
-from reglementations.views import REGLEMENTATIONS
+from public.simulation import date_cloture_exercice_simulation
+from public.simulation import ProfilSimulation
+from public.simulation import reglementations_applicables
+
+_executeur = ThreadPoolExecutor(max_workers=2, thread_name_prefix="simulation")
 
 
 def index(request):
@@ -152,7 +158,7 @@ def resultats_simulation(request):
         siren = simulation_form.cleaned_data["siren"]
     else:
         return redirect("simulation")
-    return render(
+    response = render(
         request,
         "public/resultats_simulation.html",
         {
@@ -160,89 +166,88 @@ def resultats_simulation(request):
             "siren": siren,
         },
     )
+    enregistre_simulation(simulation_form.cleaned_data)
+    return response
 
 
 def calcule_simulation(simulation_form):
-    if entreprises := Entreprise.objects.filter(
-        siren=simulation_form.cleaned_data["siren"]
-    ):
+    """calcul sans effet de bord, cf. public.simulation"""
+    return list(
+        reglementations_applicables(
+            ProfilSimulation.depuis_formulaire(simulation_form.cleaned_data)
+        )
+    )
+
+
+def enregistre_simulation(donnees_simulation):
+    """enregistre les données de la simulation sur l'entreprise si elle n'est pas déjà qualifiée ou rattachée à un utilisateur
+
+    L'enregistrement n'est pas nécessaire au résultat de la simulation :
+    il est effectué dans un thread, après le rendu de la réponse (sauf si SIMULATION_ENREGISTREMENT_DIFFERE est désactivé).
+    """
+    if settings.SIMULATION_ENREGISTREMENT_DIFFERE:
+        _executeur.submit(_enregistre_simulation_dans_un_thread, donnees_simulation)
+    else:
+        _enregistre_simulation(donnees_simulation)
+
+
+def _enregistre_simulation_dans_un_thread(donnees_simulation):
+    try:
+        _enregistre_simulation(donnees_simulation)
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+    finally:
+        connections.close_all()
+
+
+def _enregistre_simulation(donnees_simulation):
+    if entreprises := Entreprise.objects.filter(siren=donnees_simulation["siren"]):
         entreprise = entreprises[0]
-        entreprise.denomination = simulation_form.cleaned_data["denomination"]
-        entreprise.categorie_juridique_sirene = simulation_form.cleaned_data[
+        if not should_commit(entreprise):
+            return
+        entreprise.denomination = donnees_simulation["denomination"]
+        entreprise.categorie_juridique_sirene = donnees_simulation[
             "categorie_juridique_sirene"
         ]
-        entreprise.code_pays_etranger_sirene = simulation_form.cleaned_data[
+        entreprise.code_pays_etranger_sirene = donnees_simulation[
             "code_pays_etranger_sirene"
         ]
-        entreprise.code_NAF = simulation_form.cleaned_data["code_NAF"]
-        entreprise.est_cotee = simulation_form.cleaned_data["est_cotee"]
-        entreprise.appartient_groupe = simulation_form.cleaned_data["appartient_groupe"]
-        entreprise.est_societe_mere = simulation_form.cleaned_data["est_societe_mere"]
-        entreprise.comptes_consolides = simulation_form.cleaned_data[
-            "comptes_consolides"
-        ]
+        entreprise.code_NAF = donnees_simulation["code_NAF"]
+        entreprise.est_cotee = donnees_simulation["est_cotee"]
+        entreprise.appartient_groupe = donnees_simulation["appartient_groupe"]
+        entreprise.est_societe_mere = donnees_simulation["est_societe_mere"]
+        entreprise.comptes_consolides = donnees_simulation["comptes_consolides"]
+        entreprise.save()
     else:
         entreprise = Entreprise.objects.create(
-            denomination=simulation_form.cleaned_data["denomination"],
-            siren=simulation_form.cleaned_data["siren"],
-            categorie_juridique_sirene=simulation_form.cleaned_data[
-                "categorie_juridique_sirene"
-            ],
-            code_pays_etranger_sirene=simulation_form.cleaned_data[
-                "code_pays_etranger_sirene"
-            ],
-            code_NAF=simulation_form.cleaned_data["code_NAF"],
-            est_cotee=simulation_form.cleaned_data["est_cotee"],
-            appartient_groupe=simulation_form.cleaned_data["appartient_groupe"],
-            est_societe_mere=simulation_form.cleaned_data["est_societe_mere"],
-            comptes_consolides=simulation_form.cleaned_data["comptes_consolides"],
+            denomination=donnees_simulation["denomination"],
+            siren=donnees_simulation["siren"],
+            categorie_juridique_sirene=donnees_simulation["categorie_juridique_sirene"],
+            code_pays_etranger_sirene=donnees_simulation["code_pays_etranger_sirene"],
+            code_NAF=donnees_simulation["code_NAF"],
+            est_cotee=donnees_simulation["est_cotee"],
+            appartient_groupe=donnees_simulation["appartient_groupe"],
+            est_societe_mere=donnees_simulation["est_societe_mere"],
+            comptes_consolides=donnees_simulation["comptes_consolides"],
         )
 
-    date_cloture_exercice = date(date.today().year - 1, 12, 31)
     actualisation = ActualisationCaracteristiquesAnnuelles(
-        date_cloture_exercice=date_cloture_exercice,
-        effectif=simulation_form.cleaned_data["effectif"],
+        date_cloture_exercice=date_cloture_exercice_simulation(),
+        effectif=donnees_simulation["effectif"],
         effectif_securite_sociale=None,
         effectif_outre_mer=None,
-        effectif_groupe=simulation_form.cleaned_data["effectif_groupe"],
+        effectif_groupe=donnees_simulation["effectif_groupe"],
         effectif_groupe_france=None,
-        tranche_chiffre_affaires=simulation_form.cleaned_data[
-            "tranche_chiffre_affaires"
-        ],
-        tranche_bilan=simulation_form.cleaned_data["tranche_bilan"],
-        tranche_chiffre_affaires_consolide=simulation_form.cleaned_data[
+        tranche_chiffre_affaires=donnees_simulation["tranche_chiffre_affaires"],
+        tranche_bilan=donnees_simulation["tranche_bilan"],
+        tranche_chiffre_affaires_consolide=donnees_simulation[
             "tranche_chiffre_affaires_consolide"
         ],
-        tranche_bilan_consolide=simulation_form.cleaned_data["tranche_bilan_consolide"],
+        tranche_bilan_consolide=donnees_simulation["tranche_bilan_consolide"],
         bdese_accord=None,
         tranche_consommation_energie_finale=None,
     )
-    caracteristiques = entreprise.actualise_caracteristiques(actualisation)
-    if should_commit(entreprise):
-        entreprise.save()
-        caracteristiques.save()
-    caracteristiques = enrichit_les_donnees_pour_la_simulation(caracteristiques)
-    return [
-        reglementation
-        for reglementation in REGLEMENTATIONS
-        if reglementation.est_soumis(caracteristiques)
-    ]
-
-
-def enrichit_les_donnees_pour_la_simulation(caracteristiques):
-    caracteristiques.entreprise.est_interet_public = False
-    caracteristiques.entreprise.societe_mere_en_france = True
-    caracteristiques.effectif_securite_sociale = caracteristiques.effectif
-    caracteristiques.effectif_outre_mer = (
-        CaracteristiquesAnnuelles.EFFECTIF_OUTRE_MER_MOINS_DE_250
-    )
-    if caracteristiques.entreprise.appartient_groupe:
-        caracteristiques.effectif_groupe_france = caracteristiques.effectif_groupe
-    caracteristiques.bdese_accord = False
-    caracteristiques.tranche_consommation_energie_finale = (
-        CaracteristiquesAnnuelles.CONSOMMATION_ENERGIE_MOINS_DE_2_75GWH
-    )
-    return caracteristiques
+    entreprise.actualise_caracteristiques(actualisation).save()
 
 
 def should_commit(entreprise):
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReglementationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reglementations"
+
+    def ready(self):
+        import reglementations.signals  # noqa
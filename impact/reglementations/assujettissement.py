@@ -0,0 +1,50 @@
+from django.db.models import QuerySet
+
+from reglementations import evaluation
+from reglementations.views.base import InsuffisammentQualifieeError
+
+# Calcul en lot de l'assujettissement d'entreprises à des réglementations.
+#
+# Les critères des réglementations (méthodes est_soumis) ne lisent qu'un petit nombre de champs
+# des caractéristiques annuelles et de l'entreprise : tranches d'effectif, de chiffre d'affaires et de bilan,
+# catégorie juridique, pays (EEE), cotation, appartenance à un groupe... (cf. reglementations.evaluation.profil)
+# Les entreprises partageant les mêmes valeurs pour ces champs (le même profil) sont nombreuses :
+# chaque critère n'est évalué qu'une fois par profil distinct, colonne par colonne (réglementation par réglementation).
+
+
+def matrice_assujettissement(caracteristiques, reglementations):
+    """renvoie la matrice entreprise × réglementation {entreprise_id: {reglementation.id: bool | None}}
+
+    caracteristiques : queryset ou liste de CaracteristiquesAnnuelles, une par entreprise
+    (les entreprises d'une liste doivent être déjà chargées, par exemple avec select_related)
+    None dans la matrice : entreprise insuffisamment qualifiée pour la réglementation
+    """
+    if isinstance(caracteristiques, QuerySet):
+        caracteristiques = caracteristiques.select_related("entreprise")
+
+    # un représentant par profil distinct
+    profils = {}
+    profil_par_entreprise = {}
+    for c in caracteristiques:
+        profil = evaluation.profil(c)
+        profils.setdefault(profil, c)
+        profil_par_entreprise[c.entreprise_id] = profil
+
+    assujettissement_par_profil = {profil: {} for profil in profils}
+    for reglementation in reglementations:
+        for profil, representant in profils.items():
+            assujettissement_par_profil[profil][reglementation.id] = _est_soumis(
+                reglementation, representant
+            )
+
+    return {
+        entreprise_id: dict(assujettissement_par_profil[profil])
+        for entreprise_id, profil in profil_par_entreprise.items()
+    }
+
+
+def _est_soumis(reglementation, caracteristiques):
+    try:
+        return reglementation.est_soumis(caracteristiques)
+    except InsuffisammentQualifieeError:
+        return None
@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+# Contexte d'évaluation des critères des réglementations.
+#
+# Le calcul d'un statut évalue plusieurs fois les mêmes critères (est_soumis, criteres_remplis,
+# puis le détail du statut ; les sous-critères de la CSRD sont repris par chaque critère).
+# Dans un bloc `evaluation()` (une requête, le calcul des statuts d'une entreprise, une commande de traitement par lot),
+# le résultat des méthodes décorées par `memorise` est conservé par réglementation, méthode et profil des caractéristiques.
+# Le profil regroupe les seuls champs lus par les critères : une modification des caractéristiques
+# change le profil (pas de résultat périmé) et des entreprises de même profil partagent les résultats.
+
+CHAMPS_CARACTERISTIQUES = (
+    "annee",
+    "date_cloture_exercice",
+    "effectif",
+    "effectif_securite_sociale",
+    "effectif_outre_mer",
+    "effectif_groupe",
+    "effectif_groupe_france",
+    "tranche_chiffre_affaires",
+    "tranche_bilan",
+    "tranche_chiffre_affaires_consolide",
+    "tranche_bilan_consolide",
+    "bdese_accord",
+    "tranche_consommation_energie_finale",
+)
+CHAMPS_ENTREPRISE = (
+    "categorie_juridique_sirene",
+    "code_pays_etranger_sirene",
+    "est_cotee",
+    "est_interet_public",
+    "appartient_groupe",
+    "est_societe_mere",
+    "societe_mere_en_france",
+    "comptes_consolides",
+)
+
+_resultats = ContextVar("resultats_criteres_reglementations", default=None)
+
+
+def profil(caracteristiques):
+    entreprise = caracteristiques.entreprise
+    return tuple(
+        getattr(caracteristiques, champ) for champ in CHAMPS_CARACTERISTIQUES
+    ) + tuple(getattr(entreprise, champ) for champ in CHAMPS_ENTREPRISE)
+
+
+@contextmanager
+def evaluation():
+    """les critères évalués dans le bloc sont mémorisés jusqu'à la fin du bloc
+
+    Un bloc imbriqué dans un autre réutilise les résultats du bloc englobant.
+    Les threads lancés avec une copie du contexte (cf. reglementations.statuts) partagent ces résultats.
+    """
+    if _resultats.get() is not None:
+        yield
+        return
+    jeton = _resultats.set({})
+    try:
+        yield
+    finally:
+        _resultats.reset(jeton)
+
+
+def memorise(methode):
+    """décorateur des critères d'une réglementation, à placer sous @classmethod
+
+    Hors d'un bloc `evaluation()`, le critère est simplement évalué.
+    Les exceptions (InsuffisammentQualifieeError) ne sont pas mémorisées.
+    Le résultat mémorisé est partagé : il ne doit pas être modifié par l'appelant.
+    """
+
+    @wraps(methode)
+    def methode_memorisee(cls, caracteristiques):
+        resultats = _resultats.get()
+        if resultats is None:
+            return methode(cls, caracteristiques)
+        cle = (cls, methode.__name__, profil(caracteristiques))
+        try:
+            return resultats[cle]
+        except KeyError:
+            resultat = resultats[cle] = methode(cls, caracteristiques)
+            return resultat
+
+    return methode_memorisee
@@ -0,0 +1,13 @@
+from reglementations.evaluation import evaluation
+
+
+class EvaluationReglementationsMiddleware:
+    """les critères des réglementations évalués pendant une requête sont mémorisés jusqu'à la fin de celle-ci
+    (cf. reglementations.evaluation)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with evaluation():
+            return self.get_response(request)
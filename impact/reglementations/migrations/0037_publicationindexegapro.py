@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:05
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reglementations", "0036_delete_documentanalyseia"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PublicationIndexEgapro",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("siren", models.CharField(max_length=9, verbose_name="numéro SIREN")),
+                ("annee", models.PositiveIntegerField(verbose_name="année de l'index")),
+                ("est_publie", models.BooleanField(verbose_name="index publié")),
+                (
+                    "date_verification",
+                    models.DateTimeField(
+                        verbose_name="date de vérification sur la plateforme EgaPro"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "publication de l'index EgaPro",
+                "verbose_name_plural": "publications de l'index EgaPro",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("siren", "annee"),
+                        name="unique_publication_index_egapro",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:10
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reglementations", "0037_publicationindexegapro"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PublicationBGES",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "siren",
+                    models.CharField(
+                        max_length=9, unique=True, verbose_name="numéro SIREN"
+                    ),
+                ),
+                (
+                    "annee_reporting",
+                    models.PositiveIntegerField(
+                        verbose_name="dernière année de reporting"
+                    ),
+                ),
+                (
+                    "date_instantane",
+                    models.DateField(verbose_name="date de l'export Bilans GES"),
+                ),
+            ],
+            options={
+                "verbose_name": "publication du bilan GES",
+                "verbose_name_plural": "publications des bilans GES",
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:25
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "entreprises",
+            "0056_remove_caracteristiquesannuelles_systeme_management_energie",
+        ),
+        ("reglementations", "0038_publicationbges"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatutReglementation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reglementation",
+                    models.CharField(
+                        max_length=64, verbose_name="identifiant de la réglementation"
+                    ),
+                ),
+                (
+                    "est_soumis",
+                    models.BooleanField(null=True, verbose_name="entreprise soumise"),
+                ),
+                (
+                    "statut",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="statut sérialisé",
+                    ),
+                ),
+                (
+                    "calcule_le",
+                    models.DateTimeField(auto_now=True, verbose_name="date du calcul"),
+                ),
+                (
+                    "caracteristiques",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="entreprises.caracteristiquesannuelles",
+                        verbose_name="caractéristiques utilisées pour le calcul",
+                    ),
+                ),
+                (
+                    "entreprise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statuts_reglementations",
+                        to="entreprises.entreprise",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "statut de réglementation",
+                "verbose_name_plural": "statuts de réglementation",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entreprise", "reglementation"),
+                        name="unique_statut_reglementation",
+                    )
+                ],
+            },
+        ),
+    ]
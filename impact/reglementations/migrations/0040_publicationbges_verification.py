@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reglementations", "0039_statutreglementation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publicationbges",
+            name="date_verification",
+            field=models.DateTimeField(
+                null=True, verbose_name="date de vérification sur l'API Bilans GES"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="publicationbges",
+            name="annee_reporting",
+            field=models.PositiveIntegerField(
+                null=True, verbose_name="dernière année de reporting"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="publicationbges",
+            name="date_instantane",
+            field=models.DateField(
+                null=True, verbose_name="date de l'export Bilans GES"
+            ),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from .bdse import *  # noqa
+from .bges import *  # noqa
 from .csrd import *  # noqa
 from .index_egapro import *  # noqa
+from .statut import *  # noqa
 
 # This uncommon structure of modules (included in a heigh-level package)
 # can be useful for domains / apps with a big number of models and/or complex ones.
@@ -0,0 +1,96 @@
+import datetime
+
+import django.db.models as models
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api import bges
+from utils.models import TimestampedModel
+
+
+class PublicationBGESQuerySet(models.QuerySet):
+    def valides(self):
+        # un instantané trop ancien signale une synchronisation en échec : l'API est alors interrogée
+        date_limite = datetime.date.today() - datetime.timedelta(
+            days=settings.BGES_INSTANTANE_DUREE_VALIDITE
+        )
+        # une publication est rarement retirée, une absence de publication peut changer à tout moment
+        maintenant = timezone.now()
+        return self.filter(
+            models.Q(date_instantane__gte=date_limite)
+            | models.Q(
+                annee_reporting__isnull=False,
+                date_verification__gt=maintenant
+                - datetime.timedelta(seconds=settings.API_BGES_PUBLICATION_TTL),
+            )
+            | models.Q(
+                annee_reporting__isnull=True,
+                date_verification__gt=maintenant
+                - datetime.timedelta(
+                    seconds=settings.API_BGES_PUBLICATION_NEGATIVE_TTL
+                ),
+            )
+        )
+
+    def enregistre_verification(self, siren, annee_reporting):
+        # réponse de l'API Bilans GES pour un SIREN absent de l'instantané
+        return self.update_or_create(
+            siren=siren,
+            defaults={
+                "annee_reporting": annee_reporting,
+                "date_instantane": None,
+                "date_verification": timezone.now(),
+            },
+        )
+
+    def remplace_instantane(self, annees_reporting, date_instantane):
+        # annees_reporting : dictionnaire {siren: dernière année de reporting}
+        with transaction.atomic():
+            self.all().delete()
+            return self.bulk_create(
+                [
+                    PublicationBGES(
+                        siren=siren,
+                        annee_reporting=annee_reporting,
+                        date_instantane=date_instantane,
+                    )
+                    for siren, annee_reporting in annees_reporting.items()
+                ],
+                batch_size=1000,
+            )
+
+
+# Dernière année de reporting publiée sur la plateforme Bilans GES, issue de l'export complet des bilans publiés.
+# Alimenté par la commande `sync_bges` ; l'API Bilans GES n'est interrogée que pour les SIREN absents de l'instantané,
+# et sa réponse, y compris l'absence de publication, est conservée (cf. PublicationBGESQuerySet.valides).
+class PublicationBGES(TimestampedModel):
+    siren = models.CharField(max_length=9, unique=True, verbose_name="numéro SIREN")
+    annee_reporting = models.PositiveIntegerField(
+        null=True, verbose_name="dernière année de reporting"
+    )
+    date_instantane = models.DateField(
+        null=True, verbose_name="date de l'export Bilans GES"
+    )
+    date_verification = models.DateTimeField(
+        null=True, verbose_name="date de vérification sur l'API Bilans GES"
+    )
+
+    objects = PublicationBGESQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "publication du bilan GES"
+        verbose_name_plural = "publications des bilans GES"
+
+    def __str__(self):
+        return f"{self.siren} - {self.annee_reporting}"
+
+    @classmethod
+    def derniere_annee_reporting(cls, siren) -> int | None:
+        # lève une APIError si le SIREN est absent de l'instantané et que l'API Bilans GES est indisponible
+        try:
+            return cls.objects.valides().get(siren=siren).annee_reporting
+        except cls.DoesNotExist:
+            annee_reporting = bges.last_reporting_year(siren)
+            cls.objects.enregistre_verification(siren, annee_reporting)
+            return annee_reporting
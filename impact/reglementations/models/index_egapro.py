@@ -1,5 +1,12 @@
 import datetime
 
+import django.db.models as models
+from django.conf import settings
+from django.utils import timezone
+
+from api import egapro
+from utils.models import TimestampedModel
+
 
 def derniere_annee_a_publier_index_egapro():
     annee = datetime.date.today().year
@@ -13,3 +20,76 @@ def prochaine_echeance_index_egapro(derniere_annee_est_publiee: bool) -> datetim
         return datetime.date(annee + 1, 3, 1)
     else:
         return datetime.date(annee, 3, 1)
+
+
+class PublicationIndexEgaproQuerySet(models.QuerySet):
+    def valides(self):
+        # une publication est rarement retirée, une absence de publication peut changer à tout moment
+        maintenant = timezone.now()
+        return self.filter(
+            models.Q(
+                est_publie=True,
+                date_verification__gt=maintenant
+                - datetime.timedelta(seconds=settings.API_EGAPRO_PUBLICATION_TTL),
+            )
+            | models.Q(
+                est_publie=False,
+                date_verification__gt=maintenant
+                - datetime.timedelta(
+                    seconds=settings.API_EGAPRO_PUBLICATION_NEGATIVE_TTL
+                ),
+            )
+        )
+
+    def enregistre(self, publications, date_verification=None):
+        # publications : dictionnaire {(siren, annee): est_publie}
+        date_verification = date_verification or timezone.now()
+        return self.bulk_create(
+            [
+                PublicationIndexEgapro(
+                    siren=siren,
+                    annee=annee,
+                    est_publie=est_publie,
+                    date_verification=date_verification,
+                )
+                for (siren, annee), est_publie in publications.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["siren", "annee"],
+            update_fields=["est_publie", "date_verification", "updated_at"],
+        )
+
+
+# État de publication de l'index EgaPro, conservé localement pour éviter un appel à l'API EgaPro à chaque calcul de statut.
+# Alimenté par la commande `sync_egapro` et, à défaut, par les appels à l'API.
+class PublicationIndexEgapro(TimestampedModel):
+    siren = models.CharField(max_length=9, verbose_name="numéro SIREN")
+    annee = models.PositiveIntegerField(verbose_name="année de l'index")
+    est_publie = models.BooleanField(verbose_name="index publié")
+    date_verification = models.DateTimeField(
+        verbose_name="date de vérification sur la plateforme EgaPro"
+    )
+
+    objects = PublicationIndexEgaproQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "publication de l'index EgaPro"
+        verbose_name_plural = "publications de l'index EgaPro"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["siren", "annee"], name="unique_publication_index_egapro"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.siren} - {self.annee}"
+
+    @classmethod
+    def est_publie_pour(cls, siren, annee) -> bool:
+        # lève une APIError si l'état n'est pas connu localement et que l'API EgaPro est indisponible
+        try:
+            return cls.objects.valides().get(siren=siren, annee=annee).est_publie
+        except cls.DoesNotExist:
+            est_publie = egapro.is_index_egapro_published(siren, annee)
+            cls.objects.enregistre({(siren, annee): est_publie})
+            return est_publie
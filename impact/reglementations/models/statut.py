@@ -0,0 +1,66 @@
+import datetime
+
+import django.db.models as models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+class StatutReglementationQuerySet(models.QuerySet):
+    def valides(self):
+        # les statuts dépendent de la date du jour (années à publier, échéances) : ils sont recalculés chaque jour
+        debut_du_jour = timezone.make_aware(
+            datetime.datetime.combine(timezone.localdate(), datetime.time.min)
+        )
+        return self.filter(calcule_le__gte=debut_du_jour)
+
+    def invalide(self, entreprises=None, reglementations=None):
+        # entreprises : liste d'entreprises ou d'identifiants d'entreprises, toutes si None
+        # reglementations : liste d'identifiants de réglementations, toutes si None
+        statuts = self.all()
+        if entreprises is not None:
+            statuts = statuts.filter(entreprise__in=entreprises)
+        if reglementations is not None:
+            statuts = statuts.filter(reglementation__in=reglementations)
+        return statuts.delete()
+
+
+# Statut d'une réglementation pour une entreprise, précalculé pour éviter de recalculer tous les statuts
+# (requêtes BDESE et CSRD, appels aux API EgaPro et Bilans GES) à chaque affichage du tableau de bord.
+# Les statuts sont invalidés par les signaux de reglementations.signals et par les synchronisations EgaPro et Bilans GES.
+class StatutReglementation(models.Model):
+    entreprise = models.ForeignKey(
+        "entreprises.Entreprise",
+        on_delete=models.CASCADE,
+        related_name="statuts_reglementations",
+    )
+    caracteristiques = models.ForeignKey(
+        "entreprises.CaracteristiquesAnnuelles",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="caractéristiques utilisées pour le calcul",
+    )
+    reglementation = models.CharField(
+        max_length=64, verbose_name="identifiant de la réglementation"
+    )
+    # None si l'entreprise n'est pas suffisamment qualifiée pour cette réglementation
+    est_soumis = models.BooleanField(null=True, verbose_name="entreprise soumise")
+    # None si seul l'assujettissement a été calculé
+    statut = models.JSONField(
+        null=True, encoder=DjangoJSONEncoder, verbose_name="statut sérialisé"
+    )
+    calcule_le = models.DateTimeField(auto_now=True, verbose_name="date du calcul")
+
+    objects = StatutReglementationQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "statut de réglementation"
+        verbose_name_plural = "statuts de réglementation"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entreprise", "reglementation"],
+                name="unique_statut_reglementation",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.entreprise_id} - {self.reglementation}"
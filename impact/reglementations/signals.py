@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
+from reglementations.models import BDESE_300
+from reglementations.models import BDESE_50_300
+from reglementations.models import BDESEAvecAccord
+from reglementations.models import RapportCSRD
+from reglementations.models import StatutReglementation
+from vsme.models import RapportVSME
+
+# Invalidation des statuts précalculés des réglementations (cf. reglementations.statuts)
+# lors de la modification des données utilisées pour leur calcul.
+
+# identifiants de BDESEReglementation, CSRDReglementation et VSMEReglementation :
+# les vues des réglementations (et weasyprint) ne sont pas chargées au démarrage de l'application
+BDESE = "bdese"
+CSRD = "csrd"
+VSME = "vsme"
+
+
+@receiver(post_save, sender=Entreprise)
+@receiver(post_delete, sender=Entreprise)
+def invalide_statuts_entreprise(sender, instance, **kwargs):
+    StatutReglementation.objects.invalide(entreprises=[instance.pk])
+
+
+@receiver(post_save, sender=CaracteristiquesAnnuelles)
+@receiver(post_delete, sender=CaracteristiquesAnnuelles)
+def invalide_statuts_caracteristiques(sender, instance, **kwargs):
+    StatutReglementation.objects.invalide(entreprises=[instance.entreprise_id])
+
+
+@receiver(post_save, sender=BDESE_300)
+@receiver(post_save, sender=BDESE_50_300)
+@receiver(post_save, sender=BDESEAvecAccord)
+@receiver(post_delete, sender=BDESE_300)
+@receiver(post_delete, sender=BDESE_50_300)
+@receiver(post_delete, sender=BDESEAvecAccord)
+def invalide_statut_bdese(sender, instance, **kwargs):
+    StatutReglementation.objects.invalide(
+        entreprises=[instance.entreprise_id],
+        reglementations=[BDESE],
+    )
+
+
+@receiver(post_save, sender=RapportCSRD)
+@receiver(post_delete, sender=RapportCSRD)
+def invalide_statut_csrd(sender, instance, **kwargs):
+    StatutReglementation.objects.invalide(
+        entreprises=[instance.entreprise_id],
+        reglementations=[CSRD],
+    )
+
+
+@receiver(post_save, sender=RapportVSME)
+@receiver(post_delete, sender=RapportVSME)
+def invalide_statut_vsme(sender, instance, **kwargs):
+    StatutReglementation.objects.invalide(
+        entreprises=[instance.entreprise_id],
+        reglementations=[VSME],
+    )
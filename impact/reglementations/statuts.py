@@ -0,0 +1,273 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import asdict
+
+from django.conf import settings
+from django.db import connection
+from django.db import connections
+
+from reglementations import assujettissement
+from reglementations.evaluation import evaluation
+from reglementations.models import StatutReglementation
+from reglementations.views.base import InsuffisammentQualifieeError
+from reglementations.views.base import ReglementationAction
+from reglementations.views.base import ReglementationStatus
+
+# Lecture des statuts des réglementations depuis les statuts précalculés (cf. StatutReglementation).
+# Un statut absent, invalidé ou calculé sur d'autres caractéristiques est recalculé puis enregistré.
+
+_executeur = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="statuts-reglementations"
+)
+
+
+@evaluation()
+def calcule_statuts(
+    reglementations,
+    caracteristiques,
+    enregistre=True,
+    sans_delai=False,
+    differe_appels_api=False,
+):
+    """renvoie un dictionnaire {identifiant de la réglementation: ReglementationStatus}
+
+    Les statuts dépendant d'API externes sont calculés en parallèle, dans la limite d'un délai global
+    (REGLEMENTATIONS_STATUTS_DELAI) au-delà duquel le statut signalant un problème technique est renvoyé.
+    Un calcul hors délai se termine en arrière-plan sans être enregistré : il sera refait au prochain affichage.
+    Dans une transaction, les calculs restent dans le thread courant : les données non validées de la transaction
+    ne sont pas visibles depuis les connexions des autres threads.
+
+    enregistre : False pour ne pas conserver les statuts recalculés (par exemple avec des API simulées)
+    sans_delai : True pour attendre la fin de tous les calculs (par exemple dans une commande)
+    differe_appels_api : True pour ne renvoyer les statuts dépendant d'API externes que s'ils sont déjà précalculés,
+    les autres étant absents du dictionnaire (ils sont alors chargés séparément, cf. vue reglementations_cartes)
+    """
+    debut = time.monotonic()
+    stockes = statuts_precalcules(reglementations, caracteristiques)
+    calculs_concurrents = (
+        settings.REGLEMENTATIONS_STATUTS_CALCULS_CONCURRENTS
+        and not sans_delai
+        and not connection.in_atomic_block
+    )
+    echeance = debut + settings.REGLEMENTATIONS_STATUTS_DELAI
+    # l'entreprise est chargée avant les calculs dans d'autres threads
+    caracteristiques.entreprise
+    futurs = {}
+    statuts = {}
+    for reglementation in reglementations:
+        if (status := stockes.get(reglementation.id)) is not None:
+            statuts[reglementation.id] = status
+        elif (
+            differe_appels_api
+            and reglementation.appels_api
+            and _est_soumis_ou_none(reglementation, caracteristiques)
+        ):
+            # les API ne sont interrogées que pour une entreprise soumise à la réglementation
+            continue
+        elif calculs_concurrents and reglementation.appels_api:
+            futurs[reglementation.id] = _executeur.submit(
+                contextvars.copy_context().run,
+                _calcule_dans_un_thread,
+                reglementation,
+                caracteristiques,
+                enregistre,
+                echeance,
+            )
+        else:
+            statuts[reglementation.id] = _calcule(
+                reglementation, caracteristiques, enregistre
+            )
+
+    if futurs:
+        wait(futurs.values(), timeout=max(echeance - time.monotonic(), 0))
+    for reglementation in reglementations:
+        if futur := futurs.get(reglementation.id):
+            statuts[reglementation.id] = (
+                futur.result()
+                if futur.done()
+                else reglementation.statut_probleme_technique(caracteristiques)
+            )
+    return {
+        reglementation.id: statuts[reglementation.id]
+        for reglementation in reglementations
+        if reglementation.id in statuts
+    }
+
+
+def statuts_precalcules(reglementations, caracteristiques):
+    """statuts valides déjà enregistrés, sans aucun calcul"""
+    return {
+        statut.reglementation: _deserialise(statut.statut)
+        for statut in _statuts_valides(reglementations, caracteristiques).filter(
+            statut__isnull=False
+        )
+    }
+
+
+def calcule_statut(reglementation, caracteristiques, enregistre=True, sans_delai=False):
+    return calcule_statuts(
+        [reglementation],
+        caracteristiques,
+        enregistre=enregistre,
+        sans_delai=sans_delai,
+    )[reglementation.id]
+
+
+@evaluation()
+def reglementations_soumises(reglementations, caracteristiques):
+    """équivalent à `[r for r in reglementations if r.est_soumis(caracteristiques)]`
+
+    lève InsuffisammentQualifieeError si l'entreprise n'est pas suffisamment qualifiée pour une des réglementations
+    """
+    stockes = dict(
+        _statuts_valides(reglementations, caracteristiques).values_list(
+            "reglementation", "est_soumis"
+        )
+    )
+    soumises = []
+    for reglementation in reglementations:
+        if reglementation.id in stockes:
+            if (est_soumis := stockes[reglementation.id]) is None:
+                raise InsuffisammentQualifieeError
+        else:
+            # seul l'assujettissement est enregistré, le statut sera calculé au premier affichage
+            est_soumis = _est_soumis_ou_none(reglementation, caracteristiques)
+            _enregistre(
+                reglementation, caracteristiques, est_soumis=est_soumis, statut=None
+            )
+            if est_soumis is None:
+                raise InsuffisammentQualifieeError
+        if est_soumis:
+            soumises.append(reglementation)
+    return soumises
+
+
+def assujettissements(reglementations, caracteristiques):
+    """renvoie la matrice entreprise × réglementation {entreprise_id: {reglementation.id: bool | None}}
+    depuis les statuts précalculés, en une requête
+
+    L'assujettissement absent des statuts précalculés est calculé en lot (cf. assujettissement.matrice_assujettissement)
+    puis enregistré pour les dernières caractéristiques qualifiantes des entreprises.
+    caracteristiques : liste de CaracteristiquesAnnuelles enregistrées, une par entreprise, avec leur entreprise chargée
+    """
+    caracteristiques = list(caracteristiques)
+    identifiants = [reglementation.id for reglementation in reglementations]
+    matrice = {c.entreprise_id: {} for c in caracteristiques}
+    for entreprise_id, reglementation_id, est_soumis in (
+        StatutReglementation.objects.valides()
+        .filter(caracteristiques__in=caracteristiques, reglementation__in=identifiants)
+        .values_list("entreprise_id", "reglementation", "est_soumis")
+    ):
+        matrice[entreprise_id][reglementation_id] = est_soumis
+
+    a_calculer = [
+        c for c in caracteristiques if len(matrice[c.entreprise_id]) < len(identifiants)
+    ]
+    if a_calculer:
+        calculees = assujettissement.matrice_assujettissement(
+            a_calculer, reglementations
+        )
+        a_enregistrer = []
+        for c in a_calculer:
+            for reglementation_id, est_soumis in calculees[c.entreprise_id].items():
+                if reglementation_id in matrice[c.entreprise_id]:
+                    continue
+                matrice[c.entreprise_id][reglementation_id] = est_soumis
+                # seul l'assujettissement est enregistré, le statut sera calculé au premier affichage
+                if c.pk == c.entreprise.caracteristiques_qualifiantes_id:
+                    a_enregistrer.append(
+                        StatutReglementation(
+                            entreprise_id=c.entreprise_id,
+                            caracteristiques=c,
+                            reglementation=reglementation_id,
+                            est_soumis=est_soumis,
+                            statut=None,
+                        )
+                    )
+        StatutReglementation.objects.bulk_create(
+            a_enregistrer,
+            update_conflicts=True,
+            unique_fields=["entreprise", "reglementation"],
+            update_fields=["caracteristiques", "est_soumis", "statut", "calcule_le"],
+        )
+    return matrice
+
+
+def est_soumis(reglementation, caracteristiques):
+    return bool(reglementations_soumises([reglementation], caracteristiques))
+
+
+def _calcule(reglementation, caracteristiques, enregistre, echeance=None):
+    status = reglementation.calculate_status(caracteristiques)
+    # un statut obtenu après l'échéance a été remplacé par un problème technique à l'affichage :
+    # il n'est pas enregistré, les données ayant pu être modifiées depuis
+    if echeance is not None and time.monotonic() > echeance:
+        return status
+    if enregistre and not status.provisoire:
+        _enregistre(
+            reglementation,
+            caracteristiques,
+            est_soumis=_est_soumis_ou_none(reglementation, caracteristiques),
+            statut=_serialise(status),
+        )
+    return status
+
+
+def _calcule_dans_un_thread(reglementation, caracteristiques, enregistre, echeance):
+    try:
+        return _calcule(reglementation, caracteristiques, enregistre, echeance)
+    finally:
+        connections.close_all()
+
+
+def _statuts_valides(reglementations, caracteristiques):
+    if caracteristiques.pk is None:
+        return StatutReglementation.objects.none()
+    return StatutReglementation.objects.valides().filter(
+        caracteristiques=caracteristiques,
+        reglementation__in=[reglementation.id for reglementation in reglementations],
+    )
+
+
+def _est_soumis_ou_none(reglementation, caracteristiques):
+    try:
+        return reglementation.est_soumis(caracteristiques)
+    except InsuffisammentQualifieeError:
+        return None
+
+
+def _enregistre(reglementation, caracteristiques, est_soumis, statut):
+    # des caractéristiques non enregistrées ne peuvent pas être référencées
+    if caracteristiques.pk is None:
+        return
+    StatutReglementation.objects.update_or_create(
+        entreprise_id=caracteristiques.entreprise_id,
+        reglementation=reglementation.id,
+        defaults={
+            "caracteristiques": caracteristiques,
+            "est_soumis": est_soumis,
+            "statut": statut,
+        },
+    )
+
+
+def _serialise(status):
+    # les URL des actions peuvent être paresseuses (reverse_lazy) : elles sont converties par DjangoJSONEncoder
+    return asdict(status)
+
+
+def _deserialise(statut):
+    primary_action = statut["primary_action"]
+    return ReglementationStatus(
+        **statut
+        | {
+            "primary_action": (
+                ReglementationAction(**primary_action) if primary_action else None
+            ),
+            "secondary_actions": [
+                ReglementationAction(**action) for action in statut["secondary_actions"]
+            ],
+        }
+    )
@@ -0,0 +1,85 @@
+from conftest import CODE_PAYS_PORTUGAL
+from conftest import CODE_SAS
+from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.assujettissement import matrice_assujettissement
+from reglementations.views import REGLEMENTATIONS
+
+
+def _entreprises(entreprise_unique_factory):
+    return [
+        entreprise_unique_factory(),
+        entreprise_unique_factory(),
+        entreprise_unique_factory(
+            effectif=CaracteristiquesAnnuelles.EFFECTIF_ENTRE_300_ET_499,
+            effectif_securite_sociale=CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_ENTRE_250_ET_499,
+            tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M,
+            tranche_bilan=CaracteristiquesAnnuelles.BILAN_ENTRE_25M_ET_43M,
+        ),
+        entreprise_unique_factory(
+            categorie_juridique_sirene=CODE_SAS,
+            effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+            appartient_groupe=True,
+            est_societe_mere=True,
+            comptes_consolides=True,
+            effectif_groupe=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+            tranche_chiffre_affaires_consolide=CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+        ),
+        entreprise_unique_factory(
+            code_pays_etranger_sirene=CODE_PAYS_PORTUGAL,
+            est_cotee=True,
+            effectif=CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+        ),
+    ]
+
+
+def test_matrice_identique_au_calcul_entreprise_par_entreprise(
+    entreprise_unique_factory,
+):
+    entreprises = _entreprises(entreprise_unique_factory)
+
+    matrice = matrice_assujettissement(
+        CaracteristiquesAnnuelles.objects.filter(entreprise__in=entreprises),
+        REGLEMENTATIONS,
+    )
+
+    assert set(matrice) == {entreprise.id for entreprise in entreprises}
+    for entreprise in entreprises:
+        caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+        for reglementation in REGLEMENTATIONS:
+            assert matrice[entreprise.id][
+                reglementation.id
+            ] == reglementation.est_soumis(caracteristiques)
+
+
+def test_matrice_en_une_seule_requete(
+    entreprise_unique_factory, django_assert_num_queries
+):
+    _entreprises(entreprise_unique_factory)
+
+    with django_assert_num_queries(1):
+        matrice_assujettissement(
+            CaracteristiquesAnnuelles.objects.all(), REGLEMENTATIONS
+        )
+
+
+def test_matrice_critere_evalue_une_fois_par_profil(entreprise_unique_factory, mocker):
+    entreprises = [entreprise_unique_factory() for _ in range(3)]
+    reglementation = REGLEMENTATIONS[1]
+    est_soumis = mocker.spy(reglementation, "est_soumis")
+
+    matrice = matrice_assujettissement(
+        CaracteristiquesAnnuelles.objects.all(), [reglementation]
+    )
+
+    assert est_soumis.call_count == 1
+    assert len(matrice) == len(entreprises)
+
+
+def test_matrice_entreprise_insuffisamment_qualifiee(entreprise_factory):
+    entreprise = entreprise_factory()
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    caracteristiques.effectif = None
+
+    matrice = matrice_assujettissement([caracteristiques], REGLEMENTATIONS)
+
+    assert matrice[entreprise.id]["index-egalite-professionnelle"] is None
@@ -1,8 +1,11 @@
+from datetime import date
+
 import pytest
 from freezegun import freeze_time
 
 from api.exceptions import APIError
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.models import PublicationBGES
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
 from reglementations.views.bges import BGESReglementation
@@ -276,3 +279,90 @@ def test_publication_trop_ancienne():
     annee_reporting = 2020
     with freeze_time("2024-01-01"):
         assert not BGESReglementation.publication_est_recente(annee_reporting)
+
+
+def test_calcule_le_statut_depuis_l_instantane_des_publications_bges(
+    entreprise_factory, mock_api_bges
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+    )
+    PublicationBGES.objects.remplace_instantane(
+        {entreprise.siren: 2022}, date(2023, 12, 14)
+    )
+
+    with freeze_time("2023-12-15"):
+        reglementation = BGESReglementation.calculate_status(
+            entreprise.dernieres_caracteristiques_qualifiantes
+        )
+
+    assert reglementation.status == ReglementationStatus.STATUS_A_JOUR
+    assert not mock_api_bges.called
+
+
+def test_api_interrogee_si_le_siren_est_absent_de_l_instantane(
+    entreprise_factory, mock_api_bges
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+    )
+    PublicationBGES.objects.remplace_instantane({"123456789": 2022}, date(2023, 12, 14))
+    mock_api_bges.return_value = 2022
+
+    with freeze_time("2023-12-15"):
+        reglementation = BGESReglementation.calculate_status(
+            entreprise.dernieres_caracteristiques_qualifiantes
+        )
+
+    assert reglementation.status == ReglementationStatus.STATUS_A_JOUR
+    mock_api_bges.assert_called_once_with(entreprise.siren)
+
+
+def test_api_interrogee_si_l_instantane_est_obsolete(
+    settings, entreprise_factory, mock_api_bges
+):
+    settings.BGES_INSTANTANE_DUREE_VALIDITE = 7
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+    )
+    PublicationBGES.objects.remplace_instantane(
+        {entreprise.siren: 2015}, date(2023, 12, 1)
+    )
+    mock_api_bges.return_value = 2022
+
+    with freeze_time("2023-12-15"):
+        reglementation = BGESReglementation.calculate_status(
+            entreprise.dernieres_caracteristiques_qualifiantes
+        )
+
+    assert reglementation.status == ReglementationStatus.STATUS_A_JOUR
+    mock_api_bges.assert_called_once_with(entreprise.siren)
+
+
+def test_absence_de_publication_conservee_pour_une_courte_duree(
+    settings, mock_api_bges, db
+):
+    settings.API_BGES_PUBLICATION_NEGATIVE_TTL = 60 * 60 * 24
+    mock_api_bges.return_value = None
+
+    with freeze_time("2023-12-15 10:00"):
+        assert PublicationBGES.derniere_annee_reporting("000000001") is None
+    with freeze_time("2023-12-16 09:00"):
+        assert PublicationBGES.derniere_annee_reporting("000000001") is None
+    mock_api_bges.assert_called_once_with("000000001")
+
+    with freeze_time("2023-12-16 11:00"):
+        assert PublicationBGES.derniere_annee_reporting("000000001") is None
+    assert mock_api_bges.call_count == 2
+
+
+def test_publication_recuperee_sur_l_api_conservee(settings, mock_api_bges, db):
+    settings.API_BGES_PUBLICATION_TTL = 60 * 60 * 24 * 7
+    mock_api_bges.return_value = 2022
+
+    with freeze_time("2023-12-15"):
+        assert PublicationBGES.derniere_annee_reporting("000000001") == 2022
+    with freeze_time("2023-12-21"):
+        assert PublicationBGES.derniere_annee_reporting("000000001") == 2022
+
+    mock_api_bges.assert_called_once_with("000000001")
@@ -0,0 +1,106 @@
+import pytest
+
+from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import evaluation
+from reglementations.evaluation import memorise
+from reglementations.views import REGLEMENTATIONS
+from reglementations.views.base import InsuffisammentQualifieeError
+
+
+class Critere:
+    evaluations = 0
+
+    @classmethod
+    @memorise
+    def effectif_superieur_a_50(cls, caracteristiques):
+        cls.evaluations += 1
+        if caracteristiques.effectif is None:
+            raise InsuffisammentQualifieeError
+        return caracteristiques.effectif not in (
+            CaracteristiquesAnnuelles.EFFECTIF_MOINS_DE_10,
+            CaracteristiquesAnnuelles.EFFECTIF_ENTRE_10_ET_49,
+        )
+
+
+@pytest.fixture(autouse=True)
+def reinitialise_compteur():
+    Critere.evaluations = 0
+
+
+@pytest.fixture
+def caracteristiques(entreprise_factory):
+    return entreprise_factory().dernieres_caracteristiques_qualifiantes
+
+
+def test_critere_evalue_a_chaque_appel_hors_evaluation(caracteristiques):
+    Critere.effectif_superieur_a_50(caracteristiques)
+    Critere.effectif_superieur_a_50(caracteristiques)
+
+    assert Critere.evaluations == 2
+
+
+def test_critere_evalue_une_fois_par_profil(
+    caracteristiques, entreprise_unique_factory
+):
+    autres_caracteristiques = (
+        entreprise_unique_factory().dernieres_caracteristiques_qualifiantes
+    )
+
+    with evaluation():
+        assert not Critere.effectif_superieur_a_50(caracteristiques)
+        assert not Critere.effectif_superieur_a_50(caracteristiques)
+        # même profil
+        assert not Critere.effectif_superieur_a_50(autres_caracteristiques)
+
+    assert Critere.evaluations == 1
+
+
+def test_critere_reevalue_apres_modification_des_caracteristiques(caracteristiques):
+    with evaluation():
+        assert not Critere.effectif_superieur_a_50(caracteristiques)
+        caracteristiques.effectif = CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+        assert Critere.effectif_superieur_a_50(caracteristiques)
+
+    assert Critere.evaluations == 2
+
+
+def test_exception_non_memorisee(caracteristiques):
+    caracteristiques.effectif = None
+
+    with evaluation():
+        for _ in range(2):
+            with pytest.raises(InsuffisammentQualifieeError):
+                Critere.effectif_superieur_a_50(caracteristiques)
+
+    assert Critere.evaluations == 2
+
+
+def test_evaluation_imbriquee_reutilise_les_resultats(caracteristiques):
+    with evaluation():
+        Critere.effectif_superieur_a_50(caracteristiques)
+        with evaluation():
+            Critere.effectif_superieur_a_50(caracteristiques)
+        Critere.effectif_superieur_a_50(caracteristiques)
+
+    assert Critere.evaluations == 1
+
+
+def test_statuts_identiques_avec_et_sans_evaluation(entreprise_factory):
+    caracteristiques = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        effectif_securite_sociale=CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_500_ET_PLUS,
+        tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+        tranche_bilan=CaracteristiquesAnnuelles.BILAN_100M_ET_PLUS,
+        est_cotee=True,
+    ).dernieres_caracteristiques_qualifiantes
+    attendus = [
+        reglementation.calculate_status(caracteristiques)
+        for reglementation in REGLEMENTATIONS
+    ]
+
+    with evaluation():
+        for _ in range(2):
+            assert [
+                reglementation.calculate_status(caracteristiques)
+                for reglementation in REGLEMENTATIONS
+            ] == attendus
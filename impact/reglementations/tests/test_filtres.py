@@ -0,0 +1,162 @@
+import random
+from datetime import date
+
+import pytest
+
+from conftest import CODE_AUTRE
+from conftest import CODE_PAYS_CANADA
+from conftest import CODE_PAYS_PORTUGAL
+from conftest import CODE_SA
+from conftest import CODE_SA_COOPERATIVE
+from conftest import CODE_SAS
+from conftest import CODE_SCA
+from conftest import CODE_SE
+from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import Entreprise
+from reglementations.views import REGLEMENTATIONS
+from reglementations.views.base import InsuffisammentQualifieeError
+from reglementations.views.csrd.csrd import CSRDReglementation
+
+# Les filtres SQL des réglementations doivent donner le même résultat que les méthodes Python
+# pour n'importe quelles caractéristiques : les caractéristiques sont tirées au hasard
+# (avec une graine fixe pour que les tests soient reproductibles) parmi toutes les valeurs possibles.
+
+NOMBRE_ENTREPRISES = 300
+GRAINES = (0, 1, 2)
+
+CHAMPS_TRANCHES = (
+    "effectif",
+    "effectif_securite_sociale",
+    "effectif_outre_mer",
+    "effectif_groupe",
+    "effectif_groupe_france",
+    "tranche_chiffre_affaires",
+    "tranche_bilan",
+    "tranche_chiffre_affaires_consolide",
+    "tranche_bilan_consolide",
+    "tranche_consommation_energie_finale",
+)
+CHAMPS_BOOLEENS = (
+    "est_cotee",
+    "est_interet_public",
+    "appartient_groupe",
+    "est_societe_mere",
+    "societe_mere_en_france",
+    "comptes_consolides",
+)
+# codes remarquables (bornes des critères) complétés par des codes quelconques
+# la catégorie juridique est toujours renseignée pour les entreprises qualifiées
+CATEGORIES_JURIDIQUES = (
+    CODE_SA,
+    CODE_SA_COOPERATIVE,
+    CODE_SAS,
+    CODE_SCA,
+    CODE_SE,
+    CODE_AUTRE,
+    3120,
+    5100,
+    5307,
+    5543,
+    5699,
+    5785,
+    6199,
+    6300,
+    6317,
+    6499,
+    8100,
+    8299,
+)
+CODES_PAYS = (None, CODE_PAYS_PORTUGAL, CODE_PAYS_CANADA)
+
+
+def _valeurs_possibles(champ):
+    choices = CaracteristiquesAnnuelles._meta.get_field(champ).choices
+    return [valeur for valeur, _ in choices] + [None]
+
+
+def _entreprises_au_hasard(graine):
+    hasard = random.Random(graine)
+    entreprises = Entreprise.objects.bulk_create(
+        Entreprise(
+            siren=f"{numero:09d}",
+            denomination=f"Entreprise {numero}",
+            categorie_juridique_sirene=hasard.choice(
+                CATEGORIES_JURIDIQUES + (hasard.randint(1000, 9999),)
+            ),
+            code_pays_etranger_sirene=hasard.choice(CODES_PAYS),
+            **{champ: hasard.choice((True, False, None)) for champ in CHAMPS_BOOLEENS},
+        )
+        for numero in range(1, NOMBRE_ENTREPRISES + 1)
+    )
+    CaracteristiquesAnnuelles.objects.bulk_create(
+        CaracteristiquesAnnuelles(
+            entreprise=entreprise,
+            annee=2024,
+            date_cloture_exercice=hasard.choice((date(2024, 12, 31), None)),
+            **{
+                champ: hasard.choice(_valeurs_possibles(champ))
+                for champ in CHAMPS_TRANCHES
+            },
+        )
+        for entreprise in entreprises
+    )
+    return CaracteristiquesAnnuelles.objects.select_related("entreprise")
+
+
+def _est_soumis(reglementation, caracteristiques):
+    try:
+        return reglementation.est_soumis(caracteristiques)
+    except InsuffisammentQualifieeError:
+        return False
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("graine", GRAINES)
+def test_filtres_equivalents_aux_criteres_python(graine):
+    caracteristiques = _entreprises_au_hasard(graine)
+
+    for reglementation in REGLEMENTATIONS:
+        assert set(
+            caracteristiques.filter(
+                reglementation.filtre_est_suffisamment_qualifiee()
+            ).values_list("pk", flat=True)
+        ) == {
+            c.pk
+            for c in caracteristiques
+            if reglementation.est_suffisamment_qualifiee(c)
+        }, reglementation.id
+        assert set(
+            caracteristiques.filter(reglementation.filtre_est_soumis()).values_list(
+                "pk", flat=True
+            )
+        ) == {
+            c.pk for c in caracteristiques if _est_soumis(reglementation, c)
+        }, reglementation.id
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("graine", GRAINES)
+def test_annotation_premier_exercice_csrd_equivalente(graine):
+    caracteristiques = _entreprises_au_hasard(graine).annotate(
+        premier_exercice=CSRDReglementation.annotation_est_soumis_a_partir_de_l_exercice()
+    )
+
+    for c in caracteristiques:
+        assert c.premier_exercice == (
+            CSRDReglementation.est_soumis_a_partir_de_l_exercice(c)
+        )
+
+
+def test_filtre_soumis_a_la_csrd_a_partir_d_un_exercice(entreprise_unique_factory):
+    grande_entreprise = entreprise_unique_factory(
+        effectif_securite_sociale=CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_ENTRE_250_ET_499,
+        tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M,
+        tranche_bilan=CaracteristiquesAnnuelles.BILAN_ENTRE_25M_ET_43M,
+    )
+    entreprise_unique_factory()
+
+    soumises_en_2027 = CaracteristiquesAnnuelles.objects.alias(
+        premier_exercice=CSRDReglementation.annotation_est_soumis_a_partir_de_l_exercice()
+    ).filter(premier_exercice=2027)
+
+    assert [c.entreprise for c in soumises_en_2027] == [grande_entreprise]
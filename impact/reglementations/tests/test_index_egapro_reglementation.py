@@ -4,6 +4,7 @@ from freezegun import freeze_time
 from api.exceptions import APIError
 from entreprises.models import CaracteristiquesAnnuelles
 from reglementations.models import derniere_annee_a_publier_index_egapro
+from reglementations.models import PublicationIndexEgapro
 from reglementations.views.base import ReglementationStatus
 from reglementations.views.index_egapro import IndexEgaproReglementation
 
@@ -102,9 +103,10 @@ def test_calculate_status_more_than_50_employees(
     assert index.primary_action.external
     mock_api_egapro.assert_called_once_with(entreprise.siren, annee)
 
+    # l'absence de publication est de nouveau vérifiée une fois sa durée de validité écoulée
     mock_api_egapro.reset_mock()
     mock_api_egapro.return_value = True
-    with freeze_time("2023-02-28"):
+    with freeze_time("2023-03-01 12:00"):
         annee = derniere_annee_a_publier_index_egapro()
         index = IndexEgaproReglementation.calculate_status(
             entreprise.dernieres_caracteristiques_qualifiantes
@@ -140,3 +142,55 @@ def test_calculate_status_more_than_50_employees_with_egapro_API_fails(
     )
     assert index.prochaine_echeance is None
     mock_api_egapro.assert_called_once_with(entreprise.siren, annee)
+
+
+def test_calculate_status_utilise_l_etat_de_publication_connu_localement(
+    entreprise_factory, mock_api_egapro
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+    )
+    with freeze_time("2023-02-28"):
+        PublicationIndexEgapro.objects.enregistre({(entreprise.siren, 2022): True})
+        index = IndexEgaproReglementation.calculate_status(
+            entreprise.dernieres_caracteristiques_qualifiantes
+        )
+
+    assert index.status == ReglementationStatus.STATUS_A_JOUR
+    assert not mock_api_egapro.called
+
+
+def test_calculate_status_enregistre_l_etat_de_publication_recupere_par_l_api(
+    entreprise_factory, mock_api_egapro
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+    )
+    mock_api_egapro.return_value = False
+
+    with freeze_time("2023-02-28"):
+        for _ in range(2):
+            index = IndexEgaproReglementation.calculate_status(
+                entreprise.dernieres_caracteristiques_qualifiantes
+            )
+
+    assert index.status == ReglementationStatus.STATUS_A_ACTUALISER
+    mock_api_egapro.assert_called_once_with(entreprise.siren, 2022)
+    publication = PublicationIndexEgapro.objects.get(siren=entreprise.siren)
+    assert publication.annee == 2022
+    assert not publication.est_publie
+
+
+def test_etat_de_publication_perime(settings, mock_api_egapro, db):
+    settings.API_EGAPRO_PUBLICATION_TTL = 60 * 60 * 24 * 30
+    with freeze_time("2023-02-01"):
+        PublicationIndexEgapro.objects.enregistre({("000000001", 2022): True})
+    mock_api_egapro.return_value = True
+
+    with freeze_time("2023-02-28"):
+        assert PublicationIndexEgapro.est_publie_pour("000000001", 2022)
+    assert not mock_api_egapro.called
+
+    with freeze_time("2023-03-05"):
+        assert PublicationIndexEgapro.est_publie_pour("000000001", 2022)
+    mock_api_egapro.assert_called_once_with("000000001", 2022)
@@ -7,13 +7,16 @@ import pytest
 from freezegun import freeze_time
 
 import reglementations.views  # noqa
+from api.exceptions import APIError
 from entreprises.models import CaracteristiquesAnnuelles
 from habilitations.models import Habilitation
+from reglementations import statuts
 from reglementations.models import RapportCSRD
 from reglementations.utils import VSMEReglementation
 from reglementations.views import REGLEMENTATIONS
 from reglementations.views.base import InsuffisammentQualifieeError
 from reglementations.views.base import ReglementationStatus
+from reglementations.views.bges import BGESReglementation
 
 
 def test_les_reglementations_obligatoires_levent_une_exception_si_les_caracteristiques_sont_vides(
@@ -49,14 +52,121 @@ def test_reglementations(client, entreprise_factory, alice):
         + context["reglementations_a_jour"]
         + context["autres_reglementations"]
     )
-    assert len(reglementations) == len(REGLEMENTATIONS)
-    for REGLEMENTATION in REGLEMENTATIONS:
+    REGLEMENTATIONS_LOCALES = [r for r in REGLEMENTATIONS if not r.appels_api]
+    assert len(reglementations) == len(REGLEMENTATIONS_LOCALES)
+    for REGLEMENTATION in REGLEMENTATIONS_LOCALES:
         index = [
             reglementation["reglementation"] for reglementation in reglementations
         ].index(REGLEMENTATION)
         assert reglementations[index]["status"] == REGLEMENTATION.calculate_status(
             entreprise.dernieres_caracteristiques_qualifiantes
         )
+    # les réglementations dépendant d'API externes sont chargées séparément
+    assert [
+        reglementation["reglementation"]
+        for reglementation in context["reglementations_differees"]
+    ] == [r for r in REGLEMENTATIONS if r.appels_api]
+    assert (
+        f"/tableau-de-bord/{entreprise.siren}/reglementations/cartes/"
+        in response.content.decode()
+    )
+
+
+def test_reglementations_avec_statuts_precalcules_non_differes(
+    client, entreprise_factory, alice
+):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        utilisateur=alice,
+    )
+    statuts.calcule_statuts(
+        REGLEMENTATIONS, entreprise.dernieres_caracteristiques_qualifiantes
+    )
+    client.force_login(alice)
+
+    response = client.get(f"/tableau-de-bord/{entreprise.siren}/reglementations/")
+
+    assert response.context["reglementations_differees"] == []
+
+
+def test_reglementations_non_soumises_non_differees(client, entreprise_factory, alice):
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_MOINS_DE_10,
+        effectif_outre_mer=CaracteristiquesAnnuelles.EFFECTIF_OUTRE_MER_MOINS_DE_250,
+        utilisateur=alice,
+    )
+    client.force_login(alice)
+
+    response = client.get(f"/tableau-de-bord/{entreprise.siren}/reglementations/")
+
+    assert response.context["reglementations_differees"] == []
+    assert (
+        f"/tableau-de-bord/{entreprise.siren}/reglementations/cartes/"
+        not in response.content.decode()
+    )
+
+
+def test_cartes_des_reglementations_htmx_placees_dans_la_section_de_leur_statut(
+    client, entreprise_factory, alice, mock_api_bges
+):
+    mock_api_bges.return_value = date.today().year
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        utilisateur=alice,
+    )
+    client.force_login(alice)
+
+    response = client.get(
+        f"/tableau-de-bord/{entreprise.siren}/reglementations/cartes/",
+        headers={"HX-Request": "true"},
+    )
+
+    assert response.status_code == 200
+    context = response.context
+    assert context["reglementations_differees"] == []
+    assert BGESReglementation in [
+        reglementation["reglementation"]
+        for reglementation in context["reglementations_a_jour"]
+    ]
+    assert "private" in response["Cache-Control"]
+    assert "HX-Request" in response["Vary"]
+
+
+def test_cartes_des_reglementations_avec_statut_provisoire_non_mises_en_cache(
+    client, entreprise_factory, alice, mock_api_bges
+):
+    mock_api_bges.side_effect = APIError
+    entreprise = entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        utilisateur=alice,
+    )
+    client.force_login(alice)
+
+    response = client.get(
+        f"/tableau-de-bord/{entreprise.siren}/reglementations/cartes/",
+        headers={"HX-Request": "true"},
+    )
+
+    assert response.status_code == 200
+    assert any(
+        reglementation["status"].provisoire
+        for reglementation in response.context["autres_reglementations"]
+    )
+    assert "max-age" not in response.get("Cache-Control", "")
+
+
+def test_cartes_des_reglementations_hors_htmx_redirige_vers_les_reglementations(
+    client, entreprise_factory, alice
+):
+    entreprise = entreprise_factory(utilisateur=alice)
+    client.force_login(alice)
+
+    response = client.get(
+        f"/tableau-de-bord/{entreprise.siren}/reglementations/cartes/"
+    )
+
+    assert response.status_code == 302
+    assert response.url == f"/tableau-de-bord/{entreprise.siren}/reglementations/"
 
 
 def test_reglementations_entreprise_non_qualifiee_redirige_vers_la_qualification(
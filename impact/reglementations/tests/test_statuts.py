@@ -0,0 +1,299 @@
+import time
+from datetime import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+
+import reglementations.signals
+from api.exceptions import APIError
+from entreprises.models import CaracteristiquesAnnuelles
+from reglementations import statuts
+from reglementations.models import PublicationBGES
+from reglementations.models import PublicationIndexEgapro
+from reglementations.models import RapportCSRD
+from reglementations.models import StatutReglementation
+from reglementations.utils import VSMEReglementation
+from reglementations.views import calculer_metriques_entreprises
+from reglementations.views import REGLEMENTATIONS
+from reglementations.views.base import InsuffisammentQualifieeError
+from reglementations.views.base import ReglementationStatus
+from reglementations.views.bdese import BDESEReglementation
+from reglementations.views.bges import BGESReglementation
+from reglementations.views.csrd.csrd import CSRDReglementation
+from reglementations.views.index_egapro import IndexEgaproReglementation
+from vsme.models import RapportVSME
+
+
+@pytest.fixture
+def entreprise(entreprise_factory):
+    return entreprise_factory(
+        effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+    )
+
+
+def test_statuts_calcules_puis_lus_depuis_les_statuts_precalcules(entreprise, mocker):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    attendus = {
+        reglementation.id: reglementation.calculate_status(caracteristiques)
+        for reglementation in REGLEMENTATIONS
+    }
+
+    assert statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques) == attendus
+    assert StatutReglementation.objects.filter(entreprise=entreprise).count() == len(
+        REGLEMENTATIONS
+    )
+
+    calculate_status = mocker.patch.object(CSRDReglementation, "calculate_status")
+    assert statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques) == attendus
+    assert not calculate_status.called
+
+
+def test_statut_provisoire_non_conserve(entreprise, mock_api_egapro):
+    mock_api_egapro.side_effect = APIError
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    status = statuts.calcule_statut(IndexEgaproReglementation, caracteristiques)
+
+    assert status.provisoire
+    assert not StatutReglementation.objects.filter(
+        reglementation=IndexEgaproReglementation.id
+    ).exists()
+
+
+def test_statuts_non_conserves_sur_demande(entreprise):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    statuts.calcule_statut(
+        IndexEgaproReglementation, caracteristiques, enregistre=False
+    )
+
+    assert not StatutReglementation.objects.exists()
+
+
+def test_statuts_recalcules_le_lendemain(entreprise):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    with freeze_time(datetime(2025, 3, 1, 23, 0)):
+        statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques)
+
+    with freeze_time(datetime(2025, 3, 2, 9, 0)):
+        assert not StatutReglementation.objects.valides().exists()
+        statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques)
+        assert StatutReglementation.objects.valides().count() == len(REGLEMENTATIONS)
+
+
+def test_statuts_invalides_par_la_modification_des_caracteristiques(entreprise):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques)
+
+    caracteristiques.effectif = CaracteristiquesAnnuelles.EFFECTIF_MOINS_DE_10
+    caracteristiques.save()
+
+    assert not StatutReglementation.objects.exists()
+
+
+def test_statut_csrd_invalide_par_la_creation_d_un_rapport(entreprise):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    statuts.calcule_statuts(REGLEMENTATIONS, caracteristiques)
+
+    RapportCSRD.objects.create(entreprise=entreprise, annee=2025)
+
+    assert not StatutReglementation.objects.filter(
+        reglementation=CSRDReglementation.id
+    ).exists()
+    assert StatutReglementation.objects.count() == len(REGLEMENTATIONS) - 1
+
+
+def test_reglementations_soumises(entreprise, mocker):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    attendues = [r for r in REGLEMENTATIONS if r.est_soumis(caracteristiques)]
+
+    assert statuts.reglementations_soumises(REGLEMENTATIONS, caracteristiques) == (
+        attendues
+    )
+    # seul l'assujettissement est conservé, sans calcul des statuts
+    assert StatutReglementation.objects.filter(statut__isnull=True).count() == len(
+        REGLEMENTATIONS
+    )
+
+    est_soumis = mocker.patch.object(CSRDReglementation, "est_soumis")
+    assert statuts.reglementations_soumises(REGLEMENTATIONS, caracteristiques) == (
+        attendues
+    )
+    assert not est_soumis.called
+
+
+def test_assujettissements_lus_depuis_les_statuts_precalcules(
+    entreprise, mocker, django_assert_num_queries
+):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    attendus = {
+        entreprise.id: {
+            reglementation.id: reglementation.est_soumis(caracteristiques)
+            for reglementation in REGLEMENTATIONS
+        }
+    }
+
+    assert statuts.assujettissements(REGLEMENTATIONS, [caracteristiques]) == attendus
+    assert StatutReglementation.objects.filter(statut__isnull=True).count() == len(
+        REGLEMENTATIONS
+    )
+
+    est_soumis = mocker.patch.object(CSRDReglementation, "est_soumis")
+    with django_assert_num_queries(1):
+        assert (
+            statuts.assujettissements(REGLEMENTATIONS, [caracteristiques]) == attendus
+        )
+    assert not est_soumis.called
+
+
+def test_identifiants_des_reglementations_des_signaux():
+    assert reglementations.signals.BDESE == BDESEReglementation.id
+    assert reglementations.signals.CSRD == CSRDReglementation.id
+    assert reglementations.signals.VSME == VSMEReglementation.id
+
+
+def test_reglementations_soumises_entreprise_insuffisamment_qualifiee(entreprise):
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    caracteristiques.effectif = None
+
+    for _ in range(2):
+        with pytest.raises(InsuffisammentQualifieeError):
+            statuts.est_soumis(IndexEgaproReglementation, caracteristiques)
+
+
+# les calculs concurrents ne sont faits qu'en dehors d'une transaction
+@pytest.fixture
+def calculs_concurrents(settings):
+    settings.REGLEMENTATIONS_STATUTS_CALCULS_CONCURRENTS = True
+    settings.REGLEMENTATIONS_STATUTS_DELAI = 1
+
+
+def _appel_api_lent(duree, resultat=None):
+    def appel(*args):
+        time.sleep(duree)
+        return resultat
+
+    return appel
+
+
+@pytest.mark.django_db(transaction=True)
+def test_statuts_dependant_d_api_calcules_en_parallele(
+    entreprise, calculs_concurrents, mocker
+):
+    mocker.patch.object(
+        PublicationIndexEgapro, "est_publie_pour", side_effect=_appel_api_lent(0.3)
+    )
+    mocker.patch.object(
+        PublicationBGES, "derniere_annee_reporting", side_effect=_appel_api_lent(0.3)
+    )
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    debut = time.monotonic()
+    resultats = statuts.calcule_statuts(
+        [IndexEgaproReglementation, BGESReglementation],
+        caracteristiques,
+        enregistre=False,
+    )
+
+    assert time.monotonic() - debut < 0.55
+    assert (
+        resultats[IndexEgaproReglementation.id].status
+        == ReglementationStatus.STATUS_A_ACTUALISER
+    )
+    assert (
+        resultats[BGESReglementation.id].status
+        == ReglementationStatus.STATUS_A_ACTUALISER
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_statut_hors_delai_remplace_par_un_probleme_technique(
+    entreprise, calculs_concurrents, settings, mocker
+):
+    settings.REGLEMENTATIONS_STATUTS_DELAI = 0.1
+    mocker.patch.object(
+        PublicationBGES, "derniere_annee_reporting", side_effect=_appel_api_lent(0.5)
+    )
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    status = statuts.calcule_statut(
+        BGESReglementation, caracteristiques, enregistre=False
+    )
+
+    assert status == BGESReglementation.statut_probleme_technique(caracteristiques)
+    assert status.status == ReglementationStatus.STATUS_SOUMIS
+    assert "problème technique" in status.status_detail
+
+
+@pytest.mark.django_db(transaction=True)
+def test_statut_calcule_dans_le_delai_enregistre(
+    entreprise, calculs_concurrents, mocker
+):
+    mocker.patch.object(
+        PublicationBGES, "derniere_annee_reporting", side_effect=_appel_api_lent(0.1)
+    )
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    status = statuts.calcule_statut(BGESReglementation, caracteristiques)
+
+    assert statuts.statuts_precalcules([BGESReglementation], caracteristiques) == {
+        BGESReglementation.id: status
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_statut_hors_delai_non_enregistre(
+    entreprise, calculs_concurrents, settings, mocker
+):
+    settings.REGLEMENTATIONS_STATUTS_DELAI = 0.1
+    mocker.patch.object(
+        PublicationBGES, "derniere_annee_reporting", side_effect=_appel_api_lent(0.3)
+    )
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    statuts.calcule_statut(BGESReglementation, caracteristiques)
+    # fin du calcul en arrière-plan
+    time.sleep(0.4)
+
+    assert not statuts.statuts_precalcules([BGESReglementation], caracteristiques)
+
+
+def test_calculs_dans_le_thread_courant_dans_une_transaction(
+    entreprise, calculs_concurrents, mocker
+):
+    soumet = mocker.spy(statuts._executeur, "submit")
+    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+
+    status = statuts.calcule_statut(BGESReglementation, caracteristiques)
+
+    assert not soumet.called
+    assert statuts.statuts_precalcules([BGESReglementation], caracteristiques) == {
+        BGESReglementation.id: status
+    }
+
+
+def test_metriques_de_plusieurs_entreprises_en_nombre_constant_de_requetes(
+    entreprise_factory,
+):
+    def requetes_pour(entreprises):
+        calculer_metriques_entreprises(entreprises)
+        with CaptureQueriesContext(connection) as requetes:
+            metriques = calculer_metriques_entreprises(entreprises)
+        assert set(metriques) == {entreprise.id for entreprise in entreprises}
+        return len(requetes)
+
+    entreprises = [
+        entreprise_factory(
+            siren=siren, effectif=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS
+        )
+        for siren in ("000000001", "000000002", "000000003")
+    ]
+    for entreprise in entreprises:
+        RapportVSME.objects.create(
+            entreprise=entreprise,
+            annee=entreprise.dernier_exercice_clos.date_cloture.year,
+        )
+
+    assert requetes_pour(entreprises[:1]) == requetes_pour(entreprises)
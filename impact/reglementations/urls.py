@@ -50,6 +50,11 @@ urlpatterns = [
         views.reglementations,
         name="reglementations",
     ),
+    path(
+        "tableau-de-bord/<str:siren>/reglementations/cartes/",
+        views.reglementations_cartes,
+        name="reglementations_cartes",
+    ),
     path(
         "tableau-de-bord/<str:siren>/reglementations/<str:id_reglementation>/",
         views.reglementation,
@@ -1,8 +1,10 @@
 from datetime import date
 
+from django.db.models import Q
 from django.urls.base import reverse_lazy
 
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.views.base import AUCUNE
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
@@ -43,6 +45,14 @@ class VSMEReglementation(Reglementation):
     def est_soumis(cls, caracteristiques):
         return False
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q()
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return AUCUNE
+
     @classmethod
     def calculate_status(
         cls,
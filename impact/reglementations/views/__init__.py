@@ -1,18 +1,28 @@
+import operator
 from datetime import datetime
+from functools import reduce
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
 from django.http import Http404
+from django.shortcuts import redirect
 from django.shortcuts import render
+from django.urls import reverse
 from django.urls import reverse_lazy
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
 
+import utils.htmx as htmx
 from entreprises.decorators import entreprise_qualifiee_requise
 from entreprises.decorators import entreprise_requise
 from entreprises.models import CaracteristiquesAnnuelles
 from habilitations.views import contributeurs_context
 from logs import event_logger as logger
 from logs import log_path
+from reglementations import statuts
 from reglementations.utils import VSMEReglementation
 from reglementations.views.audit_energetique import AuditEnergetiqueReglementation
 from reglementations.views.base import ReglementationStatus
@@ -49,31 +59,81 @@ def calculer_metriques_entreprise(entreprise):
             'pourcentage_vsme': int
         }
     """
-    # Recuperer les caracteristiques actuelles
-    caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
+    return calculer_metriques_entreprises([entreprise])[entreprise.id]
 
-    # Calcul du nombre de reglementations applicables
-    if caracteristiques:
-        reglementations_applicables = [
-            r for r in REGLEMENTATIONS if r.est_soumis(caracteristiques)
-        ]
-        nombre_reglementations_applicables = len(reglementations_applicables)
-    else:
-        nombre_reglementations_applicables = "?"
 
-    # Calcul du pourcentage VSME
-    try:
-        rapport_vsme = RapportVSME.objects.get(
-            entreprise=entreprise,
-            annee=entreprise.dernier_exercice_clos.date_cloture.year,
+def calculer_metriques_entreprises(entreprises):
+    """Calcule les metriques synthetiques de plusieurs entreprises (cf. calculer_metriques_entreprise).
+
+    L'assujettissement aux réglementations est lu dans les statuts précalculés (calculé en lot s'il est absent)
+    et les rapports VSME sont chargés en une requête pour toutes les entreprises.
+
+    Returns:
+        dict: {entreprise.id: metriques}
+    """
+    entreprises = list(entreprises)
+
+    # Recuperer les caracteristiques actuelles
+    caracteristiques_par_entreprise = _dernieres_caracteristiques_qualifiantes(
+        entreprises
+    )
+    matrice = statuts.assujettissements(
+        REGLEMENTATIONS, caracteristiques_par_entreprise.values()
+    )
+    rapports_vsme = _rapports_vsme_du_dernier_exercice_clos(entreprises)
+
+    metriques = {}
+    for entreprise in entreprises:
+        # Calcul du nombre de reglementations applicables
+        if entreprise.id in matrice:
+            nombre_reglementations_applicables = len(
+                [r for r in REGLEMENTATIONS if matrice[entreprise.id][r.id]]
+            )
+        else:
+            nombre_reglementations_applicables = "?"
+
+        # Calcul du pourcentage VSME
+        if rapport_vsme := rapports_vsme.get(entreprise.id):
+            pourcentage_vsme = rapport_vsme.progression()["pourcent"]
+        else:
+            pourcentage_vsme = 0
+
+        metriques[entreprise.id] = {
+            "nombre_reglementations_applicables": nombre_reglementations_applicables,
+            "pourcentage_vsme": pourcentage_vsme,
+        }
+    return metriques
+
+
+def _rapports_vsme_du_dernier_exercice_clos(entreprises):
+    if not entreprises:
+        return {}
+    rapports = RapportVSME.objects.filter(
+        reduce(
+            operator.or_,
+            (
+                Q(
+                    entreprise=entreprise,
+                    annee=entreprise.dernier_exercice_clos.date_cloture.year,
+                )
+                for entreprise in entreprises
+            ),
         )
-        pourcentage_vsme = rapport_vsme.progression()["pourcent"]
-    except RapportVSME.DoesNotExist:
-        pourcentage_vsme = 0
+    ).prefetch_related("progressions", "indicateurs")
+    return {rapport.entreprise_id: rapport for rapport in rapports}
+
 
+def _dernieres_caracteristiques_qualifiantes(entreprises):
+    # équivalent en une requête de Entreprise.dernieres_caracteristiques_qualifiantes pour plusieurs entreprises
     return {
-        "nombre_reglementations_applicables": nombre_reglementations_applicables,
-        "pourcentage_vsme": pourcentage_vsme,
+        caracteristiques.entreprise_id: caracteristiques
+        for caracteristiques in CaracteristiquesAnnuelles.objects.filter(
+            pk__in=[
+                entreprise.caracteristiques_qualifiantes_id
+                for entreprise in entreprises
+                if entreprise.caracteristiques_qualifiantes_id
+            ]
+        ).select_related("entreprise")
     }
 
 
@@ -106,9 +166,9 @@ def tableau_de_bord(request, entreprise):
             )
 
         # Calculer les réglementations applicables
-        reglementations_applicables = [
-            r for r in REGLEMENTATIONS if r.est_soumis(caracteristiques)
-        ]
+        reglementations_applicables = statuts.reglementations_soumises(
+            REGLEMENTATIONS, caracteristiques
+        )
         nombre_reglementations_applicables = len(reglementations_applicables)
 
     # Calculer le nombre d'analyses IA réussies
@@ -181,7 +241,22 @@ def analyse_double_materialite(request, entreprise):
 def reglementations(request, entreprise):
     caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
 
-    reglementations = calcule_reglementations(caracteristiques)
+    # les réglementations dont le statut dépend d'API externes et n'est pas encore précalculé
+    # sont chargées séparément (cf. reglementations_cartes) pour ne pas retarder l'affichage de la page
+    reglementations = calcule_reglementations(caracteristiques, differe_appels_api=True)
+
+    context = tableau_de_bord_menu_context(entreprise)
+    context |= reglementations_context(reglementations)
+    return render(
+        request,
+        "reglementations/tableau_de_bord/reglementations.html",
+        context=context,
+    )
+
+
+def reglementations_context(reglementations):
+    reglementations_differees = [r for r in reglementations if r["status"] is None]
+    reglementations = [r for r in reglementations if r["status"] is not None]
     reglementations_a_actualiser = [
         r
         for r in reglementations
@@ -212,47 +287,78 @@ def reglementations(request, entreprise):
         for r in reglementations
         if r["status"].status == ReglementationStatus.STATUS_RECOMMANDE
     ]
-
-    context = tableau_de_bord_menu_context(entreprise)
-    context |= {
+    return {
         "reglementations_a_actualiser": reglementations_a_actualiser,
         "reglementations_en_cours": reglementations_en_cours,
         "reglementations_a_jour": reglementations_a_jour,
         "autres_reglementations": reglementations_soumises
         + reglementations_recommandees
         + reglementations_non_soumises,
+        "reglementations_differees": reglementations_differees,
     }
-    return render(
-        request,
-        "reglementations/tableau_de_bord/reglementations.html",
-        context=context,
-    )
 
 
-def calcule_reglementations(caracteristiques: CaracteristiquesAnnuelles):
+def calcule_reglementations(
+    caracteristiques: CaracteristiquesAnnuelles, differe_appels_api=False
+):
+    # avec differe_appels_api, le statut est None pour les réglementations à charger séparément
+    statuts_reglementations = statuts.calcule_statuts(
+        REGLEMENTATIONS, caracteristiques, differe_appels_api=differe_appels_api
+    )
     reglementations = [
         {
             "reglementation": reglementation,
-            "status": reglementation.calculate_status(caracteristiques),
+            "status": statuts_reglementations.get(reglementation.id),
         }
         for reglementation in REGLEMENTATIONS
     ]
     return reglementations
 
 
+def _reglementation_par_id(id_reglementation):
+    for reglementation in REGLEMENTATIONS:
+        if reglementation.id == id_reglementation:
+            return reglementation
+    raise Http404
+
+
+@login_required
+@entreprise_requise
+def reglementations_cartes(request, entreprise):
+    # fragment HTMX des cartes de la page reglementations, une fois les statuts différés calculés :
+    # chaque carte est placée dans la section de son statut
+    if not htmx.is_htmx(request):
+        return redirect("reglementations:reglementations", siren=entreprise.siren)
+    if not (caracteristiques := entreprise.dernieres_caracteristiques_qualifiantes):
+        return htmx.HttpResponseHXRedirect(
+            reverse("entreprises:qualification", args=[entreprise.siren])
+        )
+
+    reglementations = calcule_reglementations(caracteristiques)
+
+    context = {"entreprise": entreprise} | reglementations_context(reglementations)
+    response = render(
+        request,
+        "fragments/reglementations_cartes.html",
+        context=context,
+    )
+    # la même URL redirige les requêtes hors HTMX
+    patch_vary_headers(response, ["HX-Request"])
+    # un statut provisoire (problème technique) doit être recalculé au prochain affichage
+    if not any(r["status"].provisoire for r in reglementations):
+        patch_cache_control(
+            response, private=True, max_age=settings.REGLEMENTATIONS_CARTE_CACHE_TTL
+        )
+    return response
+
+
 @login_required
 @entreprise_qualifiee_requise
 def reglementation(request, entreprise, id_reglementation):
-    reglementation = None
-    for r in REGLEMENTATIONS:
-        if r.id == id_reglementation:
-            reglementation = r
-            break
-    if not reglementation:
-        raise Http404
+    reglementation = _reglementation_par_id(id_reglementation)
 
     caracteristiques = entreprise.dernieres_caracteristiques_qualifiantes
-    status = reglementation.calculate_status(caracteristiques)
+    status = statuts.calcule_statut(reglementation, caracteristiques)
 
     template_name = f"reglementations/tableau_de_bord/{id_reglementation}.html"
 
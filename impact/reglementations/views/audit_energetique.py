@@ -1,4 +1,7 @@
+from django.db.models import Q
+
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import memorise
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
@@ -18,6 +21,7 @@ class AuditEnergetiqueReglementation(Reglementation):
         return bool(caracteristiques.tranche_consommation_energie_finale)
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.tranche_consommation_energie_finale in (
@@ -41,10 +45,26 @@ class AuditEnergetiqueReglementation(Reglementation):
             return "Au-dessus de 23,6 GWh/an (85 TJ/an), un système de management de l'énergie certifié ISO 50001 est requis avant le 11 octobre 2027."
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.criteres_remplis(caracteristiques))
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(tranche_consommation_energie_finale__isnull=False) & ~Q(
+            tranche_consommation_energie_finale=""
+        )
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & Q(
+            tranche_consommation_energie_finale__in=(
+                CaracteristiquesAnnuelles.CONSOMMATION_ENERGIE_ENTRE_2_75GWH_ET_23_6GWH,
+                CaracteristiquesAnnuelles.CONSOMMATION_ENERGIE_23_6GWH_ET_PLUS,
+            )
+        )
+
     @classmethod
     def calculate_status(
         cls,
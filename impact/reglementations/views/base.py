@@ -3,6 +3,8 @@ from abc import abstractmethod
 from dataclasses import dataclass
 from dataclasses import field
 
+from django.db.models import Q
+
 from entreprises.models import CaracteristiquesAnnuelles
 
 
@@ -32,6 +34,8 @@ class ReglementationStatus:
     prochaine_echeance: str | None = None
     primary_action: ReglementationAction | None = None
     secondary_actions: list[ReglementationAction] = field(default_factory=list)
+    # statut dégradé suite à une erreur d'API, à ne pas conserver dans les statuts précalculés
+    provisoire: bool = False
 
 
 class Reglementation(ABC):
@@ -41,6 +45,8 @@ class Reglementation(ABC):
     summary: str
     tag: str
     zone: str = "france"
+    # le calcul du statut fait appel à des API externes (cf. reglementations.statuts)
+    appels_api: bool = False
 
     @classmethod
     def info(cls):
@@ -68,6 +74,21 @@ class Reglementation(ABC):
         if not cls.est_suffisamment_qualifiee(caracteristiques):
             raise InsuffisammentQualifieeError
 
+    # Formes SQL des critères, sous forme de filtres (Q) sur les CaracteristiquesAnnuelles,
+    # équivalentes aux méthodes est_suffisamment_qualifiee et est_soumis.
+    # Elles permettent de sélectionner en base les entreprises soumises à une réglementation, par exemple :
+    # `CaracteristiquesAnnuelles.objects.filter(BDESEReglementation.filtre_est_soumis())`
+
+    @classmethod
+    @abstractmethod
+    def filtre_est_suffisamment_qualifiee(cls) -> Q:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def filtre_est_soumis(cls) -> Q:
+        return cls.filtre_est_suffisamment_qualifiee()
+
     @classmethod
     @abstractmethod
     def calculate_status(
@@ -83,3 +104,30 @@ class Reglementation(ABC):
                 status_detail="Impossible de connaitre l'état de cette réglementation",
                 primary_action=primary_action,
             )
+
+
+# filtre qui n'est vérifié par aucune ligne
+AUCUNE = Q(pk__in=[])
+
+CATEGORIES_JURIDIQUES_SIRENE = range(1000, 10000)
+
+
+def filtre_categorie_juridique(predicat) -> Q:
+    """forme SQL d'un critère sur la catégorie juridique Sirene de l'entreprise
+
+    predicat : fonction du code de la catégorie juridique Sirene (à 4 chiffres), renvoyant un booléen.
+    Le filtre est construit à partir du prédicat lui-même, par intervalles de codes consécutifs :
+    il ne peut pas diverger de la version Python du critère.
+    """
+    plages = []
+    for code in CATEGORIES_JURIDIQUES_SIRENE:
+        if not predicat(code):
+            continue
+        if plages and plages[-1][1] == code - 1:
+            plages[-1][1] = code
+        else:
+            plages.append([code, code])
+    filtre = AUCUNE
+    for debut, fin in plages:
+        filtre |= Q(entreprise__categorie_juridique_sirene__range=(debut, fin))
+    return filtre
@@ -1,6 +1,7 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.shortcuts import HttpResponse
@@ -19,6 +20,7 @@ from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import Entreprise
 from habilitations.enums import UserRole
 from habilitations.models import Habilitation
+from reglementations.evaluation import memorise
 from reglementations.forms import bdese_configuration_form_factory
 from reglementations.forms import bdese_form_factory
 from reglementations.forms import IntroductionDemoForm
@@ -68,6 +70,7 @@ class BDESEReglementation(Reglementation):
         return caracteristiques.effectif is not None
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.effectif not in (
@@ -78,10 +81,24 @@ class BDESEReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.criteres_remplis(caracteristiques))
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(effectif__isnull=False)
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & ~Q(
+            effectif__in=(
+                CaracteristiquesAnnuelles.EFFECTIF_MOINS_DE_10,
+                CaracteristiquesAnnuelles.EFFECTIF_ENTRE_10_ET_49,
+            )
+        )
+
     @classmethod
     def calculate_status(
         cls,
@@ -1,8 +1,11 @@
 from datetime import date
 
-from api import bges
+from django.db.models import Q
+
 from api.exceptions import APIError
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import memorise
+from reglementations.models import PublicationBGES
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
@@ -14,6 +17,7 @@ class BGESReglementation(Reglementation):
     more_info_url = "https://portail-rse.beta.gouv.fr/fiches-reglementaires/bilan-eges-et-plan-de-transition/"
     tag = "tag-environnement"
     summary = "Mesurer ses émissions de gaz à effet de serre directes et adopter un plan de transition en conséquence."
+    appels_api = True
 
     CONSULTER_BILANS_PRIMARY_ACTION = ReglementationAction(
         "https://bilans-ges.ademe.fr/bilans",
@@ -34,6 +38,7 @@ class BGESReglementation(Reglementation):
         )
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.effectif in (
@@ -51,10 +56,30 @@ class BGESReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.criteres_remplis(caracteristiques))
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(effectif__isnull=False, effectif_outre_mer__isnull=False)
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & (
+            Q(
+                effectif__in=(
+                    CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+                    CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+                    CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+                )
+            )
+            | Q(
+                effectif_outre_mer=CaracteristiquesAnnuelles.EFFECTIF_OUTRE_MER_250_ET_PLUS
+            )
+        )
+
     @classmethod
     def calculate_status(
         cls,
@@ -66,16 +91,11 @@ class BGESReglementation(Reglementation):
         if cls.est_soumis(caracteristiques):
             status_detail = f"Vous êtes soumis à cette réglementation car {', '.join(cls.criteres_remplis(caracteristiques))}."
             try:
-                annee_reporting = bges.last_reporting_year(
+                annee_reporting = PublicationBGES.derniere_annee_reporting(
                     caracteristiques.entreprise.siren
                 )
             except APIError:
-                status = ReglementationStatus.STATUS_SOUMIS
-                primary_action = cls.PUBLIER_BILAN_PRIMARY_ACTION
-                status_detail += " Suite à un problème technique, les informations concernant votre dernière publication n'ont pas pu être récupérées sur la plateforme Bilans GES. Vérifiez que vous avez publié votre bilan il y a moins de 4 ans."
-                return ReglementationStatus(
-                    status, status_detail, primary_action=primary_action
-                )
+                return cls.statut_probleme_technique(caracteristiques)
 
             if not annee_reporting:
                 status = ReglementationStatus.STATUS_A_ACTUALISER
@@ -97,6 +117,15 @@ class BGESReglementation(Reglementation):
             status, status_detail, primary_action=primary_action
         )
 
+    @classmethod
+    def statut_probleme_technique(cls, caracteristiques):
+        return ReglementationStatus(
+            ReglementationStatus.STATUS_SOUMIS,
+            f"Vous êtes soumis à cette réglementation car {', '.join(cls.criteres_remplis(caracteristiques))}. Suite à un problème technique, les informations concernant votre dernière publication n'ont pas pu être récupérées sur la plateforme Bilans GES. Vérifiez que vous avez publié votre bilan il y a moins de 4 ans.",
+            primary_action=cls.PUBLIER_BILAN_PRIMARY_ACTION,
+            provisoire=True,
+        )
+
     @classmethod
     def publication_est_recente(cls, annee_reporting):
         """une entreprise doit publier son bilan GES tous les quatre ans"""
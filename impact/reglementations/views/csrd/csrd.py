@@ -1,5 +1,7 @@
+import operator
 from datetime import datetime
 from datetime import timedelta
+from functools import reduce
 from functools import wraps
 from pathlib import Path
 
@@ -9,7 +11,11 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.exceptions import PermissionDenied
+from django.db.models import Case
+from django.db.models import IntegerField
 from django.db.models import Q
+from django.db.models import Value
+from django.db.models import When
 from django.http import Http404
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
@@ -23,6 +29,7 @@ from openpyxl import Workbook
 from analyseia.forms import AnalyseIAForm
 from analyseia.helpers import synthese_analyse
 from entreprises.models import CaracteristiquesAnnuelles
+from entreprises.models import CODES_PAYS_EEE
 from entreprises.models import Entreprise
 from entreprises.views import get_current_entreprise
 from habilitations.enums import UserRole
@@ -30,8 +37,10 @@ from habilitations.models import Habilitation
 from reglementations.enums import ESRS
 from reglementations.enums import EtapeCSRD
 from reglementations.enums import ETAPES_CSRD
+from reglementations.evaluation import memorise
 from reglementations.forms.csrd import LienRapportCSRDForm
 from reglementations.models import RapportCSRD
+from reglementations.views.base import filtre_categorie_juridique
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
@@ -74,11 +83,135 @@ class CSRDReglementation(Reglementation):
         )
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.est_soumis_a_partir_de_l_exercice(caracteristiques))
 
     @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(
+            date_cloture_exercice__isnull=False,
+            entreprise__est_cotee__isnull=False,
+            entreprise__est_interet_public__isnull=False,
+            effectif_securite_sociale__isnull=False,
+            tranche_bilan__isnull=False,
+            tranche_chiffre_affaires__isnull=False,
+            entreprise__appartient_groupe__isnull=False,
+        ) & (
+            Q(entreprise__appartient_groupe=False)
+            | (
+                Q(entreprise__comptes_consolides__isnull=False)
+                & (
+                    Q(entreprise__comptes_consolides=False)
+                    | Q(
+                        effectif_groupe__isnull=False,
+                        tranche_bilan_consolide__isnull=False,
+                        tranche_chiffre_affaires_consolide__isnull=False,
+                    )
+                )
+            )
+        )
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & reduce(
+            operator.or_,
+            (condition for condition, _ in cls._conditions_premier_exercice()),
+        )
+
+    @classmethod
+    def annotation_est_soumis_a_partir_de_l_exercice(cls):
+        """forme SQL de est_soumis_a_partir_de_l_exercice, à utiliser dans une annotation, par exemple :
+        `CaracteristiquesAnnuelles.objects.alias(premier_exercice=CSRDReglementation.annotation_est_soumis_a_partir_de_l_exercice()).filter(premier_exercice=2026)`
+        """
+        return Case(
+            *(
+                When(condition, then=Value(annee))
+                for condition, annee in cls._conditions_premier_exercice()
+            ),
+            default=None,
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def _conditions_premier_exercice(cls):
+        # couples (condition, année) exclusifs, reprenant une à une les branches de est_soumis_a_partir_de_l_exercice
+        effectifs_groupe_500_et_plus = (
+            CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+            CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+            CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        )
+        est_cotee = Q(entreprise__est_cotee=True)
+        est_interet_public = Q(entreprise__est_interet_public=True)
+        effectif_500_et_plus = Q(
+            effectif_securite_sociale=CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_500_ET_PLUS
+        )
+        grand_groupe = cls.filtre_est_grand_groupe()
+        grande_entreprise = cls.filtre_est_grande_entreprise()
+        petite_ou_moyenne_entreprise = cls.filtre_est_petite_ou_moyenne_entreprise()
+
+        concernee = (
+            filtre_categorie_juridique(
+                lambda code: bool(cls.critere_code_categorie_juridique(code))
+            )
+            | est_interet_public
+        )
+        groupe = concernee & grand_groupe
+        societe_mere = groupe & Q(entreprise__est_societe_mere=True)
+        filiale = groupe & ~Q(entreprise__est_societe_mere=True)
+        filiale_petite_ou_moyenne_cotee = (
+            filiale & ~grande_entreprise & est_cotee & petite_ou_moyenne_entreprise
+        )
+        hors_groupe = concernee & ~grand_groupe
+        dans_EEE = hors_groupe & filtre_dans_EEE()
+        hors_EEE = hors_groupe & ~filtre_dans_EEE()
+        cotee_dans_EEE = dans_EEE & est_cotee
+        interet_public_dans_EEE = dans_EEE & ~est_cotee & est_interet_public
+        return [
+            (
+                societe_mere
+                & (est_cotee | est_interet_public)
+                & Q(effectif_groupe__in=effectifs_groupe_500_et_plus),
+                2024,
+            ),
+            (
+                societe_mere
+                & ~(
+                    (est_cotee | est_interet_public)
+                    & Q(effectif_groupe__in=effectifs_groupe_500_et_plus)
+                ),
+                2027,
+            ),
+            (filiale & grande_entreprise & est_cotee & effectif_500_et_plus, 2024),
+            (filiale & grande_entreprise & ~(est_cotee & effectif_500_et_plus), 2027),
+            (
+                filiale_petite_ou_moyenne_cotee
+                & Q(effectif_groupe__in=effectifs_groupe_500_et_plus),
+                2024,
+            ),
+            (
+                filiale_petite_ou_moyenne_cotee
+                & ~Q(effectif_groupe__in=effectifs_groupe_500_et_plus),
+                2027,
+            ),
+            (cotee_dans_EEE & grande_entreprise & effectif_500_et_plus, 2024),
+            (cotee_dans_EEE & grande_entreprise & ~effectif_500_et_plus, 2027),
+            (cotee_dans_EEE & ~grande_entreprise & petite_ou_moyenne_entreprise, 2028),
+            (interet_public_dans_EEE & grande_entreprise & effectif_500_et_plus, 2024),
+            (interet_public_dans_EEE & grande_entreprise & ~effectif_500_et_plus, 2027),
+            (dans_EEE & ~est_cotee & ~est_interet_public & grande_entreprise, 2027),
+            (hors_EEE & grande_entreprise, 2027),
+            (
+                hors_EEE
+                & ~grande_entreprise
+                & Q(tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_100M_ET_PLUS),
+                2028,
+            ),
+        ]
+
+    @classmethod
+    @memorise
     def est_soumis_a_partir_de_l_exercice(
         cls, caracteristiques: CaracteristiquesAnnuelles
     ) -> int | None:
@@ -156,6 +289,7 @@ class CSRDReglementation(Reglementation):
                     return 2028
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if (
@@ -181,6 +315,7 @@ class CSRDReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def critere_effectif(cls, caracteristiques):
         if (
             caracteristiques.entreprise.est_cotee
@@ -234,6 +369,7 @@ class CSRDReglementation(Reglementation):
                     return "l'effectif du groupe est supérieur à 250 salariés"
 
     @classmethod
+    @memorise
     def critere_bilan(cls, caracteristiques):
         if cls.est_grand_groupe(caracteristiques):
             if caracteristiques.tranche_bilan_consolide in (
@@ -259,6 +395,7 @@ class CSRDReglementation(Reglementation):
                 return "votre bilan est supérieur à 450k€"
 
     @classmethod
+    @memorise
     def critere_CA(cls, caracteristiques):
         if cls.est_grand_groupe(caracteristiques):
             if caracteristiques.tranche_chiffre_affaires_consolide in (
@@ -282,15 +419,23 @@ class CSRDReglementation(Reglementation):
                 return "votre chiffre d'affaires est supérieur à 900k€"
 
     @classmethod
+    @memorise
     def critere_categorie_juridique_sirene(cls, caracteristiques):
+        return cls.critere_code_categorie_juridique(
+            caracteristiques.entreprise.categorie_juridique_sirene
+        )
+
+    @classmethod
+    def critere_code_categorie_juridique(cls, categorie_juridique_sirene):
         return (
-            caracteristiques.entreprise.categorie_juridique_sirene == 3120
-            or 5100 <= caracteristiques.entreprise.categorie_juridique_sirene <= 6199
-            or 6300 <= caracteristiques.entreprise.categorie_juridique_sirene <= 6499
-            or 8100 <= caracteristiques.entreprise.categorie_juridique_sirene <= 8299
+            categorie_juridique_sirene == 3120
+            or 5100 <= categorie_juridique_sirene <= 6199
+            or 6300 <= categorie_juridique_sirene <= 6499
+            or 8100 <= categorie_juridique_sirene <= 8299
         )
 
     @classmethod
+    @memorise
     def est_delegable(cls, caracteristiques):
         if caracteristiques.entreprise.est_societe_mere:
             return False
@@ -403,6 +548,7 @@ class CSRDReglementation(Reglementation):
         return (cloture_exercice_comptable + relativedelta(months=+6)).year
 
     @classmethod
+    @memorise
     def est_microentreprise(cls, caracteristiques: CaracteristiquesAnnuelles):
         nombre_seuils_non_depasses = 0
         if (
@@ -423,6 +569,7 @@ class CSRDReglementation(Reglementation):
         return nombre_seuils_non_depasses >= 2
 
     @classmethod
+    @memorise
     def est_grande_entreprise(cls, caracteristiques: CaracteristiquesAnnuelles) -> bool:
         nombre_seuils_depasses = 0
         if caracteristiques.tranche_bilan in (
@@ -444,6 +591,7 @@ class CSRDReglementation(Reglementation):
         return nombre_seuils_depasses >= 2
 
     @classmethod
+    @memorise
     def est_petite_ou_moyenne_entreprise(
         cls, caracteristiques: CaracteristiquesAnnuelles
     ) -> bool:
@@ -452,6 +600,7 @@ class CSRDReglementation(Reglementation):
         ) and not cls.est_grande_entreprise(caracteristiques)
 
     @classmethod
+    @memorise
     def est_grand_groupe(cls, caracteristiques: CaracteristiquesAnnuelles) -> bool:
         nombre_seuils_depasses = 0
         if caracteristiques.tranche_bilan_consolide in (
@@ -478,6 +627,71 @@ class CSRDReglementation(Reglementation):
         )
 
     @classmethod
+    def filtre_est_microentreprise(cls):
+        return au_moins_deux(
+            Q(tranche_bilan=CaracteristiquesAnnuelles.BILAN_MOINS_DE_450K),
+            Q(tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_MOINS_DE_900K),
+            Q(
+                effectif_securite_sociale=CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_MOINS_DE_10
+            ),
+        )
+
+    @classmethod
+    def filtre_est_grande_entreprise(cls):
+        return au_moins_deux(
+            Q(
+                tranche_bilan__in=(
+                    CaracteristiquesAnnuelles.BILAN_ENTRE_25M_ET_43M,
+                    CaracteristiquesAnnuelles.BILAN_ENTRE_43M_ET_100M,
+                    CaracteristiquesAnnuelles.BILAN_100M_ET_PLUS,
+                )
+            ),
+            Q(
+                tranche_chiffre_affaires__in=(
+                    CaracteristiquesAnnuelles.CA_ENTRE_50M_ET_100M,
+                    CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+                )
+            ),
+            Q(
+                effectif_securite_sociale__in=(
+                    CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_ENTRE_250_ET_499,
+                    CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_500_ET_PLUS,
+                )
+            ),
+        )
+
+    @classmethod
+    def filtre_est_petite_ou_moyenne_entreprise(cls):
+        return ~cls.filtre_est_microentreprise() & ~cls.filtre_est_grande_entreprise()
+
+    @classmethod
+    def filtre_est_grand_groupe(cls):
+        return Q(entreprise__appartient_groupe=True) & au_moins_deux(
+            Q(
+                tranche_bilan_consolide__in=(
+                    CaracteristiquesAnnuelles.BILAN_ENTRE_30M_ET_43M,
+                    CaracteristiquesAnnuelles.BILAN_ENTRE_43M_ET_100M,
+                    CaracteristiquesAnnuelles.BILAN_100M_ET_PLUS,
+                )
+            ),
+            Q(
+                tranche_chiffre_affaires_consolide__in=(
+                    CaracteristiquesAnnuelles.CA_ENTRE_60M_ET_100M,
+                    CaracteristiquesAnnuelles.CA_100M_ET_PLUS,
+                )
+            ),
+            Q(
+                effectif_groupe__in=(
+                    CaracteristiquesAnnuelles.EFFECTIF_ENTRE_250_ET_499,
+                    CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+                    CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+                    CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+                )
+            ),
+        )
+
+    @classmethod
+    @memorise
     def est_micro_ou_petite_entreprise_hors_EEE_consideree_comme_soumise(
         cls, caracteristiques: CaracteristiquesAnnuelles
     ) -> bool:
@@ -500,6 +714,22 @@ class CSRDReglementation(Reglementation):
         )
 
 
+def au_moins_deux(premier_seuil, deuxieme_seuil, troisieme_seuil):
+    return (
+        (premier_seuil & deuxieme_seuil)
+        | (premier_seuil & troisieme_seuil)
+        | (deuxieme_seuil & troisieme_seuil)
+    )
+
+
+def filtre_dans_EEE():
+    return Q(entreprise__code_pays_etranger_sirene__isnull=True) | Q(
+        entreprise__code_pays_etranger_sirene__in=[
+            code for code in CODES_PAYS_EEE if code is not None
+        ]
+    )
+
+
 def rapport_csrd(entreprise, annee):
     """Cherche un RapportCSRD
 
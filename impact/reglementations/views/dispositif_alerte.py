@@ -1,4 +1,7 @@
+from django.db.models import Q
+
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import memorise
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationStatus
 
@@ -19,6 +22,7 @@ class DispositifAlerteReglementation(Reglementation):
         return caracteristiques.effectif_securite_sociale is not None
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.effectif_securite_sociale in (
@@ -30,10 +34,25 @@ class DispositifAlerteReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.criteres_remplis(caracteristiques))
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(effectif_securite_sociale__isnull=False)
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & Q(
+            effectif_securite_sociale__in=(
+                CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_ENTRE_50_ET_249,
+                CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_ENTRE_250_ET_499,
+                CaracteristiquesAnnuelles.EFFECTIF_SECURITE_SOCIALE_500_ET_PLUS,
+            )
+        )
+
     @classmethod
     def calculate_status(
         cls,
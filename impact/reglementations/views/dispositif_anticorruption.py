@@ -1,4 +1,7 @@
+from django.db.models import Q
+
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import memorise
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationStatus
 
@@ -31,6 +34,7 @@ class DispositifAntiCorruption(Reglementation):
         )
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.effectif in (
@@ -67,10 +71,49 @@ class DispositifAntiCorruption(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return len(cls.criteres_remplis(caracteristiques)) == 2
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(
+            effectif__isnull=False,
+            tranche_chiffre_affaires__isnull=False,
+            entreprise__appartient_groupe__isnull=False,
+        ) & (
+            Q(entreprise__appartient_groupe=False)
+            | (
+                Q(
+                    effectif_groupe__isnull=False,
+                    entreprise__comptes_consolides__isnull=False,
+                )
+                & (
+                    Q(entreprise__comptes_consolides=False)
+                    | Q(tranche_chiffre_affaires_consolide__isnull=False)
+                )
+            )
+        )
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        effectifs_500_et_plus = (
+            CaracteristiquesAnnuelles.EFFECTIF_ENTRE_500_ET_4999,
+            CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+            CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+        )
+        critere_effectif = Q(effectif__in=effectifs_500_et_plus) | Q(
+            effectif_groupe__in=effectifs_500_et_plus,
+            entreprise__societe_mere_en_france=True,
+        )
+        critere_chiffre_affaires = Q(
+            tranche_chiffre_affaires=CaracteristiquesAnnuelles.CA_100M_ET_PLUS
+        ) | Q(
+            tranche_chiffre_affaires_consolide=CaracteristiquesAnnuelles.CA_100M_ET_PLUS
+        )
+        return super().filtre_est_soumis() & critere_effectif & critere_chiffre_affaires
+
     @classmethod
     def calculate_status(
         cls,
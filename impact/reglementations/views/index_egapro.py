@@ -1,8 +1,11 @@
-from api import egapro
+from django.db.models import Q
+
 from api.exceptions import APIError
 from entreprises.models import CaracteristiquesAnnuelles
+from reglementations.evaluation import memorise
 from reglementations.models import derniere_annee_a_publier_index_egapro
 from reglementations.models import prochaine_echeance_index_egapro
+from reglementations.models import PublicationIndexEgapro
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationAction
 from reglementations.views.base import ReglementationStatus
@@ -14,18 +17,25 @@ class IndexEgaproReglementation(Reglementation):
     more_info_url = "https://portail-rse.beta.gouv.fr/fiches-reglementaires/index-egalite-professionnelle/"
     tag = "tag-social"
     summary = "Mesurer les écarts de rémunération entre les femmes et les hommes au sein de son entreprise."
+    appels_api = True
 
     NON_SOUMIS_PRIMARY_ACTION = ReglementationAction(
         "https://egapro.travail.gouv.fr/index-egapro/recherche",
         "Consulter les index sur la plateforme nationale",
         external=True,
     )
+    SOUMIS_PRIMARY_ACTION = ReglementationAction(
+        "https://egapro.travail.gouv.fr/",
+        "Publier mon index sur la plateforme nationale",
+        external=True,
+    )
 
     @classmethod
     def est_suffisamment_qualifiee(cls, caracteristiques):
         return caracteristiques.effectif is not None
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if caracteristiques.effectif not in (
@@ -36,10 +46,24 @@ class IndexEgaproReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return bool(cls.criteres_remplis(caracteristiques))
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(effectif__isnull=False)
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        return super().filtre_est_soumis() & ~Q(
+            effectif__in=(
+                CaracteristiquesAnnuelles.EFFECTIF_MOINS_DE_10,
+                CaracteristiquesAnnuelles.EFFECTIF_ENTRE_10_ET_49,
+            )
+        )
+
     @classmethod
     def calculate_status(
         cls,
@@ -55,22 +79,13 @@ class IndexEgaproReglementation(Reglementation):
                 primary_action=cls.NON_SOUMIS_PRIMARY_ACTION,
             )
         else:
-            primary_action = ReglementationAction(
-                "https://egapro.travail.gouv.fr/",
-                "Publier mon index sur la plateforme nationale",
-                external=True,
-            )
             annee = derniere_annee_a_publier_index_egapro()
             try:
-                derniere_annee_est_publiee = egapro.is_index_egapro_published(
+                derniere_annee_est_publiee = PublicationIndexEgapro.est_publie_pour(
                     caracteristiques.entreprise.siren, annee
                 )
             except APIError:
-                return ReglementationStatus(
-                    ReglementationStatus.STATUS_SOUMIS,
-                    f"Vous êtes soumis à cette réglementation car {', '.join(cls.criteres_remplis(caracteristiques))}. Suite à un problème technique, les informations concernant votre dernière publication n'ont pas pu être récupérées sur la plateforme EgaPro. Vous devez calculer et publier votre index chaque année au plus tard le 1er mars.",
-                    primary_action=primary_action,
-                )
+                return cls.statut_probleme_technique(caracteristiques)
             if derniere_annee_est_publiee:
                 status = ReglementationStatus.STATUS_A_JOUR
                 status_detail = f"Vous êtes soumis à cette réglementation car {', '.join(cls.criteres_remplis(caracteristiques))}. Vous avez publié votre index {annee} d'après les données disponibles sur la plateforme Egapro."
@@ -83,5 +98,14 @@ class IndexEgaproReglementation(Reglementation):
                 prochaine_echeance=prochaine_echeance_index_egapro(
                     derniere_annee_est_publiee
                 ).strftime("%d/%m/%Y"),
-                primary_action=primary_action,
+                primary_action=cls.SOUMIS_PRIMARY_ACTION,
             )
+
+    @classmethod
+    def statut_probleme_technique(cls, caracteristiques):
+        return ReglementationStatus(
+            ReglementationStatus.STATUS_SOUMIS,
+            f"Vous êtes soumis à cette réglementation car {', '.join(cls.criteres_remplis(caracteristiques))}. Suite à un problème technique, les informations concernant votre dernière publication n'ont pas pu être récupérées sur la plateforme EgaPro. Vous devez calculer et publier votre index chaque année au plus tard le 1er mars.",
+            primary_action=cls.SOUMIS_PRIMARY_ACTION,
+            provisoire=True,
+        )
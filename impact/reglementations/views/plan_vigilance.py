@@ -1,6 +1,10 @@
+from django.db.models import Q
+
 from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import CategorieJuridique
 from entreprises.models import convertit_categorie_juridique
+from reglementations.evaluation import memorise
+from reglementations.views.base import filtre_categorie_juridique
 from reglementations.views.base import Reglementation
 from reglementations.views.base import ReglementationStatus
 
@@ -31,10 +35,15 @@ class PlanVigilanceReglementation(Reglementation):
         )
 
     @classmethod
+    @memorise
     def critere_categorie_juridique(cls, caracteristiques):
-        categorie_juridique = convertit_categorie_juridique(
+        return cls.critere_code_categorie_juridique(
             caracteristiques.entreprise.categorie_juridique_sirene
         )
+
+    @classmethod
+    def critere_code_categorie_juridique(cls, categorie_juridique_sirene):
+        categorie_juridique = convertit_categorie_juridique(categorie_juridique_sirene)
         if categorie_juridique in (
             CategorieJuridique.SOCIETE_ANONYME,
             CategorieJuridique.SOCIETE_PAR_ACTIONS_SIMPLIFIEES,
@@ -42,12 +51,11 @@ class PlanVigilanceReglementation(Reglementation):
             CategorieJuridique.SOCIETE_EUROPEENNE,
         ):
             return f"votre entreprise est une {categorie_juridique.label}"
-        elif CategorieJuridique.est_une_SA_cooperative(
-            caracteristiques.entreprise.categorie_juridique_sirene
-        ):
+        elif CategorieJuridique.est_une_SA_cooperative(categorie_juridique_sirene):
             return "votre entreprise est une Société Anonyme"
 
     @classmethod
+    @memorise
     def critere_effectif(cls, caracteristiques):
         if caracteristiques.effectif in (
             CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
@@ -71,6 +79,7 @@ class PlanVigilanceReglementation(Reglementation):
                 )
 
     @classmethod
+    @memorise
     def criteres_remplis(cls, caracteristiques):
         criteres = []
         if critere := cls.critere_categorie_juridique(caracteristiques):
@@ -80,10 +89,54 @@ class PlanVigilanceReglementation(Reglementation):
         return criteres
 
     @classmethod
+    @memorise
     def est_soumis(cls, caracteristiques):
         super().est_soumis(caracteristiques)
         return len(cls.criteres_remplis(caracteristiques)) >= 2
 
+    @classmethod
+    def filtre_est_suffisamment_qualifiee(cls):
+        return Q(
+            effectif__isnull=False, entreprise__appartient_groupe__isnull=False
+        ) & (
+            Q(entreprise__appartient_groupe=False)
+            | Q(
+                entreprise__est_societe_mere__isnull=False,
+                entreprise__societe_mere_en_france__isnull=False,
+                effectif_groupe__isnull=False,
+                effectif_groupe_france__isnull=False,
+            )
+        )
+
+    @classmethod
+    def filtre_est_soumis(cls):
+        critere_categorie_juridique = filtre_categorie_juridique(
+            lambda code: bool(cls.critere_code_categorie_juridique(code))
+        )
+        critere_effectif = Q(
+            effectif__in=(
+                CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+                CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+            )
+        ) | (
+            Q(
+                entreprise__est_societe_mere=True,
+                entreprise__societe_mere_en_france=True,
+            )
+            & (
+                Q(
+                    effectif_groupe_france__in=(
+                        CaracteristiquesAnnuelles.EFFECTIF_ENTRE_5000_ET_9999,
+                        CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS,
+                    )
+                )
+                | Q(effectif_groupe=CaracteristiquesAnnuelles.EFFECTIF_10000_ET_PLUS)
+            )
+        )
+        return (
+            super().filtre_est_soumis() & critere_categorie_juridique & critere_effectif
+        )
+
     @classmethod
     def calculate_status(
         cls,
@@ -1,10 +1,12 @@
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
 from sib_api_v3_sdk import ApiClient
 from sib_api_v3_sdk import Configuration
 from sib_api_v3_sdk import ContactsApi
 from sib_api_v3_sdk import RequestContactImport
 
+from entreprises.models import Entreprise
 from users.models import User
 
 
@@ -49,13 +51,21 @@ class Command(BaseCommand):
                     "ENTREPRISES_NON_QUALIFIEES": ", ".join(
                         [
                             entreprise.denomination
-                            for entreprise in user.entreprises
-                            if not entreprise.dernieres_caracteristiques_qualifiantes
+                            for entreprise in user.entreprises_non_qualifiees
                         ]
                     ),
                 },
             }
-            for user in User.objects.all()
+            for user in User.objects.prefetch_related(
+                Prefetch(
+                    "entreprise_set",
+                    # entreprises sans aucune caractéristique annuelle qualifiante
+                    queryset=Entreprise.objects.exclude(
+                        caracteristiquesannuelles__qualifiantes=True
+                    ).order_by("pk"),
+                    to_attr="entreprises_non_qualifiees",
+                )
+            )
         ]
         request_contact_import.list_ids = [list_id]
         request_contact_import.update_existing_contacts = True
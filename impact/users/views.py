@@ -27,7 +27,7 @@ from habilitations.models import HabilitationError
 from habilitations.views import cree_invitation
 from invitations.models import Invitation
 from logs import event_logger as logger
-from reglementations.views import calculer_metriques_entreprise
+from reglementations.views import calculer_metriques_entreprises
 from utils.tokens import check_token
 from utils.tokens import make_token
 from utils.tokens import uidb64
@@ -325,9 +325,12 @@ def tableau_de_bord_conseiller(request):
     )
 
     # Enrichir chaque habilitation avec les metriques
+    metriques_par_entreprise = calculer_metriques_entreprises(
+        habilitation.entreprise for habilitation in habilitations
+    )
     habilitations_enrichies = []
     for habilitation in habilitations:
-        metriques = calculer_metriques_entreprise(habilitation.entreprise)
+        metriques = metriques_par_entreprise[habilitation.entreprise.id]
         habilitations_enrichies.append(
             {
                 "habilitation": habilitation,
@@ -4,26 +4,36 @@ affiche les résultats dans le terminal pour faciliter son usage avec scalingo :
 scalingo --region REGION --app APP run python3 impact/manage.py shell
 """
 
-import time
-
 from django.db.models import Count
 
+from api import limiteur
+from api.infos_entreprise import resolution_par_lot
 from entreprises.models import Entreprise
 from utils.origine_departement import extrait_departement
 from utils.origine_departement import recup_donnees
 
 
+# les appels à l'API Recherche d'Entreprises utilisée par recup_donnees sont régulés par son limiteur de débit partagé
+@limiteur.attente_illimitee()
 def entreprises_du_departement(numero_departement):
     print("siren,code postal,coordonnees,nb indicateurs dernier rapport vsme,email")
+    # On ne récupère que les entreprises inscrites qui ont commencé un rapport VSME
+    entreprises = {
+        entreprise.siren: entreprise
+        for entreprise in Entreprise.objects.filter(
+            users__isnull=False, rapports_vsme__isnull=False
+        ).distinct()
+    }
     compteur = 0
-    for entreprise in Entreprise.objects.filter(
-        users__isnull=False, rapports_vsme__isnull=False
-    ).distinct():
-        # On ne récupère que les entreprises inscrites qui ont commencé un rapport VSME
-        succes, donnees = recup_donnees(entreprise.siren)
+    for siren, resultat, erreur in resolution_par_lot(recup_donnees, entreprises):
+        if erreur:
+            print(f"ERREUR {erreur} {siren}")
+            continue
+        succes, donnees = resultat
         if succes:
             code_postal = donnees["code_postal"]
             if extrait_departement(code_postal) == str(numero_departement):
+                entreprise = entreprises[siren]
                 dernier_rapport = (
                     entreprise.rapports_vsme.annotate(
                         nb_indicateurs=Count("indicateurs"),
@@ -40,6 +50,3 @@ def entreprises_du_departement(numero_departement):
         compteur += 1
         if compteur % 100 == 0:
             print(f"{compteur} ENTREPRISES RECHERCHEES")
-        time.sleep(
-            0.15
-        )  # Limite de 7 appels/seconde à l'API Recherche d'Entreprises utilisée par recup_donnees
@@ -2,6 +2,11 @@
 Utilitaires divers pour HTMX
 """
 
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
 from django.http import HttpResponse
 from django.http.response import HttpResponseRedirectBase
 from django.utils.http import urlencode
@@ -18,6 +23,40 @@ def retarget_params(request, new_target) -> str:
         return urlencode({"_hx_retarget": new_target})
 
 
+def _horodatage_arrivee(request):
+    # horodatage d'arrivée de la requête ajouté par nginx (`t=<secondes.millisecondes>`),
+    # à défaut celui du début de son traitement
+    try:
+        return float(request.headers.get("X-Request-Start", "").removeprefix("t="))
+    except ValueError:
+        return time.time()
+
+
+def _identifiant_client(request):
+    # la session n'existe pas forcément pour un visiteur anonyme
+    # mais le cookie CSRF est posé dès l'affichage d'un formulaire
+    identifiant = request.session.session_key or request.COOKIES.get(
+        settings.CSRF_COOKIE_NAME
+    )
+    if identifiant:
+        return hashlib.sha256(identifiant.encode()).hexdigest()
+
+
+def requete_depassee(request, nom, duree=60):
+    # Indique si une requête plus récente du même client est déjà arrivée pour la même interaction `nom`
+    # (par ex. une nouvelle frappe dans un champ de recherche), auquel cas le résultat de celle-ci ne sera pas affiché.
+    # Les requêtes dépassées en attente d'un worker ou dont le traitement a été long peuvent ainsi être abandonnées.
+    if (client := _identifiant_client(request)) is None:
+        return False
+    cle = f"htmx:{nom}:{client}"
+    arrivee = _horodatage_arrivee(request)
+    derniere_arrivee = caches["partage"].get(cle)
+    if derniere_arrivee is not None and derniere_arrivee > arrivee:
+        return True
+    caches["partage"].set(cle, arrivee, duree)
+    return False
+
+
 class HttpResponseRedirectSeeOther(HttpResponseRedirectBase):
     # Assez surpris de voir tous les autres redirects implémentés en Django
     # mais pas celui-ci.
@@ -28,6 +67,7 @@ class HttpResponseRedirectSeeOther(HttpResponseRedirectBase):
     # C'est par exemple très utile avec HTMX pour utiliser autre chose que des GET et des POST.
     status_code = 303
 
+
 class HttpResponseHXRedirect(HttpResponse):
     # Ajoute un entête `HX-Redirect` à la réponse permettant de déclencher une redirection.
     # L'url cible est récupérée via l'argument redirect_to
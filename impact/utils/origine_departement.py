@@ -3,9 +3,8 @@
 suppose qu'une extraction des entreprises soit fournie (entreprises.csv) contenant un siren par ligne, par exemple depuis metabase
 """
 
-import time
-
-import requests
+from api import limiteur
+from api import transport
 
 RECHERCHE_ENTREPRISE_TIMEOUT = 10
 
@@ -118,6 +117,8 @@ DEPARTEMENTS = {
 }
 
 
+# les appels sont régulés par le limiteur de débit partagé de l'API recherche entreprises (7 appels/seconde)
+@limiteur.attente_illimitee()
 def run():
     compteur = 0
     compteur_succes = 0
@@ -145,14 +146,13 @@ def run():
                 print(
                     f"{compteur} ENTREPRISES RECHERCHEES, {compteur_succes} SUCCES, {compteur_echec} ECHECS"
                 )
-            time.sleep(0.15)
     print(f"NB SUCCES = {compteur_succes}")
     print(f"NB ECHECS = {compteur_echec}")
 
 
 def recup_donnees(siren):
     url = f"https://recherche-entreprises.api.gouv.fr/search?q={siren}&page=1&per_page=1&mtm_campaign=portail-rse"
-    response = requests.get(url, timeout=RECHERCHE_ENTREPRISE_TIMEOUT)
+    response = transport.get(url, timeout=RECHERCHE_ENTREPRISE_TIMEOUT)
     if response.status_code == 200 and response.json()["total_results"]:
         data = response.json()["results"][0]
         try:
@@ -1,22 +1,41 @@
+from entreprises.models import CaracteristiquesAnnuelles
 from entreprises.models import Entreprise
+from reglementations.assujettissement import matrice_assujettissement
 from reglementations.views.base import ReglementationStatus
 from reglementations.views.index_egapro import IndexEgaproReglementation
 
 
 def entreprises_avec_index_egapro_en_retard():
-    for entreprise in Entreprise.objects.all():
-        caracteristiques = (
-            entreprise.dernieres_caracteristiques_qualifiantes
-            or entreprise.dernieres_caracteristiques
-        )
-        if (
-            entreprise.users.all()
-            and caracteristiques
-            and IndexEgaproReglementation().est_suffisamment_qualifiee(caracteristiques)
-        ):
+    entreprises = Entreprise.objects.filter(users__isnull=False).distinct()
+    caracteristiques_par_entreprise = _caracteristiques_par_entreprise(entreprises)
+    # seules les entreprises soumises à l'index EgaPro nécessitent un calcul de statut (appel à l'API EgaPro)
+    matrice = matrice_assujettissement(
+        caracteristiques_par_entreprise.values(), [IndexEgaproReglementation]
+    )
+    for entreprise in entreprises.prefetch_related("users"):
+        caracteristiques = caracteristiques_par_entreprise.get(entreprise.id)
+        if caracteristiques and matrice[entreprise.id][IndexEgaproReglementation.id]:
             statut = IndexEgaproReglementation().calculate_status(caracteristiques)
             if statut.status == ReglementationStatus.STATUS_A_ACTUALISER:
                 for utilisateur in entreprise.users.all():
                     print(
                         (entreprise.siren, entreprise.denomination, utilisateur.email)
                     )
+
+
+def _caracteristiques_par_entreprise(entreprises):
+    # dernières caractéristiques qualifiantes, à défaut dernières caractéristiques de chaque entreprise
+    dernieres = {}
+    qualifiantes = {}
+    for caracteristiques in (
+        CaracteristiquesAnnuelles.objects.filter(entreprise__in=entreprises)
+        .select_related("entreprise")
+        .order_by("entreprise_id", "-annee")
+    ):
+        dernieres.setdefault(caracteristiques.entreprise_id, caracteristiques)
+        if (
+            caracteristiques.pk
+            == caracteristiques.entreprise.caracteristiques_qualifiantes_id
+        ):
+            qualifiantes.setdefault(caracteristiques.entreprise_id, caracteristiques)
+    return dernieres | qualifiantes
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from django.urls.base import reverse
+
+# Applicabilité des indicateurs d'un rapport VSME.
+#
+# L'applicabilité d'un indicateur dépend des réponses à d'autres indicateurs du rapport
+# (choix du module, type de périmètre, forme juridique, nombre de salariés...).
+# Chaque règle déclare les indicateurs auxquels elle s'applique et ceux dont elle dépend (graphe de dépendances) :
+# les règles sont évaluées sur un instantané des indicateurs du rapport chargé en une seule requête
+# (cf. RapportVSME.instantane_indicateurs), chaque règle au plus une fois par calcul.
+
+
+@dataclass(frozen=True)
+class RegleApplicabilite:
+    concerne: Callable[[str], bool]  # indicateurs soumis à la règle
+    dependances: tuple[str, ...]  # indicateurs lus par la règle
+    # explication de la non applicabilité, None si la règle ne s'oppose pas à l'applicabilité
+    explication_non_applicable: Callable[["RapportVSME", dict], str | None]
+
+
+def _motif(*parties):
+    """indicateurs dont l'identifiant correspond aux parties données, "_" pour une partie quelconque"""
+
+    def concerne(schema_id):
+        morceaux = schema_id.split("-")
+        return len(morceaux) == len(parties) and all(
+            partie in ("_", morceau) for partie, morceau in zip(parties, morceaux)
+        )
+
+    return concerne
+
+
+def _lien_exigence(rapport_vsme, code):
+    return reverse("vsme:exigence_de_publication_vsme", args=[rapport_vsme.id, code])
+
+
+def _indicateurs_module_complet(rapport_vsme, instantane):
+    choix_module = rapport_vsme.choix_module or rapport_vsme.CHOIX_MODULE_PAR_DEFAUT
+    if choix_module != rapport_vsme.CHOIX_MODULE_COMPLET:
+        B1_url = _lien_exigence(rapport_vsme, "B1")
+        return f"l'entreprise a sélectionné uniquement le module de base dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Base d'établissement » de B1</a>"
+
+
+def _liste_filiales(rapport_vsme, instantane):
+    indicateur_type_de_perimetre = instantane.get("B1-24-c")
+    base_consolidee = bool(
+        indicateur_type_de_perimetre
+        and indicateur_type_de_perimetre.data.get("type_perimetre") == "consolidee"
+    )
+    if not base_consolidee:
+        B1_url = _lien_exigence(rapport_vsme, "B1")
+        return f"l'entreprise n'a pas sélectionné une base consolidée dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Type de périmètre » de B1</a>"
+
+
+def _indicateurs_cooperatives(rapport_vsme, instantane):
+    if indicateur_forme_juridique := instantane.get("B1-24-e-i"):
+        forme_juridique = indicateur_forme_juridique.data
+        est_cooperative = forme_juridique.get("coopérative") or forme_juridique.get(
+            "forme_juridique"
+        ) in ("51", "63")
+    else:
+        est_cooperative = False
+    if not est_cooperative:
+        B1_url = _lien_exigence(rapport_vsme, "B1")
+        return f"la forme juridique renseignée par l'entreprise dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Forme juridique » de B1</a> n'est pas une coopérative"
+
+
+def _effectifs_par_pays(rapport_vsme, instantane):
+    plusieurs_pays_d_exercice = len(rapport_vsme.pays) > 1
+    if not plusieurs_pays_d_exercice:
+        B1_url = _lien_exigence(rapport_vsme, "B1")
+        return f"l'entreprise n'a pas renseigné plusieurs pays d'exercice dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Pays d'exercice » de B1</a>"
+
+
+def _cibles_reduction_emissions_GES_scope_3(rapport_vsme, instantane):
+    indicateur_emissions_GES_scope_3 = instantane.get("B3-30-p2")
+    publie_emissions_GES_scope_3 = bool(
+        indicateur_emissions_GES_scope_3
+        and not indicateur_emissions_GES_scope_3.est_non_pertinent
+    )
+    # si les émissions du scope 3 ne sont pas publiées, l'indicateur reste applicable
+    if publie_emissions_GES_scope_3:
+        indicateur_cibles_reduction_scopes_1_2 = instantane.get("C3-54-p1")
+        if (
+            indicateur_cibles_reduction_scopes_1_2
+            and indicateur_cibles_reduction_scopes_1_2.est_non_pertinent
+        ):
+            C3_url = _lien_exigence(rapport_vsme, "C3")
+            return f"l'entreprise n'a pas fixé de cibles de réduction des émissions de GES dans <a class='fr-link' href='{C3_url}' target='_blank' rel='noopener external'>l'indicateur « Cibles de réduction des émissions de GES des scopes 1 et 2 » de C3</a>"
+
+
+def _description_pratiques_durabilite(rapport_vsme, instantane):
+    indicateur_declaration_durabilite = instantane.get("B2-26")
+    if (
+        not indicateur_declaration_durabilite
+        or indicateur_declaration_durabilite.est_non_pertinent
+    ):
+        au_moins_une_pratique_declaree = False
+    else:
+        declaration_durabilite = indicateur_declaration_durabilite.data.get(
+            "declaration_durabilite", {}
+        )
+        au_moins_une_pratique_declaree = any(
+            bool(declaration_durabilite[thematique].get("pratiques"))
+            for thematique in declaration_durabilite
+        )
+    if not au_moins_une_pratique_declaree:
+        B2_url = _lien_exigence(rapport_vsme, "B2")
+        return f"l'entreprise n'a pas déclaré de pratiques, politiques ou initiatives futures en matière de durabilité dans <a class='fr-link' href='{B2_url}' target='_blank' rel='noopener external'>l'indicateur « Déclaration des pratiques et politiques de durabilité » de B2</a>"
+
+
+def _indicateurs_supplementaires_effectifs(rapport_vsme, instantane):
+    nombre_salaries = rapport_vsme.nombre_salaries
+    if nombre_salaries is not None and nombre_salaries < 50:
+        B1_url = _lien_exigence(rapport_vsme, "B1")
+        return f"le nombre de salariés renseigné dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Nombre de salariés » de B1</a> est inférieur à 50"
+
+
+def _impacts_financiers_risques_climatiques(rapport_vsme, instantane):
+    if not rapport_vsme.risques_climatiques:
+        C4_url = _lien_exigence(rapport_vsme, "C4")
+        return f"l'entreprise n'a pas renseigné de risque climatique dans <a class='fr-link' href='{C4_url}' target='_blank' rel='noopener external'>l'indicateur « Aléas et risques climatiques recensés » de C4</a>"
+
+
+# dans l'ordre d'évaluation : la première règle qui s'oppose à l'applicabilité donne l'explication
+REGLES_APPLICABILITE = (
+    RegleApplicabilite(
+        concerne=lambda schema_id: schema_id.startswith("C"),
+        dependances=("B1-24-a",),
+        explication_non_applicable=_indicateurs_module_complet,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("B1", "24", "d"),
+        dependances=("B1-24-c",),
+        explication_non_applicable=_liste_filiales,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("B2", "26", "_"),
+        dependances=("B1-24-e-i",),
+        explication_non_applicable=_indicateurs_cooperatives,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("B8", "39", "c"),
+        dependances=("B1-24-e-vi",),
+        explication_non_applicable=_effectifs_par_pays,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("C3", "54", "p2"),
+        dependances=("B3-30-p2", "C3-54-p1"),
+        explication_non_applicable=_cibles_reduction_emissions_GES_scope_3,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("C2", "48"),
+        dependances=("B2-26",),
+        explication_non_applicable=_description_pratiques_durabilite,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("C5", "_"),
+        dependances=("B1-24-e-v",),
+        explication_non_applicable=_indicateurs_supplementaires_effectifs,
+    ),
+    RegleApplicabilite(
+        concerne=_motif("C4", "58"),
+        dependances=("C4-57",),
+        explication_non_applicable=_impacts_financiers_risques_climatiques,
+    ),
+)
+
+# indicateurs dont la modification peut changer l'applicabilité d'autres indicateurs
+INDICATEURS_DETERMINANT_APPLICABILITE = frozenset(
+    schema_id for regle in REGLES_APPLICABILITE for schema_id in regle.dependances
+)
+
+
+def applicabilite(rapport_vsme, schema_ids):
+    """renvoie {schema_id: (est_applicable, explication_non_applicable)} en un seul passage
+
+    Chaque règle est évaluée au plus une fois, sur l'instantané des indicateurs du rapport.
+    """
+    instantane = rapport_vsme.instantane_indicateurs
+    explications = {}
+    resultats = {}
+    for schema_id in schema_ids:
+        resultats[schema_id] = (True, "")
+        for regle in REGLES_APPLICABILITE:
+            if not regle.concerne(schema_id):
+                continue
+            if regle not in explications:
+                explications[regle] = regle.explication_non_applicable(
+                    rapport_vsme, instantane
+                )
+            if explication := explications[regle]:
+                resultats[schema_id] = (False, explication)
+                break
+    return resultats
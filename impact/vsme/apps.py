@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class VSMEConfig(AppConfig):
     name = "vsme"
+
+    def ready(self):
+        import vsme.signals  # noqa
+        from vsme.models import registre_schemas
+
+        # chargement et validation des schémas des indicateurs au démarrage
+        registre_schemas()
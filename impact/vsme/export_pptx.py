@@ -13,15 +13,15 @@ from utils.pptx import remove_shape
 from utils.pptx import remove_slide
 from vsme.export_xlsx import formate_valeur as formate_valeur_xlsx
 from vsme.forms import THEMATIQUES_DURABILITE
-from vsme.models import ExigenceDePublication
 from vsme.models import EXIGENCES_DE_PUBLICATION
+from vsme.models import registre_schemas
 from vsme.models import schema_existe
 
 
 def export_rapport_vsme(rapport_vsme, presentation):
     indicateurs = [
         indicateur
-        for indicateur in rapport_vsme.indicateurs.all()
+        for indicateur in rapport_vsme.instantane_indicateurs.values()
         if schema_existe(indicateur.schema_id)
     ]
     export_couverture(rapport_vsme, presentation)
@@ -105,17 +105,10 @@ def selectionne_diapos_non_pertinents(indicateurs):
 def selectionne_diapos_non_applicables(rapport_vsme):
     diapos_a_supprimer = set()
 
-    tous_les_indicateur_schema_ids = [
-        schema_id
-        for exigence in EXIGENCES_DE_PUBLICATION.values()
-        for schema_id in exigence.indicateur_schema_ids()
-    ]
-
-    for indicateur_schema_id in tous_les_indicateur_schema_ids:
-        schema_exigence = ExigenceDePublication.par_indicateur_schema_id(
-            indicateur_schema_id
-        ).load_json_schema()
-        schema_indicateur = schema_exigence[indicateur_schema_id]
+    for (
+        indicateur_schema_id,
+        schema_indicateur,
+    ) in registre_schemas().par_indicateur.items():
         if rapport_vsme.indicateur_est_applicable(indicateur_schema_id)[0]:
             # supprimer les diapos non applicables (uniquement diapo_non_applicable)
             for champ in schema_indicateur["champs"]:
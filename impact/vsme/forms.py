@@ -3,7 +3,6 @@ from json.decoder import JSONDecodeError
 
 import geojson
 from django import forms
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.exceptions import ValidationError
 from django.urls.base import reverse
 from django.utils.html import format_html
@@ -536,15 +535,13 @@ def calculate_choices(choix, rapport_vsme):
             ]
         case "CHOIX_SITES":
             indicateur_sites = "B1-24-e-vii"
-            try:
-                sites = rapport_vsme.indicateurs.get(
-                    schema_id=indicateur_sites
-                ).data.get("sites", [])
+            if indicateur := rapport_vsme.instantane_indicateurs.get(indicateur_sites):
+                sites = indicateur.data.get("sites", [])
                 choices = (
                     (site["id_site"], f"{site["id_site"]} - {site["nom_site"]}")
                     for site in sites
                 )
-            except ObjectDoesNotExist:
+            else:
                 choices = ()
         case _:
             choices = ((choice["id"], choice["label"]) for choice in choix)
@@ -583,10 +580,10 @@ def calculate_formset_extra_validators(field_id, rapport_vsme):
             thematiques_avec_pratiques = []
             thematiques_avec_cibles = []
             indicateur_declaration_durabilite = "B2-26"
-            try:
-                declaration_durabilite = rapport_vsme.indicateurs.get(
-                    schema_id=indicateur_declaration_durabilite
-                ).data.get("declaration_durabilite")
+            if indicateur := rapport_vsme.instantane_indicateurs.get(
+                indicateur_declaration_durabilite
+            ):
+                declaration_durabilite = indicateur.data.get("declaration_durabilite")
                 if declaration_durabilite:
                     for thematique, data in declaration_durabilite.items():
                         if data.get("pratiques"):
@@ -600,8 +597,6 @@ def calculate_formset_extra_validators(field_id, rapport_vsme):
                             thematiques_avec_cibles,
                         )
                     ]
-            except ObjectDoesNotExist:
-                pass
     return []
 
 
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.db.models import Q
+
+from vsme.models import EXIGENCES_DE_PUBLICATION
+from vsme.models import RapportVSME
+from vsme.models import version_progression
+
+
+class Command(BaseCommand):
+    help = "Enregistre les compteurs de progression des rapports VSME absents ou calculés avec d'autres schémas des indicateurs ou règles d'applicabilité (à lancer après leur modification)"
+
+    def handle(self, *args, **options):
+        nombre_rapports = 0
+        rapports_a_actualiser = (
+            RapportVSME.objects.annotate(
+                nombre_compteurs_a_jour=Count(
+                    "progressions",
+                    filter=Q(progressions__version=version_progression()),
+                )
+            )
+            .filter(nombre_compteurs_a_jour__lt=len(EXIGENCES_DE_PUBLICATION))
+            .prefetch_related("indicateurs")
+        )
+        for rapport_vsme in rapports_a_actualiser:
+            rapport_vsme.actualise_progression()
+            nombre_rapports += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"{nombre_rapports} rapports VSME actualisés")
+        )
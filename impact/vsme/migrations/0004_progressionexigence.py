@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:05
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vsme", "0003_rename_data_indicateur__data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProgressionExigence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "exigence_de_publication",
+                    models.CharField(
+                        max_length=3, verbose_name="code de l'exigence de publication"
+                    ),
+                ),
+                (
+                    "complet",
+                    models.PositiveIntegerField(
+                        default=0,
+                        verbose_name="nombre d'indicateurs applicables complétés",
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="nombre d'indicateurs applicables"
+                    ),
+                ),
+                (
+                    "rapport_vsme",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="progressions",
+                        to="vsme.rapportvsme",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("rapport_vsme", "exigence_de_publication"),
+                        name="unique_progression_par_exigence",
+                    )
+                ],
+            },
+        ),
+    ]
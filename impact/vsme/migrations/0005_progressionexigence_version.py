@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vsme", "0004_progressionexigence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="progressionexigence",
+            name="version",
+            field=models.CharField(
+                default="",
+                max_length=16,
+                verbose_name="version des schémas et des règles d'applicabilité",
+            ),
+        ),
+    ]
@@ -1,20 +1,24 @@
 import copy
+import hashlib
 import json
 import os
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 from enum import Enum
+from functools import cache
+from types import MappingProxyType
 
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.urls.base import reverse
+from django.db import transaction
 from django.utils.functional import cached_property
 
 from utils.combustibles import COMBUSTIBLES
 from utils.models import TimestampedModel
+from vsme.applicabilite import applicabilite
 from vsme.forms import NON_PERTINENT_FIELD_NAME
 
 ANNEE_DEBUT_VSME = 2020  # Première année où les rapports VSME peuvent être créés
@@ -52,10 +56,7 @@ def schema_existe(schema_id):
     """Un schéma peut disparaitre.
 
     Dans ce cas, les données enregistrées ne correspondent plus à rien."""
-    for exigence in EXIGENCES_DE_PUBLICATION.values():
-        if schema_id in exigence.indicateur_schema_ids():
-            return True
-    return False
+    return schema_id in registre_schemas().par_indicateur
 
 
 class Categorie(Enum):
@@ -77,6 +78,9 @@ class Categorie(Enum):
             if exigence.categorie == self
         ]
 
+    def indicateur_schema_ids(self):
+        return registre_schemas().ids_par_categorie[self]
+
 
 @dataclass
 class ExigenceDePublication:
@@ -86,12 +90,8 @@ class ExigenceDePublication:
     url_infos: str = ""
 
     def load_json_schema(self):
-        # Get the directory of the current file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = f"schemas/{self.code}.json"
-        full_path = os.path.join(current_dir, file_path)
-        with open(full_path, "r") as file:
-            return json.load(file)
+        # schéma en lecture seule, chargé une seule fois (cf. registre_schemas)
+        return registre_schemas().par_exigence[self.code]
 
     @classmethod
     def par_code(cls, exigence_de_publication_code):
@@ -103,8 +103,12 @@ class ExigenceDePublication:
         return cls.par_code(code)
 
     def indicateur_schema_ids(self):
+        # dans l'ordre du schéma
         return self.load_json_schema().keys()
 
+    def ensemble_indicateur_schema_ids(self):
+        return registre_schemas().ids_par_exigence[self.code]
+
 
 EXIGENCES_DE_PUBLICATION = {
     "B1": ExigenceDePublication(
@@ -230,6 +234,131 @@ EXIGENCES_DE_PUBLICATION = {
 }
 
 
+# Registre des schémas des indicateurs VSME
+#
+# Les schémas (vsme/schemas/<code exigence>.json) sont lus et validés une seule fois par processus,
+# au démarrage de l'application (cf. VSMEConfig.ready), puis partagés en lecture seule :
+# les dictionnaires et listes des schémas sont figés et toute modification lève une TypeError.
+# Les données décodées des indicateurs, partagées entre les lectures (cf. Indicateur.data), le sont aussi.
+
+
+def _lecture_seule(self, *args, **kwargs):
+    raise TypeError("les schémas et données VSME sont en lecture seule")
+
+
+class DictFige(dict):
+    __setitem__ = __delitem__ = __ior__ = _lecture_seule
+    clear = pop = popitem = setdefault = update = _lecture_seule
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (DictFige, (dict(self),))
+
+
+class ListeFigee(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _lecture_seule
+    append = extend = insert = pop = remove = clear = sort = reverse = _lecture_seule
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (ListeFigee, (list(self),))
+
+
+def fige(valeur):
+    match valeur:
+        case dict():
+            return DictFige({cle: fige(v) for cle, v in valeur.items()})
+        case list():
+            return ListeFigee(fige(v) for v in valeur)
+        case _:
+            return valeur
+
+
+@dataclass(frozen=True)
+class RegistreSchemas:
+    par_exigence: (
+        MappingProxyType  # code exigence -> {schema_id: schéma de l'indicateur}
+    )
+    par_indicateur: MappingProxyType  # schema_id -> schéma de l'indicateur
+    ids_par_exigence: MappingProxyType  # code exigence -> frozenset des schema_id
+    ids_par_categorie: MappingProxyType  # Categorie -> frozenset des schema_id
+
+
+def _charge_schema(code):
+    chemin = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "schemas", f"{code}.json"
+    )
+    with open(chemin, "r") as fichier:
+        schema = json.load(fichier)
+    for schema_id, schema_indicateur in schema.items():
+        if not schema_id.startswith(f"{code}-"):
+            raise ImproperlyConfigured(
+                f"Schéma VSME {code} : l'indicateur {schema_id} n'appartient pas à l'exigence"
+            )
+        if "titre" not in schema_indicateur or "champs" not in schema_indicateur:
+            raise ImproperlyConfigured(
+                f"Schéma VSME {code} : titre ou champs absent de l'indicateur {schema_id}"
+            )
+        for champ in schema_indicateur["champs"]:
+            if "id" not in champ or "type" not in champ:
+                raise ImproperlyConfigured(
+                    f"Schéma VSME {code} : id ou type absent d'un champ de l'indicateur {schema_id}"
+                )
+    return fige(schema)
+
+
+@cache
+def version_progression():
+    """empreinte des schémas et des règles d'applicabilité, dont dépendent les compteurs de progression"""
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    chemins = [
+        os.path.join(dossier, "schemas", f"{code}.json")
+        for code in EXIGENCES_DE_PUBLICATION
+    ] + [os.path.join(dossier, "applicabilite.py")]
+    empreinte = hashlib.sha256()
+    for chemin in chemins:
+        with open(chemin, "rb") as fichier:
+            empreinte.update(fichier.read())
+    return empreinte.hexdigest()[:16]
+
+
+@cache
+def registre_schemas():
+    par_exigence = {code: _charge_schema(code) for code in EXIGENCES_DE_PUBLICATION}
+    ids_par_categorie = {categorie: set() for categorie in Categorie}
+    for code, exigence in EXIGENCES_DE_PUBLICATION.items():
+        ids_par_categorie[exigence.categorie].update(par_exigence[code])
+    return RegistreSchemas(
+        par_exigence=MappingProxyType(par_exigence),
+        par_indicateur=MappingProxyType(
+            {
+                schema_id: schema_indicateur
+                for schema in par_exigence.values()
+                for schema_id, schema_indicateur in schema.items()
+            }
+        ),
+        ids_par_exigence=MappingProxyType(
+            {code: frozenset(schema) for code, schema in par_exigence.items()}
+        ),
+        ids_par_categorie=MappingProxyType(
+            {
+                categorie: frozenset(schema_ids)
+                for categorie, schema_ids in ids_par_categorie.items()
+            }
+        ),
+    )
+
+
 class RapportVSME(TimestampedModel):
     CHOIX_MODULE_BASE = "base"
     CHOIX_MODULE_COMPLET = "complet"
@@ -260,173 +389,54 @@ class RapportVSME(TimestampedModel):
     def exercice(self):
         return self.entreprise.exercice_par_annee_cloture(self.annee)
 
+    @cached_property
+    def instantane_indicateurs(self):
+        """indicateurs du rapport chargés en une seule requête : {schema_id: indicateur}"""
+        return {
+            indicateur.schema_id: indicateur for indicateur in self.indicateurs.all()
+        }
+
     def indicateurs_applicables_par_exigence(self, exigence_de_publication):
-        exigence_de_publication_schema = exigence_de_publication.load_json_schema()
-        indicateurs_applicables = [
-            ind
-            for ind in exigence_de_publication_schema
-            if self.indicateur_est_applicable(ind)[0]
+        applicabilite_exigence = applicabilite(
+            self, exigence_de_publication.indicateur_schema_ids()
+        )
+        return [
+            schema_id
+            for schema_id, (est_applicable, _) in applicabilite_exigence.items()
+            if est_applicable
         ]
-        return indicateurs_applicables
 
     @cached_property
     def indicateurs_applicables(self):
-        indicateurs_applicables = []
-        for exigence_de_publication in self.exigences_de_publication_applicables():
-            for indicateur_schema_id in exigence_de_publication.indicateur_schema_ids():
-                if self.indicateur_est_applicable(indicateur_schema_id)[0]:
-                    indicateurs_applicables.append(indicateur_schema_id)
-        return indicateurs_applicables
+        return [
+            schema_id
+            for schema_id, (est_applicable, _) in applicabilite(
+                self,
+                (
+                    schema_id
+                    for exigence_de_publication in self.exigences_de_publication_applicables()
+                    for schema_id in exigence_de_publication.indicateur_schema_ids()
+                ),
+            ).items()
+            if est_applicable
+        ]
 
     def indicateur_est_applicable(self, indicateur_schema_id) -> tuple[bool, str]:
-        if indicateur_schema_id.startswith("C"):  # indicateurs module complet
-            choix_module = self.choix_module or self.CHOIX_MODULE_PAR_DEFAUT
-            if choix_module != self.CHOIX_MODULE_COMPLET:
-                B1_url = reverse(
-                    "vsme:exigence_de_publication_vsme", args=[self.id, "B1"]
-                )
-                explication_non_applicable = f"l'entreprise a sélectionné uniquement le module de base dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Base d'établissement » de B1</a>"
-                return (False, explication_non_applicable)
-        match indicateur_schema_id.split("-"):
-            case ["B1", "24", "d"]:  # indicateur liste filiales
-                indicateur_type_de_perimetre = "B1-24-c"
-                try:
-                    base_consolidee = (
-                        self.indicateurs.get(
-                            schema_id=indicateur_type_de_perimetre
-                        ).data.get("type_perimetre")
-                        == "consolidee"
-                    )
-                except ObjectDoesNotExist:
-                    base_consolidee = False
-                if not base_consolidee:
-                    B1_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B1"]
-                    )
-                    explication_non_applicable = f"l'entreprise n'a pas sélectionné une base consolidée dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Type de périmètre » de B1</a>"
-                    return (False, explication_non_applicable)
-            case ["B2", "26", p]:  # indicateurs spécifiques aux coopératives
-                indicateur_forme_juridique = "B1-24-e-i"
-                try:
-                    forme_juridique = self.indicateurs.get(
-                        schema_id=indicateur_forme_juridique
-                    ).data
-                    est_cooperative = forme_juridique.get(
-                        "coopérative"
-                    ) or forme_juridique.get("forme_juridique") in ("51", "63")
-                except ObjectDoesNotExist:
-                    est_cooperative = False
-                if not est_cooperative:
-                    B1_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B1"]
-                    )
-                    explication_non_applicable = f"la forme juridique renseignée par l'entreprise dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Forme juridique » de B1</a> n'est pas une coopérative"
-                    return (False, explication_non_applicable)
-            case ["B8", "39", "c"]:  # indicateur effectifs par pays
-                plusieurs_pays_d_exercice = len(self.pays) > 1
-                if not plusieurs_pays_d_exercice:
-                    B1_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B1"]
-                    )
-                    explication_non_applicable = f"l'entreprise n'a pas renseigné plusieurs pays d'exercice dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Pays d'exercice » de B1</a>"
-                    return (False, explication_non_applicable)
-            case [
-                "C3",
-                "54",
-                "p2",
-            ]:  # indicateur cibles de réduction des émissions de GES scope 3
-                try:
-                    indicateur_emissions_GES_scope_3 = self.indicateurs.get(
-                        schema_id="B3-30-p2"
-                    )
-                    publie_emissions_GES_scope_3 = (
-                        not indicateur_emissions_GES_scope_3.est_non_pertinent
-                    )
-                except ObjectDoesNotExist:
-                    publie_emissions_GES_scope_3 = False
-                if publie_emissions_GES_scope_3:
-                    try:
-                        indicateur_cibles_reduction_scopes_1_2 = self.indicateurs.get(
-                            schema_id="C3-54-p1"
-                        )
-                        pas_de_cibles = (
-                            indicateur_cibles_reduction_scopes_1_2.est_non_pertinent
-                        )
-                        if pas_de_cibles:
-                            C3_url = reverse(
-                                "vsme:exigence_de_publication_vsme",
-                                args=[self.id, "C3"],
-                            )
-                            explication_non_applicable = f"l'entreprise n'a pas fixé de cibles de réduction des émissions de GES dans <a class='fr-link' href='{C3_url}' target='_blank' rel='noopener external'>l'indicateur « Cibles de réduction des émissions de GES des scopes 1 et 2 » de C3</a>"
-                            return (False, explication_non_applicable)
-                    except ObjectDoesNotExist:
-                        pass
-                else:
-                    B3_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B3"]
-                    )
-                    explication_non_applicable = f"l'entreprise n'a pas publié ses émissions de GES du scope 3 dans <a class='fr-link' href='{B3_url}' target='_blank' rel='noopener external'>l'indicateur « Estimation des émissions brutes de GES du scope 3 » de B3</a>"
-            case [
-                "C2",
-                "48",
-            ]:  # indicateur description des pratiques et politiques de durabilité
-                try:
-                    indicateur_declaration_durabilite = self.indicateurs.get(
-                        schema_id="B2-26"
-                    )
-                    if indicateur_declaration_durabilite.est_non_pertinent:
-                        au_moins_une_pratique_declaree = False
-                    else:
-                        declaration_durabilite = (
-                            indicateur_declaration_durabilite.data.get(
-                                "declaration_durabilite", {}
-                            )
-                        )
-                        au_moins_une_pratique_declaree = any(
-                            [
-                                bool(
-                                    declaration_durabilite[thematique].get("pratiques")
-                                )
-                                for thematique in declaration_durabilite
-                            ]
-                        )
-                except ObjectDoesNotExist:
-                    au_moins_une_pratique_declaree = False
-                if not au_moins_une_pratique_declaree:
-                    B2_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B2"]
-                    )
-                    explication_non_applicable = f"l'entreprise n'a pas déclaré de pratiques, politiques ou initiatives futures en matière de durabilité dans <a class='fr-link' href='{B2_url}' target='_blank' rel='noopener external'>l'indicateur « Déclaration des pratiques et politiques de durabilité » de B2</a>"
-                    return (False, explication_non_applicable)
-            case ["C5", _]:  # indicateurs supplémentaires des effectifs
-                nombre_salaries = self.nombre_salaries
-                if nombre_salaries is not None and nombre_salaries < 50:
-                    B1_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "B1"]
-                    )
-                    explication_non_applicable = f"le nombre de salariés renseigné dans <a class='fr-link' href='{B1_url}' target='_blank' rel='noopener external'>l'indicateur « Nombre de salariés » de B1</a> est inférieur à 50"
-                    return (False, explication_non_applicable)
-            case ["C4", "58"]:  # indicateur impacts financiers des risques climatiques
-                risques_climatiques = self.risques_climatiques
-                if not risques_climatiques:
-                    C4_url = reverse(
-                        "vsme:exigence_de_publication_vsme", args=[self.id, "C4"]
-                    )
-                    explication_non_applicable = f"l'entreprise n'a pas renseigné de risque climatique dans <a class='fr-link' href='{C4_url}' target='_blank' rel='noopener external'>l'indicateur « Aléas et risques climatiques recensés » de C4</a>"
-                    return (False, explication_non_applicable)
-        return (True, "")
+        return applicabilite(self, [indicateur_schema_id])[indicateur_schema_id]
 
     def indicateurs_completes_par_exigence(self, exigence_de_publication):
-        return self.indicateurs.filter(
-            schema_id__startswith=exigence_de_publication.code
-        ).values_list("schema_id", flat=True)
+        return [
+            schema_id
+            for schema_id in self.instantane_indicateurs
+            if schema_id in exigence_de_publication.ensemble_indicateur_schema_ids()
+        ]
 
     @cached_property
     def indicateurs_completes(self):
-        return self.indicateurs.values_list("schema_id", flat=True)
+        return list(self.instantane_indicateurs)
 
-    def progression_par_exigence(self, exigence_de_publication):
-        indicateur_schema_ids = set(exigence_de_publication.indicateur_schema_ids())
+    def calcule_progression_par_exigence(self, exigence_de_publication):
+        indicateur_schema_ids = exigence_de_publication.ensemble_indicateur_schema_ids()
         indicateurs_applicables = indicateur_schema_ids.intersection(
             set(self.indicateurs_applicables)
         )
@@ -436,8 +446,64 @@ class RapportVSME(TimestampedModel):
         indicateurs_completes_et_applicables = indicateurs_applicables.intersection(
             indicateurs_completes
         )
-        complet = len(indicateurs_completes_et_applicables)
-        total = len(indicateurs_applicables)
+        return len(indicateurs_completes_et_applicables), len(indicateurs_applicables)
+
+    def actualise_progression(self, codes_exigences=None):
+        """recalcule et enregistre les compteurs de progression des exigences de publication (toutes par défaut)"""
+        codes_exigences = codes_exigences or EXIGENCES_DE_PUBLICATION.keys()
+        progressions = []
+        for code in codes_exigences:
+            complet, total = self.calcule_progression_par_exigence(
+                EXIGENCES_DE_PUBLICATION[code]
+            )
+            progressions.append(
+                ProgressionExigence(
+                    rapport_vsme=self,
+                    exigence_de_publication=code,
+                    complet=complet,
+                    total=total,
+                    version=version_progression(),
+                )
+            )
+        ProgressionExigence.objects.bulk_create(
+            progressions,
+            update_conflicts=True,
+            unique_fields=["rapport_vsme", "exigence_de_publication"],
+            update_fields=["complet", "total", "version"],
+        )
+        self.__dict__.pop("compteurs_progression", None)
+        getattr(self, "_prefetched_objects_cache", {}).pop("progressions", None)
+
+    @cached_property
+    def compteurs_progression(self):
+        """compteurs de progression par exigence de publication : {code exigence: ProgressionExigence}
+
+        Lus en une requête et sans écriture : les compteurs absents (rapport antérieur aux compteurs,
+        nouvelle exigence de publication) ou calculés avec d'autres schémas ou règles d'applicabilité
+        (cf. version_progression) sont calculés sans être enregistrés,
+        jusqu'au passage de la commande actualise_progressions_vsme.
+        """
+        compteurs = {
+            progression.exigence_de_publication: progression
+            for progression in self.progressions.all()
+            if progression.version == version_progression()
+        }
+        for code, exigence_de_publication in EXIGENCES_DE_PUBLICATION.items():
+            if code not in compteurs:
+                complet, total = self.calcule_progression_par_exigence(
+                    exigence_de_publication
+                )
+                compteurs[code] = ProgressionExigence(
+                    rapport_vsme=self,
+                    exigence_de_publication=code,
+                    complet=complet,
+                    total=total,
+                )
+        return compteurs
+
+    def progression_par_exigence(self, exigence_de_publication):
+        progression = self.compteurs_progression[exigence_de_publication.code]
+        complet, total = progression.complet, progression.total
         if total:
             pourcent = (complet / total) * 100
         else:
@@ -448,11 +514,9 @@ class RapportVSME(TimestampedModel):
         complet, total, pourcent = 0, 0, 0
         for exigence_de_publication in self.exigences_de_publication_applicables():
             if exigence_de_publication.categorie == categorie:
-                progression_exigence = self.progression_par_exigence(
-                    exigence_de_publication
-                )
-                complet += progression_exigence["complet"]
-                total += progression_exigence["total"]
+                progression = self.compteurs_progression[exigence_de_publication.code]
+                complet += progression.complet
+                total += progression.total
         if total:
             pourcent = (complet / total) * 100
         return {"total": total, "complet": complet, "pourcent": int(pourcent)}
@@ -460,11 +524,9 @@ class RapportVSME(TimestampedModel):
     def progression(self):
         complet, total, pourcent = 0, 0, 0
         for exigence_de_publication in self.exigences_de_publication_applicables():
-            progression_exigence = self.progression_par_exigence(
-                exigence_de_publication
-            )
-            complet += progression_exigence["complet"]
-            total += progression_exigence["total"]
+            progression = self.compteurs_progression[exigence_de_publication.code]
+            complet += progression.complet
+            total += progression.total
         if total:
             pourcent = (complet / total) * 100
         return {"total": total, "complet": complet, "pourcent": int(pourcent)}
@@ -485,65 +547,87 @@ class RapportVSME(TimestampedModel):
 
     def get_choix_module(self) -> str | None:
         indicateur_choix_module = "B1-24-a"
-        try:
-            choix_module = self.indicateurs.get(
-                schema_id=indicateur_choix_module
-            ).data.get("choix_module")
-        except ObjectDoesNotExist:
-            choix_module = None
-        return choix_module
+        if indicateur := self.instantane_indicateurs.get(indicateur_choix_module):
+            return indicateur.data.get("choix_module")
+        return None
 
     choix_module = cached_property(get_choix_module)
 
     def get_pays(self):
         indicateur_pays = "B1-24-e-vi"
-        try:
-            codes_pays = self.indicateurs.get(schema_id=indicateur_pays).data.get(
-                "pays", []
-            )
-        except ObjectDoesNotExist:
-            codes_pays = []
-        return codes_pays
+        if indicateur := self.instantane_indicateurs.get(indicateur_pays):
+            return indicateur.data.get("pays", [])
+        return []
 
     pays = cached_property(get_pays)
 
     def get_nombre_salaries(self) -> int | None:
         indicateur_nombre_salaries = "B1-24-e-v"
-        try:
-            nombre_salaries = self.indicateurs.get(
-                schema_id=indicateur_nombre_salaries
-            ).data.get("nombre_salaries")
-        except ObjectDoesNotExist:
-            nombre_salaries = None
-        return nombre_salaries
+        if indicateur := self.instantane_indicateurs.get(indicateur_nombre_salaries):
+            return indicateur.data.get("nombre_salaries")
+        return None
 
     nombre_salaries = cached_property(get_nombre_salaries)
 
     def get_risques_climatiques(self) -> list:
         indicateur_schema_id = "C4-57"
-        try:
-            indicateur_risques_climatiques = self.indicateurs.get(
-                schema_id=indicateur_schema_id
-            )
-            if indicateur_risques_climatiques.est_non_pertinent:
-                return []
-            risques_climatiques = indicateur_risques_climatiques.data.get(
+        indicateur_risques_climatiques = self.instantane_indicateurs.get(
+            indicateur_schema_id
+        )
+        if (
+            not indicateur_risques_climatiques
+            or indicateur_risques_climatiques.est_non_pertinent
+        ):
+            return []
+        return [
+            {
+                "id": risque["id_risque"],
+                "description": risque["description"],
+            }
+            for risque in indicateur_risques_climatiques.data.get(
                 "aleas_et_risques_climatiques", []
             )
-            risques_climatiques = [
-                {
-                    "id": risque["id_risque"],
-                    "description": risque["description"],
-                }
-                for risque in risques_climatiques
-            ]
-        except ObjectDoesNotExist:
-            risques_climatiques = []
-        return risques_climatiques
+        ]
 
     risques_climatiques = cached_property(get_risques_climatiques)
 
 
+class ProgressionExigence(models.Model):
+    """compteurs de progression d'une exigence de publication d'un rapport VSME
+
+    Maintenus à l'enregistrement et à la suppression des indicateurs (cf. vsme.signals),
+    avec la version des schémas et des règles d'applicabilité utilisée (cf. version_progression).
+    """
+
+    rapport_vsme = models.ForeignKey(
+        "RapportVSME",
+        on_delete=models.CASCADE,
+        related_name="progressions",
+    )
+    exigence_de_publication = models.CharField(
+        max_length=3, verbose_name="code de l'exigence de publication"
+    )
+    complet = models.PositiveIntegerField(
+        default=0, verbose_name="nombre d'indicateurs applicables complétés"
+    )
+    total = models.PositiveIntegerField(
+        default=0, verbose_name="nombre d'indicateurs applicables"
+    )
+    version = models.CharField(
+        max_length=16,
+        default="",
+        verbose_name="version des schémas et des règles d'applicabilité",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rapport_vsme", "exigence_de_publication"],
+                name="unique_progression_par_exigence",
+            ),
+        ]
+
+
 class Indicateur(TimestampedModel):
     rapport_vsme = models.ForeignKey(
         "RapportVSME",
@@ -576,58 +660,176 @@ class Indicateur(TimestampedModel):
         ]
         indexes = [models.Index(fields=["schema_id"])]
 
+    def save(self, *args, **kwargs):
+        # l'indicateur et la progression du rapport (cf. vsme.signals) sont enregistrés ensemble
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        if instantane := self._instantane_du_rapport():
+            instantane[self.schema_id] = self
+
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        if instantane := self._instantane_du_rapport():
+            instantane.pop(self.schema_id, None)
+        return resultat
+
+    def _instantane_du_rapport(self):
+        # instantané des indicateurs déjà chargé par le rapport de l'indicateur, tenu à jour
+        # pour que les données calculées des autres indicateurs suivent les modifications
+        if Indicateur.rapport_vsme.is_cached(self):
+            return self.rapport_vsme.__dict__.get("instantane_indicateurs")
+
     @property
     def schema(self):
-        schema_exigence = ExigenceDePublication.par_indicateur_schema_id(
-            self.schema_id
-        ).load_json_schema()
-        return schema_exigence[self.schema_id]
+        return registre_schemas().par_indicateur[self.schema_id]
 
     @property
-    def data(self) -> dict:
-        data = copy.deepcopy(self._data) if self._data else {}
-        # décode les champs de type nombre_decimal qui sont encodés en string lors du stockage
-        for champ in self.schema["champs"]:
-            match champ["type"]:
-                case "nombre_decimal":
-                    string_data = data.get(champ["id"])
-                    if string_data:
-                        # retype la donnée uniquement si elle est présente
-                        data[champ["id"]] = Decimal(string_data)
-                case "tableau":
-                    for colonne in champ["colonnes"]:
-                        if colonne["type"] == "nombre_decimal":
-                            for ligne in data.get(champ["id"], []):
-                                string_data = ligne.get(colonne["id"])
-                                if string_data:
-                                    ligne[colonne["id"]] = Decimal(string_data)
-                case "tableau_lignes_fixes":
-                    for colonne in champ["colonnes"]:
-                        if colonne["type"] == "nombre_decimal":
-                            for ligne in data.get(champ["id"], {}):
-                                string_data = data[champ["id"]][ligne].get(
-                                    colonne["id"]
-                                )
-                                if string_data:
-                                    data[champ["id"]][ligne][colonne["id"]] = Decimal(
-                                        string_data
-                                    )
-
-        # ajoute les données calculées non stockées
-        data = ajoute_donnes_calculees(self.schema_id, self.rapport_vsme, data)
-
-        return data
+    def data(self) -> "DictFige":
+        # décodées une seule fois par instance, tant que les données brutes de l'indicateur
+        # et des indicateurs lus par ses données calculées ne sont pas remplacées (setter, refresh_from_db...) :
+        # les données décodées sont partagées entre les lectures, elles sont donc figées (cf. fige)
+        entrees = (self._data,)
+        if self.schema_id in DEPENDANCES_DONNEES_CALCULEES:
+            entrees += entrees_donnees_calculees(
+                self.schema_id, self.rapport_vsme.instantane_indicateurs
+            )
+        if deja_decodees := self.__dict__.get("_data_decodees"):
+            entrees_decodees, donnees = deja_decodees
+            if all(a is b for a, b in zip(entrees_decodees, entrees, strict=True)):
+                return donnees
+        donnees = fige(
+            decodeur_indicateur(self.schema_id).decode(self._data, self.rapport_vsme)
+        )
+        self._data_decodees = (entrees, donnees)
+        return donnees
 
     @data.setter
     def data(self, cleaned_data):
         self._data = cleaned_data
+        self.__dict__.pop("_data_decodees", None)
 
     @property
     def est_non_pertinent(self) -> bool:
         return bool(self._data and self._data.get(NON_PERTINENT_FIELD_NAME))
 
 
+@dataclass(frozen=True)
+class DecodeurIndicateur:
+    """décode les données brutes d'un indicateur
+
+    Les champs de type nombre_decimal, encodés en string lors du stockage, sont retypés
+    et les données calculées non stockées sont ajoutées.
+    """
+
+    schema_id: str
+    champs_decimaux: tuple  # ids des champs nombre_decimal
+    colonnes_decimales_tableaux: (
+        tuple  # (id du tableau, ids des colonnes nombre_decimal)
+    )
+    colonnes_decimales_tableaux_lignes_fixes: tuple
+    avec_donnees_calculees: bool
+
+    def decode(self, donnees_brutes, rapport_vsme):
+        data = copy.deepcopy(donnees_brutes) if donnees_brutes else {}
+        # retype la donnée uniquement si elle est présente
+        for champ_id in self.champs_decimaux:
+            if string_data := data.get(champ_id):
+                data[champ_id] = Decimal(string_data)
+        for champ_id, colonnes in self.colonnes_decimales_tableaux:
+            for ligne in data.get(champ_id, []):
+                _decode_colonnes_decimales(ligne, colonnes)
+        for champ_id, colonnes in self.colonnes_decimales_tableaux_lignes_fixes:
+            for ligne in data.get(champ_id, {}).values():
+                _decode_colonnes_decimales(ligne, colonnes)
+
+        if self.avec_donnees_calculees:
+            data = ajoute_donnes_calculees(self.schema_id, rapport_vsme, data)
+        return data
+
+
+def _decode_colonnes_decimales(ligne, colonnes):
+    for colonne_id in colonnes:
+        if string_data := ligne.get(colonne_id):
+            ligne[colonne_id] = Decimal(string_data)
+
+
+@cache
+def decodeur_indicateur(schema_id):
+    """décodeur compilé une seule fois par schéma d'indicateur"""
+    champs_decimaux = []
+    colonnes_decimales_tableaux = []
+    colonnes_decimales_tableaux_lignes_fixes = []
+    for champ in registre_schemas().par_indicateur[schema_id]["champs"]:
+        match champ["type"]:
+            case "nombre_decimal":
+                champs_decimaux.append(champ["id"])
+            case "tableau" | "tableau_lignes_fixes":
+                if colonnes := tuple(
+                    colonne["id"]
+                    for colonne in champ["colonnes"]
+                    if colonne["type"] == "nombre_decimal"
+                ):
+                    if champ["type"] == "tableau":
+                        colonnes_decimales_tableaux.append((champ["id"], colonnes))
+                    else:
+                        colonnes_decimales_tableaux_lignes_fixes.append(
+                            (champ["id"], colonnes)
+                        )
+    return DecodeurIndicateur(
+        schema_id=schema_id,
+        champs_decimaux=tuple(champs_decimaux),
+        colonnes_decimales_tableaux=tuple(colonnes_decimales_tableaux),
+        colonnes_decimales_tableaux_lignes_fixes=tuple(
+            colonnes_decimales_tableaux_lignes_fixes
+        ),
+        avec_donnees_calculees=schema_id in INDICATEURS_AVEC_DONNEES_CALCULEES,
+    )
+
+
+# indicateurs traités par ajoute_donnes_calculees
+INDICATEURS_AVEC_DONNEES_CALCULEES = frozenset(
+    (
+        "B3-29-p1",
+        "B3-29-p2",
+        "B3-30-p1",
+        "B3-30-p2",
+        "B10-42-b",
+        "B10-42-c",
+        "B10-42-d",
+        "C3-54-p1",
+        "C3-54-p2",
+        "C5-59",
+        "C8-63",
+    )
+)
+
+# indicateurs lus par ajoute_donnes_calculees, par indicateur calculé
+DEPENDANCES_DONNEES_CALCULEES = {
+    "B3-30-p1": ("B1-24-e-iv",),  # chiffre d'affaires pour l'intensité GES
+    "B3-30-p2": ("B3-30-p1",),  # total des scopes 1 et 2
+    "B10-42-c": ("B1-24-e-v",),  # nombre de salariés
+    "B10-42-d": ("B8-39-b",),  # nombre de salariés par genre
+    "C3-54-p2": ("C3-54-p1",),  # cibles des scopes 1 et 2
+}
+
+
+def entrees_donnees_calculees(schema_id, instantane):
+    """données brutes des indicateurs lus, directement ou non, par le calcul des données de l'indicateur"""
+    entrees = []
+    for dependance in DEPENDANCES_DONNEES_CALCULEES.get(schema_id, ()):
+        indicateur = instantane.get(dependance)
+        entrees.append(indicateur._data if indicateur else None)
+        entrees.extend(entrees_donnees_calculees(dependance, instantane))
+    return tuple(entrees)
+
+
 def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
+    # les indicateurs lus, déclarés dans DEPENDANCES_DONNEES_CALCULEES, proviennent de l'instantané du rapport
+    instantane = (
+        rapport_vsme.instantane_indicateurs
+        if indicateur_schema_id in DEPENDANCES_DONNEES_CALCULEES
+        else {}
+    )
     match indicateur_schema_id:
         case "B3-29-p1":
             consommation_electricite = data.get("consommation_electricite_par_type")
@@ -728,17 +930,15 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                 ] = total
 
                 indicateur_chiffre_affaires = "B1-24-e-iv"
-                try:
-                    chiffre_affaires = rapport_vsme.indicateurs.get(
-                        schema_id=indicateur_chiffre_affaires
-                    ).data.get("chiffre_affaires")
+                if indicateur := instantane.get(indicateur_chiffre_affaires):
+                    chiffre_affaires = indicateur.data.get("chiffre_affaires")
                     if chiffre_affaires:
                         intensite_GES = arrondit_2_decimales_si_superieur_a_1(
                             total / chiffre_affaires
                         )
                     else:
                         intensite_GES = "n/a"
-                except ObjectDoesNotExist:
+                else:
                     intensite_GES = "n/a"
                 data["intensite_GES"] = intensite_GES
         case "B3-30-p2":
@@ -752,11 +952,10 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
             data["total_estimation_emissions_GES_scope_3"]["total_scope_3"] = {
                 "total_emissions_brutes_GES": total_emissions_scope_3
             }
-            try:
-                indicateur_scopes_1_2 = "B3-30-p1"
+            indicateur_scopes_1_2 = "B3-30-p1"
+            if indicateur := instantane.get(indicateur_scopes_1_2):
                 total_emissions_scopes_1_2 = (
-                    rapport_vsme.indicateurs.get(schema_id=indicateur_scopes_1_2)
-                    .data.get("estimation_emissions_GES", {})
+                    indicateur.data.get("estimation_emissions_GES", {})
                     .get("emissions_brutes_GES", {})
                     .get("total")
                 )
@@ -767,8 +966,6 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                     data["total_estimation_emissions_GES_scope_3"][
                         "total_scopes_1_2_3"
                     ] = {"total_emissions_brutes_GES": total_emissions_scopes_1_2_3}
-            except ObjectDoesNotExist:
-                pass
         case "B10-42-b":
             remuneration_hommes = data.get("remuneration_horaire_hommes")
             remuneration_femmes = data.get("remuneration_horaire_femmes")
@@ -787,7 +984,12 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                 "nombre_salaries_conventions_collectives"
             )
             if nombre_salaries_conventions_collectives is not None:
-                nombre_salaries = rapport_vsme.nombre_salaries
+                indicateur_nombre_salaries = "B1-24-e-v"
+                nombre_salaries = (
+                    indicateur.data.get("nombre_salaries")
+                    if (indicateur := instantane.get(indicateur_nombre_salaries))
+                    else None
+                )
                 if nombre_salaries:
                     taux = (
                         100 * nombre_salaries_conventions_collectives / nombre_salaries
@@ -809,11 +1011,9 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
             if total_heure_formation_par_genre := data.get(
                 "nombre_heures_formation_par_genre"
             ):
-                try:
-                    indicateur_nombre_salaries_par_genre = "B8-39-b"
-                    nombre_salaries_par_genre = rapport_vsme.indicateurs.get(
-                        schema_id=indicateur_nombre_salaries_par_genre
-                    ).data.get("effectifs_genre")
+                indicateur_nombre_salaries_par_genre = "B8-39-b"
+                if indicateur := instantane.get(indicateur_nombre_salaries_par_genre):
+                    nombre_salaries_par_genre = indicateur.data.get("effectifs_genre")
                     if nombre_salaries_par_genre:
                         for genre in nombre_salaries_par_genre:
                             total_heure_formation = (
@@ -834,8 +1034,6 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                                 data["nombre_heures_formation_par_genre"][genre][
                                     "nombre_moyen_heures_formation"
                                 ] = nombre_moyen_heures_formation
-                except ObjectDoesNotExist:
-                    pass
         case "C3-54-p1" | "C3-54-p2":
             if indicateur_schema_id == "C3-54-p1":  # scope 1 et 2
                 tableau_cibles_id = "cibles_reduction_emissions_GES_scopes_1_2"
@@ -874,13 +1072,11 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                 ] = pourcentage_total_reduction
             if indicateur_schema_id == "C3-54-p2":  # scope 3
                 # il faut encore ajouter le total scope 1 + 2 + 3
-                try:
-                    indicateur_scopes_1_2 = "C3-54-p1"
-                    ligne_total = (
-                        rapport_vsme.indicateurs.get(schema_id=indicateur_scopes_1_2)
-                        .data.get("total_reduction_emissions_GES_scopes_1_2", {})
-                        .get("total_scopes_1_2_localisation", {})
-                    )
+                indicateur_scopes_1_2 = "C3-54-p1"
+                if indicateur := instantane.get(indicateur_scopes_1_2):
+                    ligne_total = indicateur.data.get(
+                        "total_reduction_emissions_GES_scopes_1_2", {}
+                    ).get("total_scopes_1_2_localisation", {})
                     if ligne_total:
                         valeur_cible_scopes_1_2 = ligne_total.get("valeur_cible") or 0
                         valeur_reference_scopes_1_2 = (
@@ -907,8 +1103,6 @@ def ajoute_donnes_calculees(indicateur_schema_id, rapport_vsme, data):
                             data[tableau_total_id]["total_scopes_1_2_3"][
                                 "pourcentage_reduction"
                             ] = pourcentage_reduction_scopes_1_2_3
-                except ObjectDoesNotExist:
-                    pass
         case "C5-59":
             nombre_femmes = data.get("nombre_femmes_parmi_encadrement")
             nombre_hommes = data.get("nombre_hommes_parmi_encadrement")
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from vsme.applicabilite import INDICATEURS_DETERMINANT_APPLICABILITE
+from vsme.models import EXIGENCES_DE_PUBLICATION
+from vsme.models import Indicateur
+from vsme.models import RapportVSME
+
+# Actualisation des compteurs de progression des rapports VSME (cf. RapportVSME.actualise_progression)
+#
+# Un indicateur ajouté ou supprimé ne modifie que la progression de son exigence de publication,
+# sauf s'il détermine l'applicabilité d'autres indicateurs (choix du module, nombre de salariés...) :
+# la progression de toutes les exigences est alors recalculée, y compris lors de sa modification.
+# Les compteurs de toutes les exigences sont créés avec le rapport.
+
+
+@receiver(post_save, sender=RapportVSME)
+def initialise_progression_rapport(sender, instance, created, **kwargs):
+    if created:
+        # instance fraîche : le calcul met en cache les indicateurs et leur applicabilité
+        RapportVSME.objects.get(pk=instance.pk).actualise_progression()
+
+
+@receiver(post_save, sender=Indicateur)
+def actualise_progression_indicateur_enregistre(sender, instance, created, **kwargs):
+    if created or instance.schema_id in INDICATEURS_DETERMINANT_APPLICABILITE:
+        _actualise_progression(instance)
+
+
+@receiver(post_delete, sender=Indicateur)
+def actualise_progression_indicateur_supprime(sender, instance, origin, **kwargs):
+    # les suppressions en cascade (rapport, entreprise) ne concernent pas la progression
+    if isinstance(origin, Indicateur) or (
+        isinstance(origin, QuerySet) and origin.model is Indicateur
+    ):
+        _actualise_progression(instance)
+
+
+def _actualise_progression(indicateur):
+    if indicateur.schema_id in INDICATEURS_DETERMINANT_APPLICABILITE:
+        codes_exigences = None
+    elif (code := indicateur.schema_id.split("-")[0]) in EXIGENCES_DE_PUBLICATION:
+        codes_exigences = [code]
+    else:
+        # schéma disparu
+        return
+    with transaction.atomic():
+        # instance fraîche : les indicateurs du rapport viennent d'être modifiés.
+        # Le rapport est verrouillé avant la lecture de ses indicateurs : deux enregistrements concurrents
+        # d'indicateurs du même rapport recalculent l'un après l'autre, le second voyant les indicateurs du premier.
+        RapportVSME.objects.select_for_update().get(
+            pk=indicateur.rapport_vsme_id
+        ).actualise_progression(codes_exigences)
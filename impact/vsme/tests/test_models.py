@@ -2,6 +2,19 @@ import copy
 from decimal import Decimal
 
 import pytest
+from django.core.management import call_command
+
+from vsme.applicabilite import INDICATEURS_DETERMINANT_APPLICABILITE
+from vsme.models import ajoute_donnes_calculees
+from vsme.models import Categorie
+from vsme.models import decodeur_indicateur
+from vsme.models import DEPENDANCES_DONNEES_CALCULEES
+from vsme.models import EXIGENCES_DE_PUBLICATION
+from vsme.models import INDICATEURS_AVEC_DONNEES_CALCULEES
+from vsme.models import ProgressionExigence
+from vsme.models import RapportVSME
+from vsme.models import registre_schemas
+from vsme.models import schema_existe
 
 
 def test_nombre_decimal_dans_les_donnees_d_un_indicateur(rapport_vsme):
@@ -202,3 +215,385 @@ def test_applicabilité_indicateurs_C5_si_50_salariés_ou_plus(
 
     assert not est_applicable
     assert "l'entreprise a sélectionné uniquement le module de base" in explication
+
+
+def test_registre_des_schemas_charge_une_seule_fois(mocker):
+    ouverture = mocker.patch("builtins.open")
+
+    schema = EXIGENCES_DE_PUBLICATION["B1"].load_json_schema()
+    assert EXIGENCES_DE_PUBLICATION["B1"].load_json_schema() is schema
+    assert registre_schemas().par_indicateur["B1-24-e-v"] is schema["B1-24-e-v"]
+
+    assert not ouverture.called
+
+
+def test_schemas_en_lecture_seule():
+    schema_indicateur = registre_schemas().par_indicateur["B4-32-p1"]
+
+    with pytest.raises(TypeError):
+        schema_indicateur["titre"] = "Autre titre"
+    with pytest.raises(TypeError):
+        schema_indicateur["champs"].append({"id": "autre_champ"})
+    with pytest.raises(TypeError):
+        schema_indicateur["champs"][0].update(type="texte")
+    # une copie est modifiable
+    assert dict(schema_indicateur, schema_id="B4-32-p1")["schema_id"] == "B4-32-p1"
+    assert copy.deepcopy(schema_indicateur) is schema_indicateur
+
+
+def test_identifiants_des_indicateurs_par_exigence_et_par_categorie():
+    for code, exigence in EXIGENCES_DE_PUBLICATION.items():
+        assert exigence.ensemble_indicateur_schema_ids() == set(
+            exigence.indicateur_schema_ids()
+        )
+        assert all(
+            schema_id.startswith(f"{code}-")
+            for schema_id in exigence.indicateur_schema_ids()
+        )
+    for categorie in Categorie:
+        assert categorie.indicateur_schema_ids() == {
+            schema_id
+            for exigence in categorie.exigences_de_publication()
+            for schema_id in exigence.indicateur_schema_ids()
+        }
+    assert "B1-24-e-v" in Categorie.GENERAL.indicateur_schema_ids()
+    assert schema_existe("B1-24-e-v")
+    assert not schema_existe("B1-99-z")
+
+
+def test_donnees_decodees_une_seule_fois(rapport_vsme, django_assert_num_queries):
+    indicateur = rapport_vsme.indicateurs.create(
+        schema_id="B3-29-p2",
+        data={
+            "consommation_energie_par_combustible": [
+                {"type_combustible": "Anthracite", "quantite": "10"},
+            ],
+        },
+    )
+    data = indicateur.data
+
+    with django_assert_num_queries(0):
+        assert indicateur.data is data
+
+    indicateur.data = {
+        "consommation_energie_par_combustible": [
+            {"type_combustible": "Anthracite", "quantite": "20"},
+        ],
+    }
+    assert indicateur.data["consommation_energie_par_combustible"][0][
+        "quantite"
+    ] == Decimal("20")
+
+    indicateur.save()
+    indicateur.refresh_from_db()
+    assert indicateur.data["consommation_energie_par_combustible"][0][
+        "quantite"
+    ] == Decimal("20")
+
+
+def test_donnees_decodees_non_modifiables(rapport_vsme):
+    indicateur = rapport_vsme.indicateurs.create(
+        schema_id="B3-29-p2",
+        data={
+            "consommation_energie_par_combustible": [
+                {"type_combustible": "Anthracite", "quantite": "10"},
+            ],
+        },
+    )
+    data = indicateur.data
+
+    with pytest.raises(TypeError):
+        data["consommation_energie_par_combustible"] = []
+    with pytest.raises(TypeError):
+        data["consommation_energie_par_combustible"].append({})
+    with pytest.raises(TypeError):
+        data["consommation_energie_par_combustible"][0]["quantite"] = Decimal("20")
+
+    relue = indicateur.data["consommation_energie_par_combustible"]
+    assert len(relue) == 1
+    assert relue[0]["quantite"] == Decimal("10")
+
+
+@pytest.fixture
+def indicateurs_emissions_GES(rapport_vsme):
+    rapport_vsme.indicateurs.create(
+        schema_id="B1-24-e-iv", data={"chiffre_affaires": 1000}
+    )
+    rapport_vsme.indicateurs.create(
+        schema_id="B3-30-p1",
+        data={
+            "estimation_emissions_GES": {
+                "emissions_brutes_GES": {"scope_1": "100", "scope_2_localisation": "50"}
+            }
+        },
+    )
+    rapport_vsme.indicateurs.create(
+        schema_id="B3-30-p2", data={"estimation_emissions_GES_scope_3": {}}
+    )
+
+
+def test_donnees_calculees_lues_depuis_l_instantane_du_rapport(
+    rapport_vsme, indicateurs_emissions_GES, django_assert_num_queries
+):
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+
+    with django_assert_num_queries(1):
+        instantane = rapport_vsme.instantane_indicateurs
+        data_scopes_1_2 = instantane["B3-30-p1"].data
+        data_scope_3 = instantane["B3-30-p2"].data
+        assert instantane["B3-30-p2"].data is data_scope_3
+
+    assert data_scopes_1_2["intensite_GES"] == Decimal("0.15")
+    assert data_scope_3["total_estimation_emissions_GES_scope_3"][
+        "total_scopes_1_2_3"
+    ] == {"total_emissions_brutes_GES": Decimal("150")}
+
+
+def test_donnees_calculees_recalculees_a_la_modification_d_une_dependance(
+    rapport_vsme, indicateurs_emissions_GES
+):
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+    instantane = rapport_vsme.instantane_indicateurs
+    assert instantane["B3-30-p1"].data["intensite_GES"] == Decimal("0.15")
+
+    instantane["B1-24-e-iv"].data = {"chiffre_affaires": 100}
+
+    assert instantane["B3-30-p1"].data["intensite_GES"] == Decimal("1.5")
+
+    # dépendance indirecte : B3-30-p2 lit le total de B3-30-p1
+    instantane["B3-30-p1"].data = {
+        "estimation_emissions_GES": {"emissions_brutes_GES": {"scope_1": "10"}}
+    }
+    instantane["B3-30-p1"].save()
+
+    assert rapport_vsme.instantane_indicateurs["B3-30-p2"].data[
+        "total_estimation_emissions_GES_scope_3"
+    ]["total_scopes_1_2_3"] == {"total_emissions_brutes_GES": Decimal("10")}
+
+    instantane["B1-24-e-iv"].delete()
+
+    assert instantane["B3-30-p1"].data["intensite_GES"] == "n/a"
+
+
+def test_dependances_des_donnees_calculees():
+    for schema_id, dependances in DEPENDANCES_DONNEES_CALCULEES.items():
+        assert schema_id in INDICATEURS_AVEC_DONNEES_CALCULEES
+        assert set(dependances) <= set(registre_schemas().par_indicateur)
+
+
+def test_decodeur_compile_par_schema():
+    decodeur = decodeur_indicateur("B4-32-p1")
+
+    assert decodeur is decodeur_indicateur("B4-32-p1")
+    assert decodeur.colonnes_decimales_tableaux == (("pollution_air", ("valeur",)),)
+    assert not decodeur.avec_donnees_calculees
+
+
+def test_indicateurs_sans_donnees_calculees():
+    for schema_id in registre_schemas().par_indicateur:
+        if schema_id not in INDICATEURS_AVEC_DONNEES_CALCULEES:
+            assert ajoute_donnes_calculees(schema_id, None, {}) == {}, schema_id
+
+
+def test_applicabilite_calculee_sur_un_instantane_des_indicateurs(
+    rapport_vsme, django_assert_num_queries
+):
+    rapport_vsme.indicateurs.create(
+        schema_id="B1-24-a", data={"choix_module": rapport_vsme.CHOIX_MODULE_COMPLET}
+    )
+    rapport_vsme.indicateurs.create(
+        schema_id="B1-24-c", data={"type_perimetre": "consolidee"}
+    )
+    rapport_vsme.indicateurs.create(
+        schema_id="B1-24-e-v",
+        data={"methode_comptabilisation": "ETP", "nombre_salaries": 10},
+    )
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+
+    with django_assert_num_queries(1):
+        indicateurs_applicables = rapport_vsme.indicateurs_applicables
+        for schema_id in registre_schemas().par_indicateur:
+            rapport_vsme.indicateur_est_applicable(schema_id)
+
+    assert "B1-24-d" in indicateurs_applicables
+    assert "C1-47-a" in indicateurs_applicables
+    assert "C5-59" not in indicateurs_applicables
+    assert "B2-26-p1" not in indicateurs_applicables
+    est_applicable, explication = rapport_vsme.indicateur_est_applicable("C2-48")
+    assert not est_applicable
+    assert "n'a pas déclaré de pratiques" in explication
+
+
+def test_indicateurs_determinant_l_applicabilite():
+    assert INDICATEURS_DETERMINANT_APPLICABILITE == {
+        "B1-24-a",
+        "B1-24-c",
+        "B1-24-e-i",
+        "B1-24-e-v",
+        "B1-24-e-vi",
+        "B2-26",
+        "B3-30-p2",
+        "C3-54-p1",
+        "C4-57",
+    }
+    assert INDICATEURS_DETERMINANT_APPLICABILITE <= set(
+        registre_schemas().par_indicateur
+    )
+
+
+def test_compteurs_de_progression_actualises_a_l_ajout_et_a_la_suppression_d_un_indicateur(
+    rapport_vsme,
+):
+    indicateur = rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+
+    progression = ProgressionExigence.objects.get(
+        rapport_vsme=rapport_vsme, exigence_de_publication="B4"
+    )
+    assert (progression.complet, progression.total) == (1, 3)
+
+    indicateur.delete()
+
+    progression.refresh_from_db()
+    assert (progression.complet, progression.total) == (0, 3)
+
+
+def test_compteurs_de_progression_actualises_a_la_modification_d_un_indicateur_determinant(
+    rapport_vsme,
+):
+    indicateur = rapport_vsme.indicateurs.create(
+        schema_id="B1-24-a", data={"choix_module": rapport_vsme.CHOIX_MODULE_COMPLET}
+    )
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+    assert rapport_vsme.progression_par_exigence(EXIGENCES_DE_PUBLICATION["C1"])[
+        "total"
+    ] == len(EXIGENCES_DE_PUBLICATION["C1"].indicateur_schema_ids())
+
+    indicateur.data = {"choix_module": rapport_vsme.CHOIX_MODULE_BASE}
+    indicateur.save()
+
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+    assert (
+        rapport_vsme.progression_par_exigence(EXIGENCES_DE_PUBLICATION["C1"])["total"]
+        == 0
+    )
+
+
+def test_progression_lue_depuis_les_compteurs(rapport_vsme, django_assert_num_queries):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    attendu = {
+        code: rapport_vsme.calcule_progression_par_exigence(exigence)
+        for code, exigence in EXIGENCES_DE_PUBLICATION.items()
+    }
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+
+    # compteurs et indicateurs (choix du module déterminant les exigences applicables)
+    with django_assert_num_queries(2):
+        progression = rapport_vsme.progression()
+        for code, exigence in EXIGENCES_DE_PUBLICATION.items():
+            progression_exigence = rapport_vsme.progression_par_exigence(exigence)
+            assert (
+                progression_exigence["complet"],
+                progression_exigence["total"],
+            ) == attendu[code]
+
+    assert progression["complet"] == 1
+
+
+def test_progression_limitee_aux_exigences_de_publication_applicables(rapport_vsme):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    rapport_vsme.indicateurs.create(
+        schema_id="B1-24-a", data={"choix_module": rapport_vsme.CHOIX_MODULE_BASE}
+    )
+    # compteurs d'une exigence du module complet non applicable au rapport
+    ProgressionExigence.objects.filter(
+        rapport_vsme=rapport_vsme, exigence_de_publication="C1"
+    ).update(complet=1, total=2)
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+
+    progression = rapport_vsme.progression()
+    progression_categorie = rapport_vsme.progression_par_categorie(
+        EXIGENCES_DE_PUBLICATION["C1"].categorie
+    )
+
+    assert progression["total"] == sum(
+        rapport_vsme.progression_par_exigence(exigence)["total"]
+        for exigence in rapport_vsme.exigences_de_publication_applicables()
+    )
+    assert progression_categorie["total"] == sum(
+        rapport_vsme.progression_par_exigence(exigence)["total"]
+        for exigence in rapport_vsme.exigences_de_publication_applicables()
+        if exigence.categorie == EXIGENCES_DE_PUBLICATION["C1"].categorie
+    )
+
+
+def test_compteurs_de_progression_absents_calcules_sans_ecriture(
+    rapport_vsme, django_assert_num_queries
+):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    ProgressionExigence.objects.all().delete()
+    rapport_vsme = RapportVSME.objects.prefetch_related(
+        "progressions", "indicateurs"
+    ).get(pk=rapport_vsme.pk)
+
+    with django_assert_num_queries(0):
+        assert rapport_vsme.progression_par_exigence(
+            EXIGENCES_DE_PUBLICATION["B4"]
+        ) == {
+            "total": 3,
+            "complet": 1,
+            "pourcent": 33,
+        }
+    assert not ProgressionExigence.objects.exists()
+
+
+def test_suppression_d_un_rapport_avec_ses_indicateurs(rapport_vsme):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+
+    rapport_vsme.delete()
+
+    assert not ProgressionExigence.objects.exists()
+
+
+def test_commande_actualise_les_progressions(rapport_vsme):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    # compteurs calculés avec d'autres schémas ou règles d'applicabilité
+    ProgressionExigence.objects.update(complet=0, total=0, version="ancienne")
+
+    call_command("actualise_progressions_vsme")
+
+    progression = ProgressionExigence.objects.get(
+        rapport_vsme=rapport_vsme, exigence_de_publication="B4"
+    )
+    assert (progression.complet, progression.total) == (1, 3)
+
+
+def test_commande_enregistre_les_progressions_absentes(rapport_vsme):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    ProgressionExigence.objects.all().delete()
+
+    call_command("actualise_progressions_vsme")
+
+    progression = ProgressionExigence.objects.get(
+        rapport_vsme=rapport_vsme, exigence_de_publication="B4"
+    )
+    assert (progression.complet, progression.total) == (1, 3)
+    assert ProgressionExigence.objects.count() == len(EXIGENCES_DE_PUBLICATION)
+
+
+def test_commande_n_actualise_pas_les_progressions_a_jour(rapport_vsme, capsys):
+    call_command("actualise_progressions_vsme")
+
+    assert "0 rapports VSME actualisés" in capsys.readouterr().out
+
+
+def test_progressions_d_une_autre_version_calculees_a_la_lecture(rapport_vsme):
+    rapport_vsme.indicateurs.create(schema_id="B4-32-p1", data={})
+    ProgressionExigence.objects.update(complet=0, total=0, version="ancienne")
+    rapport_vsme = RapportVSME.objects.get(pk=rapport_vsme.pk)
+
+    assert rapport_vsme.progression_par_exigence(EXIGENCES_DE_PUBLICATION["B4"]) == {
+        "total": 3,
+        "complet": 1,
+        "pourcent": 33,
+    }
+    assert not ProgressionExigence.objects.filter(complet__gt=0).exists()
@@ -4,7 +4,6 @@ from pathlib import Path
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.exceptions import PermissionDenied
 from django.http.response import Http404
 from django.shortcuts import get_object_or_404
@@ -35,6 +34,7 @@ from vsme.models import EXIGENCES_DE_PUBLICATION
 from vsme.models import get_exercices_disponibles
 from vsme.models import Indicateur
 from vsme.models import RapportVSME
+from vsme.models import registre_schemas
 
 
 ETAPES = {
@@ -209,10 +209,7 @@ def indicateur_vsme(request, rapport_vsme, indicateur_schema_id):
         rapport_vsme.indicateur_est_applicable(indicateur_schema_id)
     )
 
-    try:
-        indicateur = rapport_vsme.indicateurs.get(schema_id=indicateur_schema_id)
-    except ObjectDoesNotExist:
-        indicateur = None
+    indicateur = rapport_vsme.instantane_indicateurs.get(indicateur_schema_id)
 
     if request.method == "POST":
         if not indicateur_est_applicable:
@@ -333,13 +330,9 @@ def reinitialiser_indicateur_vsme(request, rapport_vsme, indicateur_schema_id):
 
 
 def load_indicateur_schema(indicateur_schema_id):
-    exigence_de_publication_code = indicateur_schema_id.split("-")[0]
     try:
-        exigence_de_publication_schema = EXIGENCES_DE_PUBLICATION[
-            exigence_de_publication_code
-        ].load_json_schema()
         return dict(
-            exigence_de_publication_schema[indicateur_schema_id],
+            registre_schemas().par_indicateur[indicateur_schema_id],
             schema_id=indicateur_schema_id,
         )
     except KeyError:
@@ -414,9 +407,9 @@ def export_vsme_xlsx(request, rapport_vsme):
     )
 
     indicateurs_par_schema_id = {}
-    for indicateur in rapport_vsme.indicateurs.all():
-        if rapport_vsme.indicateur_est_applicable(indicateur.schema_id)[0]:
-            indicateurs_par_schema_id[indicateur.schema_id] = indicateur
+    for schema_id, indicateur in rapport_vsme.instantane_indicateurs.items():
+        if rapport_vsme.indicateur_est_applicable(schema_id)[0]:
+            indicateurs_par_schema_id[schema_id] = indicateur
 
     chemin_xlsx = Path(settings.BASE_DIR, f"vsme/exports/vsme.xlsx")
     workbook = load_workbook(chemin_xlsx)